@@ -1,4 +1,69 @@
 """Tatum Admin"""
-# from django.contrib import admin
+from django.contrib import admin
 
-# Register your models here.
+from .models import Blockage
+from .models import Customer
+from .models import LedgerTransaction
+from .models import PooledAccount
+from .models import SyncCursor
+from .models import VirtualAccount
+from .models import WalletNonce
+from .models import Withdrawal
+
+
+@admin.register(Customer)
+class CustomerAdmin(admin.ModelAdmin):
+    list_display = ("tatum_id", "external_id", "accounting_currency", "active", "enabled", "synced_at")
+    list_filter = ("active", "enabled", "accounting_currency")
+    search_fields = ("tatum_id", "external_id")
+
+
+@admin.register(VirtualAccount)
+class VirtualAccountAdmin(admin.ModelAdmin):
+    list_display = ("tatum_id", "customer", "currency", "account_balance", "available_balance", "active", "frozen", "synced_at")
+    list_filter = ("currency", "active", "frozen")
+    list_select_related = ("customer",)
+    search_fields = ("tatum_id", "account_number", "customer__tatum_id", "customer__external_id")
+    raw_id_fields = ("customer",)
+
+
+@admin.register(Blockage)
+class BlockageAdmin(admin.ModelAdmin):
+    list_display = ("tatum_id", "account", "amount", "type", "synced_at")
+    list_filter = ("type",)
+    search_fields = ("tatum_id", "account__tatum_id")
+    raw_id_fields = ("account",)
+
+
+@admin.register(LedgerTransaction)
+class LedgerTransactionAdmin(admin.ModelAdmin):
+    list_display = ("reference", "account_tatum_id", "currency", "amount", "operation_type", "transaction_type", "created")
+    list_filter = ("currency", "operation_type", "transaction_type")
+    search_fields = ("reference", "account_tatum_id", "counter_account_tatum_id", "payment_id", "tx_id")
+    date_hierarchy = "created"
+
+
+@admin.register(SyncCursor)
+class SyncCursorAdmin(admin.ModelAdmin):
+    list_display = ("name", "position", "updated_at")
+
+
+@admin.register(PooledAccount)
+class PooledAccountAdmin(admin.ModelAdmin):
+    list_display = ("account_tatum_id", "currency", "address", "claimed_by", "claimed_at", "created_at")
+    list_filter = ("currency", ("claimed_at", admin.EmptyFieldListFilter))
+    search_fields = ("account_tatum_id", "address", "claimed_by")
+
+
+@admin.register(WalletNonce)
+class WalletNonceAdmin(admin.ModelAdmin):
+    list_display = ("chain", "address", "next_nonce", "synced_at")
+    list_filter = ("chain",)
+    search_fields = ("address",)
+
+
+@admin.register(Withdrawal)
+class WithdrawalAdmin(admin.ModelAdmin):
+    list_display = ("payment_id", "currency", "amount", "address", "status", "attempts", "created_at")
+    list_filter = ("status", "currency")
+    search_fields = ("payment_id", "sender_account_id", "address", "withdrawal_tatum_id", "reference")
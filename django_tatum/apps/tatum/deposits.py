@@ -0,0 +1,47 @@
+"""Database-backed cursors for the deposit tails.
+
+`DatabaseCursorStore` keeps the high-water mark of each `DepositTail` in a `SyncCursor`
+row, next to the cursors of the ledger sync, so a crediting service resumes from the same
+mark whichever host it restarts on. `AsyncDepositTail` goes through the async ORM.
+"""
+from typing import Optional
+
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.deposit import CursorState
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.deposit import CursorStore
+
+from .models import SyncCursor
+
+
+class DatabaseCursorStore(CursorStore):
+    """Tail cursors kept as `SyncCursor` rows.
+
+    Args:
+        prefix (str, optional): Prepended to the cursor names. Defaults to "deposits:".
+    """
+
+    def __init__(self, prefix: str = "deposits:"):
+        self.prefix = prefix
+
+    def load(self, name: str) -> Optional[CursorState]:
+        cursor = SyncCursor.objects.filter(name=self.prefix + name).first()
+        if cursor is None:
+            return None
+        return {"position": cursor.position, "recent": cursor.recent}
+
+    def save(self, name: str, state: CursorState):
+        SyncCursor.objects.update_or_create(
+            name=self.prefix + name,
+            defaults={"position": state["position"], "recent": state["recent"]},
+        )
+
+    async def aload(self, name: str) -> Optional[CursorState]:
+        cursor = await SyncCursor.objects.filter(name=self.prefix + name).afirst()
+        if cursor is None:
+            return None
+        return {"position": cursor.position, "recent": cursor.recent}
+
+    async def asave(self, name: str, state: CursorState):
+        await SyncCursor.objects.aupdate_or_create(
+            name=self.prefix + name,
+            defaults={"position": state["position"], "recent": state["recent"]},
+        )
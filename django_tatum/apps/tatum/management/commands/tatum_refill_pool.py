@@ -0,0 +1,28 @@
+"""Refill the pre-provisioned account pools."""
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from ...pool import AccountPool
+from ...pool import PoolRefiller
+
+
+class Command(BaseCommand):
+    help = "Top up the account pools of settings.TATUM_ACCOUNT_POOLS to their targets."
+
+    def add_arguments(self, parser):
+        parser.add_argument("currencies", nargs="*", help="Pools to refill. Defaults to all of them.")
+        parser.add_argument("--loop", action="store_true", help="Keep refilling in the foreground.")
+        parser.add_argument("--interval", type=float, help="Seconds between two checks with --loop.")
+
+    def handle(self, *args, **options):
+        pool = AccountPool()
+        unknown = set(options["currencies"]) - set(pool.specs)
+        if unknown:
+            raise CommandError(f"No account pool is configured for {', '.join(sorted(unknown))}.")
+        if options["currencies"]:
+            pool.specs = {currency: pool.specs[currency] for currency in options["currencies"]}
+        if options["loop"]:
+            PoolRefiller(pool, options["interval"]).run()
+            return
+        for currency, count in pool.refill_all().items():
+            self.stdout.write(f"{currency}: {count} ready, {pool.available(currency)} available")
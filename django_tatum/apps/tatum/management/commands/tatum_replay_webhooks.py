@@ -0,0 +1,59 @@
+"""Replay recorded Tatum webhook events."""
+import requests
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.utils.codec import get_codec
+
+from ...webhooks import SIGNATURE_HEADER
+from ...webhooks import WebhookLog
+from ...webhooks import WebhookQueue
+from ...webhooks import sign_payload
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay Tatum webhook events from a JSON lines file (TATUM_WEBHOOK_LOG by default), either signed "
+        "and posted to a running endpoint or processed in this process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default=conf.TATUM_WEBHOOK_LOG, help="JSON lines file of events.")
+        parser.add_argument("--url", help="Post each event, signed, to this webhook URL instead.")
+        parser.add_argument("--secret", help="HMAC secret to sign with. Defaults to TATUM_WEBHOOK_SECRET.")
+        parser.add_argument("--no-refresh", action="store_true", help="Only invalidate caches, skip balance refreshes.")
+
+    def handle(self, *args, **options):
+        if not options["path"]:
+            raise CommandError("No event file given and TATUM_WEBHOOK_LOG is not set.")
+        events = WebhookLog(options["path"])
+        if not events.path.exists():
+            raise CommandError(f"{events.path} does not exist.")
+        if options["url"]:
+            self.post(events, options["url"], options["secret"])
+        else:
+            webhook_queue = WebhookQueue(refresh_balances=not options["no_refresh"])
+            batch = []
+            for event in events:
+                batch.append(event)
+                if len(batch) >= webhook_queue.batch_size:
+                    webhook_queue.process(batch)
+                    batch = []
+            webhook_queue.process(batch)
+            self.stdout.write(", ".join(f"{kind}: {count}" for kind, count in webhook_queue.stats.items()))
+
+    def post(self, events: WebhookLog, url: str, secret: str = None):
+        codec = get_codec()
+        sent = failed = 0
+        with requests.Session() as session:
+            for event in events:
+                body = codec.dumps(event)
+                headers = {"Content-Type": "application/json", SIGNATURE_HEADER: sign_payload(body, secret)}
+                response = session.post(url, data=body, headers=headers, timeout=conf.TATUM_HTTP_TIMEOUT)
+                if response.ok:
+                    sent += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f"{response.status_code} for {event}")
+        self.stdout.write(f"sent: {sent}, failed: {failed}")
@@ -0,0 +1,25 @@
+"""Sync the local ledger mirror with Tatum."""
+from django.core.management.base import BaseCommand
+
+from ...sync import LedgerSync
+
+
+class Command(BaseCommand):
+    help = "Mirror Tatum customers, accounts and ledger transactions into the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Re-read every customer and account.")
+        parser.add_argument("--blockages", action="store_true", help="Also resync the blockages of every account.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows written per bulk statement.")
+        parser.add_argument(
+            "--overlap",
+            type=float,
+            default=300,
+            help="Seconds re-read before the last transaction high-water mark.",
+        )
+
+    def handle(self, *args, **options):
+        sync = LedgerSync(batch_size=options["batch_size"], overlap_seconds=options["overlap"])
+        stats = sync.run(full=options["full"], blockages=options["blockages"])
+        for kind, count in stats.items():
+            self.stdout.write(f"{kind}: {count}")
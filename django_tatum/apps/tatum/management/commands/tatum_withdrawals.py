@@ -0,0 +1,27 @@
+"""Send the queued withdrawals."""
+from django.core.management.base import BaseCommand
+
+from ...withdrawals import WithdrawalQueue
+from ...withdrawals import WithdrawalWorkerPool
+
+
+class Command(BaseCommand):
+    help = "Send the queued withdrawals to Tatum."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+        parser.add_argument("--workers", type=int, help="Worker threads. Defaults to TATUM_WITHDRAWAL_WORKERS.")
+        parser.add_argument("--batch-size", type=int, help="Most recipients merged into one UTXO withdrawal.")
+
+    def handle(self, *args, **options):
+        queue = WithdrawalQueue(batch_size=options["batch_size"])
+        if options["once"]:
+            for status, count in sorted(queue.drain().items()):
+                self.stdout.write(f"{status}: {count}")
+            return
+        pool = WithdrawalWorkerPool(queue, options["workers"])
+        pool.start()
+        try:
+            pool.join()
+        except KeyboardInterrupt:
+            pool.stop()
@@ -0,0 +1,115 @@
+# Generated by Django 4.2.30 on 2026-10-17 13:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blockage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tatum_id', models.CharField(max_length=64, unique=True)),
+                ('amount', models.DecimalField(decimal_places=18, max_digits=60)),
+                ('type', models.CharField(blank=True, max_length=100)),
+                ('description', models.CharField(blank=True, max_length=300)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Customer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tatum_id', models.CharField(max_length=64, unique=True)),
+                ('external_id', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('accounting_currency', models.CharField(blank=True, max_length=10)),
+                ('customer_country', models.CharField(blank=True, max_length=2)),
+                ('provider_country', models.CharField(blank=True, max_length=2)),
+                ('active', models.BooleanField(default=True)),
+                ('enabled', models.BooleanField(default=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VirtualAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tatum_id', models.CharField(max_length=64, unique=True)),
+                ('currency', models.CharField(db_index=True, max_length=40)),
+                ('account_code', models.CharField(blank=True, max_length=50)),
+                ('account_number', models.CharField(blank=True, db_index=True, max_length=50)),
+                ('accounting_currency', models.CharField(blank=True, max_length=10)),
+                ('xpub', models.TextField(blank=True)),
+                ('active', models.BooleanField(default=True)),
+                ('frozen', models.BooleanField(default=False)),
+                ('account_balance', models.DecimalField(decimal_places=18, default=0, max_digits=60)),
+                ('available_balance', models.DecimalField(decimal_places=18, default=0, max_digits=60)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.ForeignKey(
+                    blank=True,
+                    null=True,
+                    on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='accounts',
+                    to='tatum.customer',
+                )),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LedgerTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference', models.CharField(db_index=True, max_length=100)),
+                ('account_tatum_id', models.CharField(db_index=True, max_length=64)),
+                ('counter_account_tatum_id', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('currency', models.CharField(db_index=True, max_length=40)),
+                ('amount', models.DecimalField(decimal_places=18, max_digits=60)),
+                ('operation_type', models.CharField(blank=True, max_length=50)),
+                ('transaction_type', models.CharField(blank=True, max_length=50)),
+                ('transaction_code', models.CharField(blank=True, max_length=100)),
+                ('payment_id', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('recipient_note', models.CharField(blank=True, max_length=500)),
+                ('sender_note', models.CharField(blank=True, max_length=500)),
+                ('tx_id', models.CharField(blank=True, max_length=200)),
+                ('anonymous', models.BooleanField(default=False)),
+                ('created', models.DateTimeField(db_index=True)),
+                ('raw', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-created'],
+                'indexes': [models.Index(fields=['account_tatum_id', '-created'], name='tatum_ledge_account_4b6f9e_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ledgertransaction',
+            constraint=models.UniqueConstraint(
+                fields=('reference', 'account_tatum_id'), name='tatum_ledgertransaction_unique_side',
+            ),
+        ),
+        migrations.AddField(
+            model_name='blockage',
+            name='account',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, related_name='blockages', to='tatum.virtualaccount',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='virtualaccount',
+            index=models.Index(fields=['customer', 'currency'], name='tatum_virtu_custome_7e44dd_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tatum', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PooledAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=40)),
+                ('account_tatum_id', models.CharField(max_length=64, unique=True)),
+                ('xpub', models.TextField(blank=True)),
+                ('address', models.CharField(blank=True, max_length=200)),
+                ('derivation_key', models.BigIntegerField(blank=True, null=True)),
+                ('address_data', models.JSONField(default=dict)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('claimed_by', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        condition=models.Q(('claimed_at__isnull', True)),
+                        fields=['currency', 'id'],
+                        name='tatum_pooledaccount_free',
+                    ),
+                ],
+            },
+        ),
+    ]
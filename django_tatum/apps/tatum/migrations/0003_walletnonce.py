@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 13:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tatum', '0002_pooledaccount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletNonce',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain', models.CharField(max_length=20)),
+                ('address', models.CharField(max_length=100)),
+                ('next_nonce', models.BigIntegerField(blank=True, null=True)),
+                ('released', models.JSONField(default=list)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='walletnonce',
+            constraint=models.UniqueConstraint(fields=('chain', 'address'), name='tatum_walletnonce_unique_address'),
+        ),
+    ]
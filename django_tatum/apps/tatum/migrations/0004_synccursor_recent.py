@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tatum', '0003_walletnonce'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='synccursor',
+            name='recent',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-17 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tatum', '0004_synccursor_recent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Withdrawal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=64, unique=True)),
+                ('payment_id', models.CharField(max_length=100)),
+                ('sender_account_id', models.CharField(max_length=64)),
+                ('currency', models.CharField(max_length=40)),
+                ('address', models.CharField(max_length=200)),
+                ('amount', models.DecimalField(decimal_places=18, max_digits=60)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(
+                    choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')],
+                    default='PENDING',
+                    max_length=10,
+                )),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('sent_payment_id', models.CharField(blank=True, max_length=100)),
+                ('withdrawal_tatum_id', models.CharField(blank=True, max_length=64)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('response', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='tatum_withdrawal_status')],
+            },
+        ),
+    ]
@@ -1,3 +1,197 @@
+"""Local mirror of the Tatum virtual account ledger.
+
+The rows are written by the sync engine in `sync.py` and keep the Tatum identifiers, so
+lookups and reports can be served from the database instead of the Tatum API. Amounts
+are stored as decimals wide enough for 18-decimal tokens.
+"""
 from django.db import models
 
-# Create your models here.
+# Precision of every mirrored amount.
+AMOUNT_MAX_DIGITS = 60
+AMOUNT_DECIMAL_PLACES = 18
+
+
+class Customer(models.Model):
+    """A Tatum ledger customer."""
+
+    tatum_id = models.CharField(max_length=64, unique=True)
+    external_id = models.CharField(max_length=100, blank=True, db_index=True)
+    accounting_currency = models.CharField(max_length=10, blank=True)
+    customer_country = models.CharField(max_length=2, blank=True)
+    provider_country = models.CharField(max_length=2, blank=True)
+    active = models.BooleanField(default=True)
+    enabled = models.BooleanField(default=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.external_id or self.tatum_id
+
+
+class VirtualAccount(models.Model):
+    """A Tatum virtual account and its last synced balance."""
+
+    tatum_id = models.CharField(max_length=64, unique=True)
+    customer = models.ForeignKey(Customer, null=True, blank=True, on_delete=models.SET_NULL, related_name="accounts")
+    currency = models.CharField(max_length=40, db_index=True)
+    account_code = models.CharField(max_length=50, blank=True)
+    account_number = models.CharField(max_length=50, blank=True, db_index=True)
+    accounting_currency = models.CharField(max_length=10, blank=True)
+    xpub = models.TextField(blank=True)
+    active = models.BooleanField(default=True)
+    frozen = models.BooleanField(default=False)
+    account_balance = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, default=0)
+    available_balance = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, default=0)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["customer", "currency"])]
+
+    def __str__(self):
+        return f"{self.tatum_id} ({self.currency})"
+
+
+class Blockage(models.Model):
+    """An amount blocked on a virtual account."""
+
+    tatum_id = models.CharField(max_length=64, unique=True)
+    account = models.ForeignKey(VirtualAccount, on_delete=models.CASCADE, related_name="blockages")
+    amount = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES)
+    type = models.CharField(max_length=100, blank=True)
+    description = models.CharField(max_length=300, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.amount} on {self.account_id}"
+
+
+class LedgerTransaction(models.Model):
+    """An immutable ledger transaction, as seen from one account.
+
+    A transfer appears once for the sender and once for the recipient account, under the
+    same reference.
+    """
+
+    reference = models.CharField(max_length=100, db_index=True)
+    account_tatum_id = models.CharField(max_length=64, db_index=True)
+    counter_account_tatum_id = models.CharField(max_length=64, blank=True, db_index=True)
+    currency = models.CharField(max_length=40, db_index=True)
+    amount = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES)
+    operation_type = models.CharField(max_length=50, blank=True)
+    transaction_type = models.CharField(max_length=50, blank=True)
+    transaction_code = models.CharField(max_length=100, blank=True)
+    payment_id = models.CharField(max_length=100, blank=True, db_index=True)
+    recipient_note = models.CharField(max_length=500, blank=True)
+    sender_note = models.CharField(max_length=500, blank=True)
+    tx_id = models.CharField(max_length=200, blank=True)
+    anonymous = models.BooleanField(default=False)
+    created = models.DateTimeField(db_index=True)
+    raw = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["reference", "account_tatum_id"], name="tatum_ledgertransaction_unique_side")
+        ]
+        indexes = [models.Index(fields=["account_tatum_id", "-created"])]
+        ordering = ["-created"]
+
+    def __str__(self):
+        return self.reference
+
+
+class SyncCursor(models.Model):
+    """High-water mark of an incremental sync stream."""
+
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    # References already delivered near the high-water mark, with their positions.
+    recent = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}@{self.position}"
+
+
+class PooledAccount(models.Model):
+    """A virtual account with a deposit address, provisioned ahead of demand.
+
+    Rows are created by the pool refiller without an address first, so an interrupted
+    refill can be completed later; only rows with an address can be claimed.
+    """
+
+    currency = models.CharField(max_length=40)
+    account_tatum_id = models.CharField(max_length=64, unique=True)
+    xpub = models.TextField(blank=True)
+    address = models.CharField(max_length=200, blank=True)
+    derivation_key = models.BigIntegerField(null=True, blank=True)
+    address_data = models.JSONField(default=dict)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    claimed_by = models.CharField(max_length=100, blank=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["currency", "id"],
+                condition=models.Q(claimed_at__isnull=True),
+                name="tatum_pooledaccount_free",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.currency} {self.address or self.account_tatum_id}"
+
+
+class WalletNonce(models.Model):
+    """Nonce allocation state of a sending address, see `nonces.DatabaseNonceStore`."""
+
+    chain = models.CharField(max_length=20)
+    address = models.CharField(max_length=100)
+    next_nonce = models.BigIntegerField(null=True, blank=True)
+    released = models.JSONField(default=list)
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["chain", "address"], name="tatum_walletnonce_unique_address")]
+
+    def __str__(self):
+        return f"{self.chain} {self.address}: {self.next_nonce}"
+
+
+class Withdrawal(models.Model):
+    """A queued withdrawal, sent to Tatum by the workers of `withdrawals.WithdrawalQueue`.
+
+    `idempotency_key` is derived from the sender and `paymentId`, so enqueuing the same
+    payout twice yields the same row. `sent_payment_id` is the `paymentId` the withdrawal
+    went out under, its own or its batch's, and is what a retry checks the ledger for
+    before sending again.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        SENDING = "SENDING"
+        SENT = "SENT"
+        FAILED = "FAILED"
+
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    payment_id = models.CharField(max_length=100)
+    sender_account_id = models.CharField(max_length=64)
+    currency = models.CharField(max_length=40)
+    address = models.CharField(max_length=200)
+    amount = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    sent_payment_id = models.CharField(max_length=100, blank=True)
+    withdrawal_tatum_id = models.CharField(max_length=64, blank=True)
+    reference = models.CharField(max_length=100, blank=True)
+    response = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"], name="tatum_withdrawal_status")]
+
+    def __str__(self):
+        return f"{self.amount} {self.currency} to {self.address} ({self.status})"
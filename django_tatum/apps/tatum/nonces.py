@@ -0,0 +1,45 @@
+"""Database-backed nonce store, for nonce managers shared across hosts.
+
+`DatabaseNonceStore` keeps each address's allocation state in a `WalletNonce` row and locks
+it with SELECT ... FOR UPDATE for the duration of an allocation, so every process using the
+same database hands out distinct nonces.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from typing import Iterator
+
+from django.db import transaction
+
+from django_tatum.apps.tatum.tatum_client.smart_contracts.nonce import NonceState
+from django_tatum.apps.tatum.tatum_client.smart_contracts.nonce import NonceStore
+
+from .models import WalletNonce
+
+
+class DatabaseNonceStore(NonceStore):
+    """Nonce states kept in the database, locked per row.
+
+    Args:
+        using (str, optional): The database alias. Defaults to the default database.
+    """
+
+    def __init__(self, using: str = None):
+        self.using = using
+
+    @contextmanager
+    def locked(self, chain: str, address: str) -> Iterator[NonceState]:
+        chain, address = chain.upper(), address.lower()
+        with transaction.atomic(using=self.using):
+            WalletNonce.objects.using(self.using).get_or_create(chain=chain, address=address)
+            row = WalletNonce.objects.using(self.using).select_for_update().get(chain=chain, address=address)
+            state: NonceState = {
+                "next": row.next_nonce,
+                "released": list(row.released),
+                "synced_at": row.synced_at.timestamp() if row.synced_at else 0.0,
+            }
+            yield state
+            row.next_nonce = state["next"]
+            row.released = state["released"]
+            row.synced_at = datetime.fromtimestamp(state["synced_at"], tz=timezone.utc) if state["synced_at"] else None
+            row.save(update_fields=["next_nonce", "released", "synced_at"])
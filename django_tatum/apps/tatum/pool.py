@@ -0,0 +1,269 @@
+"""Pre-provisioned virtual accounts with deposit addresses, kept per currency.
+
+Creating an account and assigning it an address takes two serial Tatum calls, which used
+to sit on the signup path. `AccountPool` keeps a stock of ready `PooledAccount` rows per
+currency instead, so onboarding claims one with a single local update. `PoolRefiller` tops
+each pool back up to its target in the background, in bulk, whenever it falls below its
+low-water mark.
+
+The pools are configured in `settings.TATUM_ACCOUNT_POOLS`, by currency::
+
+    TATUM_ACCOUNT_POOLS = {
+        "ETH": {"xpub": "xpub6E...", "low_water": 20, "target": 100},
+        "BTC": {"xpub": "xpub6D...", "accountingCurrency": "USD"},
+    }
+
+`low_water` and `target` default to TATUM_POOL_LOW_WATER and TATUM_POOL_TARGET.
+"""
+import logging
+import threading
+from datetime import timedelta
+from typing import Iterable
+from typing import Optional
+from typing import TypedDict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db import transaction
+from django.utils.timezone import now
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.account import TatumVirtualAccounts
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.blockchain_address import TatumBlockchainAdress
+
+from .models import PooledAccount
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSpec(TypedDict, total=False):
+    xpub: str
+    accountingCurrency: str
+    low_water: int
+    target: int
+
+
+def pool_specs() -> dict[str, PoolSpec]:
+    """The configured pools by currency."""
+    return getattr(settings, "TATUM_ACCOUNT_POOLS", {})
+
+
+class AccountPool:
+    """Claim and refill pooled accounts.
+
+    Args:
+        specs (dict[str, PoolSpec], optional): The pools by currency. Defaults to
+            settings.TATUM_ACCOUNT_POOLS.
+        accounts (TatumVirtualAccounts, optional): Client creating the accounts.
+        addresses (TatumBlockchainAdress, optional): Client assigning the deposit addresses.
+    """
+
+    def __init__(
+        self,
+        specs: dict[str, PoolSpec] = None,
+        accounts: TatumVirtualAccounts = None,
+        addresses: TatumBlockchainAdress = None,
+    ):
+        self.specs = pool_specs() if specs is None else specs
+        self.accounts = accounts or TatumVirtualAccounts()
+        self.addresses = addresses or TatumBlockchainAdress()
+        # Set when a claim leaves a pool below its low-water mark; watched by PoolRefiller.
+        self.low = threading.Event()
+
+    def _spec(self, currency: str) -> PoolSpec:
+        try:
+            return self.specs[currency]
+        except KeyError:
+            raise ValueError(f"No account pool is configured for {currency}.") from None
+
+    def low_water(self, currency: str) -> int:
+        return self._spec(currency).get("low_water", conf.TATUM_POOL_LOW_WATER)
+
+    def target(self, currency: str) -> int:
+        return self._spec(currency).get("target", conf.TATUM_POOL_TARGET)
+
+    def available(self, currency: str) -> int:
+        """Number of ready, unclaimed accounts of a currency."""
+        return PooledAccount.objects.filter(currency=currency, claimed_at__isnull=True).exclude(address="").count()
+
+    def claim(self, currency: str, claimed_by: str = "", provision: bool = True) -> Optional[PooledAccount]:
+        """Hand out a ready account of `currency`, exactly once.
+
+        Concurrent claims skip rows locked by each other (SELECT ... FOR UPDATE SKIP LOCKED),
+        and the claim itself is a conditional update, so a row is never handed out twice on
+        databases without row locks either.
+
+        Args:
+            currency (str): The pool to claim from.
+            claimed_by (str, optional): Reference of the claimant, e.g. a customer external ID.
+            provision (bool, optional): Provision an account with live Tatum calls when the
+                pool is empty. Defaults to True; when False, None is returned instead.
+
+        Returns:
+            Optional[PooledAccount]: The claimed account.
+        """
+        self._spec(currency)
+        while True:
+            with transaction.atomic():
+                entry = (
+                    PooledAccount.objects.select_for_update(skip_locked=True)
+                    .filter(currency=currency, claimed_at__isnull=True)
+                    .exclude(address="")
+                    .order_by("id")
+                    .first()
+                )
+                if entry is None:
+                    break
+                entry.claimed_at = now()
+                entry.claimed_by = claimed_by
+                claimed = PooledAccount.objects.filter(pk=entry.pk, claimed_at__isnull=True).update(
+                    claimed_at=entry.claimed_at, claimed_by=claimed_by
+                )
+            if claimed:
+                if self.available(currency) < self.low_water(currency):
+                    self.low.set()
+                return entry
+        self.low.set()
+        if not provision:
+            return None
+        logger.warning("The %s account pool is empty; provisioning an account on demand", currency)
+        for entry in self._provision(currency, 1):
+            if PooledAccount.objects.filter(pk=entry.pk, claimed_at__isnull=True).update(claimed_at=now(), claimed_by=claimed_by):
+                entry.refresh_from_db()
+                return entry
+        return None
+
+    def _provision(self, currency: str, count: int) -> list[PooledAccount]:
+        """Create `count` accounts with addresses and store them unclaimed."""
+        spec = self._spec(currency)
+        account = {"currency": currency}
+        for field in ("xpub", "accountingCurrency"):
+            if spec.get(field):
+                account[field] = spec[field]
+        results = self.accounts.create_accounts_in_bulk([dict(account) for _ in range(count)])
+        created = [result["result"] for result in results if result["ok"]]
+        for result in results:
+            if not result["ok"]:
+                logger.warning("Could not create a pooled %s account: %s", currency, result["error"])
+        PooledAccount.objects.bulk_create(
+            [
+                PooledAccount(currency=currency, account_tatum_id=record["id"], xpub=record.get("xpub") or "")
+                for record in created
+            ],
+            ignore_conflicts=True,
+        )
+        return self._assign_addresses(currency, [record["id"] for record in created])
+
+    def _assign_addresses(self, currency: str, account_ids: Iterable[str] = None) -> list[PooledAccount]:
+        """Give pooled accounts of `currency` lacking one a deposit address.
+
+        Args:
+            currency (str): The pool.
+            account_ids (Iterable[str], optional): The accounts just created by the caller.
+                Defaults to the accounts left without an address for more than
+                TATUM_POOL_RECOVER_AFTER seconds, so rows still being provisioned by another
+                caller are never given a second address.
+        """
+        rows = PooledAccount.objects.filter(currency=currency, address="")
+        if account_ids is None:
+            rows = rows.filter(created_at__lt=now() - timedelta(seconds=conf.TATUM_POOL_RECOVER_AFTER))
+        else:
+            rows = rows.filter(account_tatum_id__in=list(account_ids))
+        pending = {entry.account_tatum_id: entry for entry in rows}
+        if not pending:
+            return []
+        addresses = self.addresses.create_deposit_addresses(list(pending), raise_on_error=False)
+        ready = []
+        for account_id, address in addresses.items():
+            entry = pending[account_id]
+            entry.address = address.get("address") or ""
+            entry.derivation_key = address.get("derivationKey")
+            entry.address_data = address
+            ready.append(entry)
+        PooledAccount.objects.bulk_update(ready, ["address", "derivation_key", "address_data"])
+        return [entry for entry in ready if entry.address]
+
+    def refill(self, currency: str) -> int:
+        """Top a pool up to its target once it is below its low-water mark.
+
+        Accounts left without an address by an interrupted refill, for more than
+        TATUM_POOL_RECOVER_AFTER seconds, are completed first.
+
+        Returns:
+            int: The number of accounts made ready.
+        """
+        ready = len(self._assign_addresses(currency))
+        available = self.available(currency)
+        if available >= self.low_water(currency):
+            return ready
+        return ready + len(self._provision(currency, self.target(currency) - available))
+
+    def refill_all(self) -> dict[str, int]:
+        """Refill every configured pool. Returns the accounts made ready by currency."""
+        self.low.clear()
+        stats = {}
+        for currency in self.specs:
+            try:
+                stats[currency] = self.refill(currency)
+            except Exception:
+                logger.exception("Failed to refill the %s account pool", currency)
+        return stats
+
+
+class PoolRefiller:
+    """Background thread keeping the pools above their low-water marks.
+
+    It refills every `interval` seconds, and straight away when a claim leaves a pool low.
+
+    Args:
+        pool (AccountPool, optional): The pools to refill. Defaults to the process-wide pool.
+        interval (float, optional): Seconds between two periodic checks. Defaults to
+            TATUM_POOL_REFILL_INTERVAL.
+    """
+
+    def __init__(self, pool: AccountPool = None, interval: float = None):
+        self.pool = pool or get_account_pool()
+        self.interval = conf.TATUM_POOL_REFILL_INTERVAL if interval is None else interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="tatum-pool-refiller", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        self.pool.low.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self.pool.refill_all()
+            finally:
+                close_old_connections()
+            self.pool.low.wait(self.interval)
+
+
+_default_pool: AccountPool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_account_pool() -> AccountPool:
+    """Return the process-wide account pool, configured from settings."""
+    global _default_pool
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = AccountPool()
+    return _default_pool
+
+
+def set_account_pool(pool: AccountPool):
+    """Replace the process-wide account pool."""
+    global _default_pool
+    with _default_pool_lock:
+        _default_pool = pool
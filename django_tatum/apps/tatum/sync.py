@@ -0,0 +1,321 @@
+"""Sync engine keeping the ledger mirror in `models.py` up to date.
+
+Customers and accounts are streamed page by page from Tatum and upserted in bulk, so a
+full pass keeps a flat memory profile. Ledger transactions are synced incrementally from
+a `SyncCursor` high-water mark. The accounts they touched get their balances refreshed,
+so routine runs cost a handful of calls instead of a full ledger scan.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone
+from decimal import Decimal
+from typing import Iterable
+from typing import Iterator
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.account import TatumVirtualAccounts
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.customer.customer import TatumCustomer
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.transaction import TatumTransactions
+
+from .models import Blockage
+from .models import Customer
+from .models import LedgerTransaction
+from .models import SyncCursor
+from .models import VirtualAccount
+
+logger = logging.getLogger(__name__)
+
+TRANSACTIONS_CURSOR = "ledger_transactions"
+
+
+def _batches(records: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value)) if value is not None else Decimal(0)
+
+
+def _from_millis(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+class LedgerSync:
+    """Mirror Tatum customers, accounts, blockages and transactions into the database.
+
+    Args:
+        accounts (TatumVirtualAccounts, optional): Client for the account calls.
+        customers (TatumCustomer, optional): Client for the customer calls.
+        transactions (TatumTransactions, optional): Client for the transaction calls.
+        batch_size (int, optional): Rows written per bulk statement. Defaults to 500.
+        overlap_seconds (float, optional): How far before the last high-water mark the next
+            transaction sync starts, to catch transactions committed late. Defaults to 300.
+    """
+
+    def __init__(
+        self,
+        accounts: TatumVirtualAccounts = None,
+        customers: TatumCustomer = None,
+        transactions: TatumTransactions = None,
+        batch_size: int = 500,
+        overlap_seconds: float = 300,
+    ):
+        self.accounts = accounts or TatumVirtualAccounts()
+        self.customers = customers or TatumCustomer()
+        self.transactions = transactions or TatumTransactions()
+        self.batch_size = batch_size
+        self.overlap_ms = int(overlap_seconds * 1000)
+
+    def _upsert_customers(self, records: list[dict]):
+        Customer.objects.bulk_create(
+            [
+                Customer(
+                    tatum_id=record["id"],
+                    external_id=record.get("externalId") or "",
+                    accounting_currency=record.get("accountingCurrency") or "",
+                    customer_country=record.get("customerCountry") or "",
+                    provider_country=record.get("providerCountry") or "",
+                    active=record.get("active", True),
+                    enabled=record.get("enabled", True),
+                )
+                for record in records
+            ],
+            update_conflicts=True,
+            unique_fields=["tatum_id"],
+            update_fields=[
+                "external_id",
+                "accounting_currency",
+                "customer_country",
+                "provider_country",
+                "active",
+                "enabled",
+                "synced_at",
+            ],
+        )
+
+    def sync_customers(self) -> int:
+        """Upsert every Tatum customer. Returns the number of customers synced."""
+        count = 0
+        for batch in _batches(self.customers.iter_customers(), self.batch_size):
+            self._upsert_customers(batch)
+            count += len(batch)
+        return count
+
+    def _customer_pks(self, tatum_ids: set[str], max_workers: int = 8) -> dict[str, int]:
+        """Primary keys of the given customers; unknown ones are fetched from Tatum and mirrored first.
+
+        A customer Tatum does not return is stored as a placeholder, completed by the next
+        full sync.
+        """
+        tatum_ids.discard(None)
+        known = set(Customer.objects.filter(tatum_id__in=tatum_ids).values_list("tatum_id", flat=True))
+        missing = [id for id in tatum_ids if id not in known]
+        if missing:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                records = list(executor.map(self.customers.get_customer_details, missing))
+            found = [record for record in records if isinstance(record, dict) and record.get("id")]
+            self._upsert_customers(found)
+            placeholders = set(missing) - {record["id"] for record in found}
+            if placeholders:
+                logger.warning("Could not fetch %s customers, storing placeholders: %s", len(placeholders), placeholders)
+                Customer.objects.bulk_create([Customer(tatum_id=id) for id in placeholders], ignore_conflicts=True)
+        return dict(Customer.objects.filter(tatum_id__in=tatum_ids).values_list("tatum_id", "pk"))
+
+    def _upsert_accounts(self, records: list[dict]):
+        customer_pks = self._customer_pks({record.get("customerId") for record in records})
+        VirtualAccount.objects.bulk_create(
+            [
+                VirtualAccount(
+                    tatum_id=record["id"],
+                    customer_id=customer_pks.get(record.get("customerId")),
+                    currency=record.get("currency") or "",
+                    account_code=record.get("accountCode") or "",
+                    account_number=record.get("accountNumber") or "",
+                    accounting_currency=record.get("accountingCurrency") or "",
+                    xpub=record.get("xpub") or "",
+                    active=record.get("active", True),
+                    frozen=record.get("frozen", False),
+                    account_balance=_decimal((record.get("balance") or {}).get("accountBalance")),
+                    available_balance=_decimal((record.get("balance") or {}).get("availableBalance")),
+                )
+                for record in records
+            ],
+            update_conflicts=True,
+            unique_fields=["tatum_id"],
+            update_fields=[
+                "customer",
+                "currency",
+                "account_code",
+                "account_number",
+                "accounting_currency",
+                "xpub",
+                "active",
+                "frozen",
+                "account_balance",
+                "available_balance",
+                "synced_at",
+            ],
+        )
+
+    def sync_accounts(self, max_workers: int = 8) -> int:
+        """Upsert every Tatum virtual account with its balance. Returns the number synced."""
+        count = 0
+        records = self.accounts.iter_virtual_accounts_parallel(max_workers=max_workers)
+        for batch in _batches(records, self.batch_size):
+            self._upsert_accounts(batch)
+            count += len(batch)
+        return count
+
+    def sync_new_accounts(self, account_ids: Iterable[str], max_workers: int = 8) -> int:
+        """Fetch and mirror the given accounts that are not mirrored yet. Returns the number added.
+
+        Accounts Tatum answers with an error for are skipped and logged; they are retried on
+        the next run that sees them.
+        """
+        account_ids = list(account_ids)
+        known = set(VirtualAccount.objects.filter(tatum_id__in=account_ids).values_list("tatum_id", flat=True))
+        missing = [account_id for account_id in account_ids if account_id not in known]
+        if not missing:
+            return 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fetched = list(zip(missing, executor.map(self.accounts.get_account_by_id, missing)))
+        records = [record for _, record in fetched if isinstance(record, dict) and record.get("id")]
+        skipped = {account_id: record for account_id, record in fetched if not (isinstance(record, dict) and record.get("id"))}
+        if skipped:
+            logger.warning("Could not fetch %s new accounts: %s", len(skipped), skipped)
+        for batch in _batches(records, self.batch_size):
+            self._upsert_accounts(batch)
+        return len(records)
+
+    def sync_blockages(self, account_ids: Iterable[str] = None) -> int:
+        """Replace the mirrored blockages of the given accounts (all mirrored accounts by default).
+
+        Returns:
+            int: The number of blockages now mirrored for those accounts.
+        """
+        accounts = VirtualAccount.objects.all()
+        if account_ids is not None:
+            accounts = accounts.filter(tatum_id__in=list(account_ids))
+        count = 0
+        for account_pk, tatum_id in accounts.values_list("pk", "tatum_id").iterator():
+            blockages = [
+                Blockage(
+                    tatum_id=record["id"],
+                    account_id=account_pk,
+                    amount=_decimal(record.get("amount")),
+                    type=record.get("type") or "",
+                    description=record.get("description") or "",
+                )
+                for record in self.accounts.iter_blocked_amounts(tatum_id)
+            ]
+            with transaction.atomic():
+                Blockage.objects.filter(account_id=account_pk).exclude(
+                    tatum_id__in=[blockage.tatum_id for blockage in blockages]
+                ).delete()
+                Blockage.objects.bulk_create(
+                    blockages,
+                    update_conflicts=True,
+                    unique_fields=["tatum_id"],
+                    update_fields=["amount", "type", "description", "synced_at"],
+                )
+            count += len(blockages)
+        return count
+
+    def sync_transactions(self) -> set[str]:
+        """Mirror the ledger transactions created since the last run.
+
+        The window starts `overlap_seconds` before the stored high-water mark and ends when
+        the sync starts; the high-water mark only moves once the whole window was read.
+
+        Returns:
+            set[str]: Tatum IDs of the accounts the new transactions touched.
+        """
+        cursor, _ = SyncCursor.objects.get_or_create(name=TRANSACTIONS_CURSOR)
+        window_end = int(time.time() * 1000)
+        window = {"from": max(cursor.position - self.overlap_ms, 0), "to": window_end}
+        touched = set()
+        records = self.transactions.iter_transactions_within_ledger(window)
+        for batch in _batches(records, self.batch_size):
+            LedgerTransaction.objects.bulk_create(
+                [
+                    LedgerTransaction(
+                        reference=record["reference"],
+                        account_tatum_id=record["accountId"],
+                        counter_account_tatum_id=record.get("counterAccountId") or "",
+                        currency=record.get("currency") or "",
+                        amount=_decimal(record.get("amount")),
+                        operation_type=record.get("operationType") or "",
+                        transaction_type=record.get("transactionType") or "",
+                        transaction_code=record.get("transactionCode") or "",
+                        payment_id=record.get("paymentId") or "",
+                        recipient_note=record.get("recipientNote") or "",
+                        sender_note=record.get("senderNote") or "",
+                        tx_id=record.get("txId") or "",
+                        anonymous=record.get("anonymous", False),
+                        created=_from_millis(record["created"]),
+                        raw=record,
+                    )
+                    for record in batch
+                ],
+                ignore_conflicts=True,
+            )
+            touched.update(record["accountId"] for record in batch)
+        cursor.position = window_end
+        cursor.save(update_fields=["position", "updated_at"])
+        return touched
+
+    def refresh_balances(self, account_ids: Iterable[str], max_workers: int = 8) -> int:
+        """Fetch the current balances of mirrored accounts. Returns the number of accounts updated."""
+        accounts = VirtualAccount.objects.filter(tatum_id__in=list(account_ids))
+        accounts = {account.tatum_id: account for account in accounts}
+        if not accounts:
+            return 0
+        balances = self.accounts.get_account_balances(accounts, max_workers, use_cache=False, raise_on_error=False)
+        synced_at = now()
+        for tatum_id, balance in balances.items():
+            accounts[tatum_id].account_balance = _decimal(balance.get("accountBalance"))
+            accounts[tatum_id].available_balance = _decimal(balance.get("availableBalance"))
+            accounts[tatum_id].synced_at = synced_at
+        updated = [accounts[tatum_id] for tatum_id in balances]
+        VirtualAccount.objects.bulk_update(
+            updated,
+            ["account_balance", "available_balance", "synced_at"],
+            batch_size=self.batch_size,
+        )
+        return len(updated)
+
+    def run(self, full: bool = False, blockages: bool = False) -> dict[str, int]:
+        """Run a sync pass.
+
+        Args:
+            full (bool, optional): Also re-read every customer and account. Defaults to False,
+                which only syncs new transactions and the balances they changed.
+            blockages (bool, optional): Also resync the blockages of every mirrored account.
+                Defaults to False.
+
+        Returns:
+            dict[str, int]: The number of rows synced per kind.
+        """
+        stats = {}
+        if full:
+            stats["customers"] = self.sync_customers()
+            stats["accounts"] = self.sync_accounts()
+        touched = self.sync_transactions()
+        stats["touched_accounts"] = len(touched)
+        if not full:
+            stats["new_accounts"] = self.sync_new_accounts(touched)
+            stats["balances"] = self.refresh_balances(touched)
+        if blockages:
+            stats["blockages"] = self.sync_blockages()
+        return stats
@@ -0,0 +1,164 @@
+"""Runtime configuration for the Tatum client.
+
+Every value can be overridden from the environment (or the project's .env file),
+in the same way the credentials in `creds.py` are loaded.
+"""
+from decouple import Csv
+from decouple import config
+
+# HTTP CONNECTION POOL
+# ------------------------------------------------------------------------------
+# Number of distinct hosts whose connection pools are kept alive.
+TATUM_HTTP_POOL_CONNECTIONS: int = config("TATUM_HTTP_POOL_CONNECTIONS", default=10, cast=int)
+# Maximum number of kept-alive connections per host.
+TATUM_HTTP_POOL_MAXSIZE: int = config("TATUM_HTTP_POOL_MAXSIZE", default=20, cast=int)
+# When True, callers wait for a free pooled connection instead of opening a throwaway one.
+TATUM_HTTP_POOL_BLOCK: bool = config("TATUM_HTTP_POOL_BLOCK", default=False, cast=bool)
+# Default (connect, read) timeout in seconds applied to every request.
+TATUM_HTTP_TIMEOUT: float = config("TATUM_HTTP_TIMEOUT", default=30.0, cast=float)
+
+# ASYNC HTTP CONNECTION POOL
+# ------------------------------------------------------------------------------
+# Maximum number of simultaneous connections held by the shared aiohttp session.
+TATUM_ASYNC_POOL_LIMIT: int = config("TATUM_ASYNC_POOL_LIMIT", default=500, cast=int)
+# Maximum number of simultaneous connections per host for the shared aiohttp session.
+TATUM_ASYNC_POOL_MAXSIZE: int = config("TATUM_ASYNC_POOL_MAXSIZE", default=200, cast=int)
+# Seconds an idle async connection is kept alive for reuse.
+TATUM_ASYNC_KEEPALIVE_TIMEOUT: float = config("TATUM_ASYNC_KEEPALIVE_TIMEOUT", default=30.0, cast=float)
+
+# RATE LIMITING & RETRIES
+# ------------------------------------------------------------------------------
+# Sustained requests per second allowed towards Tatum. 0 disables the token bucket.
+TATUM_RATE_LIMIT: float = config("TATUM_RATE_LIMIT", default=5.0, cast=float)
+# Number of requests that may be sent back to back before the rate limit applies.
+TATUM_RATE_BURST: int = config("TATUM_RATE_BURST", default=5, cast=int)
+# Retries for 429 responses and, on idempotent verbs, for 5xx responses and connection errors.
+TATUM_MAX_RETRIES: int = config("TATUM_MAX_RETRIES", default=3, cast=int)
+# Base and cap, in seconds, of the exponential backoff between retries.
+TATUM_BACKOFF_BASE: float = config("TATUM_BACKOFF_BASE", default=0.5, cast=float)
+TATUM_BACKOFF_MAX: float = config("TATUM_BACKOFF_MAX", default=30.0, cast=float)
+
+# RESPONSE CACHE
+# ------------------------------------------------------------------------------
+# "locmem" for the in-process LRU cache, "django" for a Django cache backend, "none" to disable.
+TATUM_CACHE_BACKEND: str = config("TATUM_CACHE_BACKEND", default="locmem")
+# Alias in settings.CACHES used by the "django" backend.
+TATUM_CACHE_DJANGO_ALIAS: str = config("TATUM_CACHE_DJANGO_ALIAS", default="default")
+# Maximum number of entries kept by the in-process LRU cache.
+TATUM_CACHE_MAXSIZE: int = config("TATUM_CACHE_MAXSIZE", default=10000, cast=int)
+# Seconds each kind of lookup stays cached. Transactions found by reference never change and never expire.
+TATUM_CACHE_TTL_ACCOUNT: float = config("TATUM_CACHE_TTL_ACCOUNT", default=30.0, cast=float)
+TATUM_CACHE_TTL_BALANCE: float = config("TATUM_CACHE_TTL_BALANCE", default=5.0, cast=float)
+TATUM_CACHE_TTL_CUSTOMER: float = config("TATUM_CACHE_TTL_CUSTOMER", default=60.0, cast=float)
+
+# REQUEST COALESCING
+# ------------------------------------------------------------------------------
+# Comma separated glob patterns, relative to the Tatum base URL and matched one path segment
+# at a time, of the GET endpoints whose identical concurrent requests share one in-flight
+# request. Defaults to the account and balance lookups. Leave empty to disable.
+TATUM_COALESCE_ENDPOINTS: list[str] = config(
+    "TATUM_COALESCE_ENDPOINTS",
+    default="ledger/account/*,ledger/account/*/balance",
+    cast=Csv(),
+)
+
+# JSON CODEC
+# ------------------------------------------------------------------------------
+# "auto" picks the fastest installed codec (orjson, then msgspec, then the standard library).
+# "orjson", "msgspec" or "json" force a specific one.
+TATUM_JSON_CODEC: str = config("TATUM_JSON_CODEC", default="auto")
+
+# PAYMENT BATCHING
+# ------------------------------------------------------------------------------
+# Maximum number of payments folded into one ledger batch payment.
+TATUM_PAYMENT_BATCH_SIZE: int = config("TATUM_PAYMENT_BATCH_SIZE", default=50, cast=int)
+# Seconds the first payment of a batch waits for more payments from the same sender.
+TATUM_PAYMENT_BATCH_WAIT: float = config("TATUM_PAYMENT_BATCH_WAIT", default=0.05, cast=float)
+
+# BULK CALLS
+# ------------------------------------------------------------------------------
+# Largest number of accounts sent in one ledger/account/batch call.
+TATUM_ACCOUNT_BATCH_SIZE: int = config("TATUM_ACCOUNT_BATCH_SIZE", default=50, cast=int)
+# Chunks of a bulk call sent concurrently.
+TATUM_BULK_MAX_WORKERS: int = config("TATUM_BULK_MAX_WORKERS", default=4, cast=int)
+# Sends per chunk when a bulk call hits transient failures.
+TATUM_BULK_MAX_ATTEMPTS: int = config("TATUM_BULK_MAX_ATTEMPTS", default=3, cast=int)
+# Largest number of addresses requested in one offchain/account/address/batch call.
+TATUM_ADDRESS_BATCH_SIZE: int = config("TATUM_ADDRESS_BATCH_SIZE", default=50, cast=int)
+
+# WEBHOOKS
+# ------------------------------------------------------------------------------
+# HMAC secret Tatum signs the notification webhooks with; settings.TATUM_WEBHOOK_SECRET wins.
+TATUM_WEBHOOK_SECRET: str = config("TATUM_WEBHOOK_SECRET", default="")
+# Webhook events held in memory before new ones are refused with a 503.
+TATUM_WEBHOOK_QUEUE_SIZE: int = config("TATUM_WEBHOOK_QUEUE_SIZE", default=10000, cast=int)
+# JSON lines file every verified webhook is appended to, for replays. Leave empty to disable.
+TATUM_WEBHOOK_LOG: str = config("TATUM_WEBHOOK_LOG", default="")
+
+# ACCOUNT POOLS
+# ------------------------------------------------------------------------------
+# Ready accounts below which a pool is refilled, and the number it is refilled to. Each pool
+# in settings.TATUM_ACCOUNT_POOLS may override them.
+TATUM_POOL_LOW_WATER: int = config("TATUM_POOL_LOW_WATER", default=20, cast=int)
+TATUM_POOL_TARGET: int = config("TATUM_POOL_TARGET", default=100, cast=int)
+# Seconds between two periodic checks of the background refiller.
+TATUM_POOL_REFILL_INTERVAL: float = config("TATUM_POOL_REFILL_INTERVAL", default=60.0, cast=float)
+# Seconds after which a pooled account still without an address is taken as left behind by an
+# interrupted refill and given one by the next refill.
+TATUM_POOL_RECOVER_AFTER: float = config("TATUM_POOL_RECOVER_AFTER", default=300.0, cast=float)
+
+# IPFS CACHE
+# ------------------------------------------------------------------------------
+# Directory of the on-disk IPFS content cache. Leave empty to disable it.
+TATUM_IPFS_CACHE_DIR: str = config("TATUM_IPFS_CACHE_DIR", default="")
+# Total bytes kept before the least recently read objects are evicted.
+TATUM_IPFS_CACHE_MAX_BYTES: int = config("TATUM_IPFS_CACHE_MAX_BYTES", default=1024**3, cast=int)
+# Objects of at least this many bytes are read as memory maps.
+TATUM_IPFS_CACHE_MMAP_THRESHOLD: int = config("TATUM_IPFS_CACHE_MMAP_THRESHOLD", default=1024**2, cast=int)
+
+# NONCES
+# ------------------------------------------------------------------------------
+# Directory of the file-locked nonce states. Defaults to "tatum-nonces" in the temporary directory.
+TATUM_NONCE_DIR: str = config("TATUM_NONCE_DIR", default="")
+# Seconds after which the next nonce allocation checks the chain's transaction count again.
+TATUM_NONCE_RESYNC_INTERVAL: float = config("TATUM_NONCE_RESYNC_INTERVAL", default=300.0, cast=float)
+
+# FEE ESTIMATION
+# ------------------------------------------------------------------------------
+# Seconds a chain's fee quote is served from memory before a caller fetches a new one.
+TATUM_FEE_TTL: float = config("TATUM_FEE_TTL", default=15.0, cast=float)
+# Seconds between two background refreshes of the chains quoted recently. Keep it below TATUM_FEE_TTL.
+TATUM_FEE_REFRESH_INTERVAL: float = config("TATUM_FEE_REFRESH_INTERVAL", default=10.0, cast=float)
+# Number of recent quotes per chain the fee tiers are computed over.
+TATUM_FEE_WINDOW: int = config("TATUM_FEE_WINDOW", default=20, cast=int)
+# Comma separated "tier:percentile" pairs: the percentile of each speed's recent prices quoted for the tier.
+TATUM_FEE_TIERS: list[str] = config("TATUM_FEE_TIERS", default="slow:25,medium:50,fast:90", cast=Csv())
+
+# ORDER BOOK
+# ------------------------------------------------------------------------------
+# Incremental polls of a mirrored order book between two full reloads of its open trades. 0 disables them.
+TATUM_ORDER_BOOK_RELOAD_EVERY: int = config("TATUM_ORDER_BOOK_RELOAD_EVERY", default=60, cast=int)
+
+# DEPOSIT TAILING
+# ------------------------------------------------------------------------------
+# Seconds before the high-water mark each poll starts from, to catch deposits committed out of order.
+TATUM_DEPOSIT_OVERLAP: float = config("TATUM_DEPOSIT_OVERLAP", default=60.0, cast=float)
+# Seconds a follower sleeps after a poll that found no new deposit.
+TATUM_DEPOSIT_POLL_INTERVAL: float = config("TATUM_DEPOSIT_POLL_INTERVAL", default=2.0, cast=float)
+# Directory of the file-backed deposit cursors. Defaults to "tatum-cursors" in the temporary directory.
+TATUM_DEPOSIT_CURSOR_DIR: str = config("TATUM_DEPOSIT_CURSOR_DIR", default="")
+
+# WITHDRAWALS
+# ------------------------------------------------------------------------------
+# Threads sending queued withdrawals.
+TATUM_WITHDRAWAL_WORKERS: int = config("TATUM_WITHDRAWAL_WORKERS", default=4, cast=int)
+# Most recipients merged into one withdrawal on UTXO chains. 1 disables batching.
+TATUM_WITHDRAWAL_BATCH_SIZE: int = config("TATUM_WITHDRAWAL_BATCH_SIZE", default=20, cast=int)
+# Sends of a withdrawal before it is marked failed.
+TATUM_WITHDRAWAL_MAX_ATTEMPTS: int = config("TATUM_WITHDRAWAL_MAX_ATTEMPTS", default=5, cast=int)
+# Seconds after which a claimed withdrawal that was not settled is claimed again.
+TATUM_WITHDRAWAL_LEASE: float = config("TATUM_WITHDRAWAL_LEASE", default=300.0, cast=float)
+# Seconds an idle worker waits before looking at the queue again.
+TATUM_WITHDRAWAL_POLL_INTERVAL: float = config("TATUM_WITHDRAWAL_POLL_INTERVAL", default=1.0, cast=float)
+# Fee tier paid by queued withdrawals sent without a fee of their own.
+TATUM_WITHDRAWAL_FEE_TIER: str = config("TATUM_WITHDRAWAL_FEE_TIER", default="medium")
@@ -1,8 +1,14 @@
 """Exception pagacke for Tatum client"""
 from .base import BaseException
+from .api_exceptions import TatumAPIException
+from .api_exceptions import raise_for_tatum_error
+from .virtual_account_exceptions import BulkOperationException
 from .virtual_account_exceptions import MissingparameterException
 
 __all__ = [
     "BaseException",
+    "BulkOperationException",
     "MissingparameterException",
+    "TatumAPIException",
+    "raise_for_tatum_error",
 ]
@@ -0,0 +1,45 @@
+"""Exceptions raised for failed Tatum API calls"""
+
+from typing import Any
+
+from .base import BaseException
+
+
+class TatumAPIException(BaseException):
+    """Tatum answered a request with an error status code"""
+
+    def __init__(
+        self,
+        status_code: int,
+        payload: Any = None,
+        message: str = None,
+        *args,
+        **kwargs,
+    ):
+        """Tatum API exception"""
+        if message is None:
+            detail = payload.get("message") if isinstance(payload, dict) else payload
+            message = f"Tatum API request failed with status {status_code}: {detail}"
+        super().__init__(message, *args, **kwargs)
+        self.status_code = status_code
+        self.payload = payload
+
+    @classmethod
+    def from_response(cls, response) -> "TatumAPIException":
+        """Build the exception from a failed response"""
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = getattr(response, "text", None)
+        return cls(response.status_code, payload)
+
+
+def raise_for_tatum_error(response):
+    """Raise a TatumAPIException when the response carries an error status code.
+
+    Returns:
+        The response, unchanged, when the call succeeded.
+    """
+    if response.status_code >= 400:
+        raise TatumAPIException.from_response(response)
+    return response
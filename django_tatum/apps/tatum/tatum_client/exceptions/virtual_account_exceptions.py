@@ -21,3 +21,22 @@ class MissingparameterException(BaseException):
     def __str__(self):
         """Missing parameter exception"""
         return self.message
+
+
+class BulkOperationException(BaseException):
+    """Some items of a bulk operation failed"""
+
+    def __init__(
+        self,
+        results: dict,
+        errors: dict,
+        message: str = None,
+        *args,
+        **kwargs,
+    ):
+        """Bulk operation exception"""
+        if message is None:
+            message = f"{len(errors)} of {len(results) + len(errors)} items failed."
+        super().__init__(message, *args, **kwargs)
+        self.results = results
+        self.errors = errors
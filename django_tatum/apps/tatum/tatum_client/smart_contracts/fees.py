@@ -0,0 +1,242 @@
+"""Shared blockchain fee estimates for on-chain operations.
+
+Every on-chain call sent through Tatum (withdrawals, contract deployments, transfers) needs
+a fee, and asking Tatum for one per transaction adds a round trip to each of them.
+`FeeEstimator` keeps the latest quotes of each chain in memory instead:
+
+- A chain is quoted at most once per TATUM_FEE_TTL seconds; concurrent callers missing the
+  cache wait for a single request.
+- `FeeRefresher` requotes the recently used chains in the background, so callers keep
+  reading fresh quotes without ever waiting on Tatum.
+- Each fee tier (slow, medium, fast) is a percentile of that speed's price over the last
+  TATUM_FEE_WINDOW quotes, which smooths out a single spiking quote.
+"""
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Optional
+from typing import TypedDict
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import AsyncBaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
+
+logger = logging.getLogger(__name__)
+
+# Chains whose quotes are gas prices in wei, sent to Tatum in gwei.
+GAS_CHAINS = frozenset({"ETH"})
+# Speeds of a quote, which are also the fee tiers.
+SPEEDS = ("slow", "medium", "fast")
+
+
+class FeeQuote(TypedDict):
+    """Tatum's fee recommendation for a chain: sat/byte for UTXO chains, wei of gas for ETH."""
+
+    slow: float
+    medium: float
+    fast: float
+    block: Optional[int]
+    quoted_at: float
+
+
+class GasFeeDict(TypedDict):
+    gasLimit: str
+    gasPrice: str
+
+
+def parse_tiers(tiers: list[str]) -> dict[str, float]:
+    """Parse "tier:percentile" pairs, e.g. TATUM_FEE_TIERS.
+
+    Raises:
+        ValueError: If a tier is not one of the quoted speeds.
+    """
+    parsed = {}
+    for tier in tiers:
+        name, _, percentile = tier.partition(":")
+        name = name.strip()
+        if name not in SPEEDS:
+            raise ValueError(f"Unknown fee tier {name!r}; expected one of {', '.join(SPEEDS)}.")
+        parsed[name] = float(percentile)
+    return parsed
+
+
+def percentile(values: list[float], p: float) -> float:
+    """The `p`th percentile of `values`, interpolated linearly between the closest ranks."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _quote(data: dict) -> FeeQuote:
+    return {
+        "slow": float(data["slow"]),
+        "medium": float(data["medium"]),
+        "fast": float(data["fast"]),
+        "block": data.get("block"),
+        "quoted_at": time.time(),
+    }
+
+
+class TatumFees(BaseRequestHandler):
+    def get_blockchain_fees(self, chain: str) -> FeeQuote:
+        """Recommended fees of `chain` (BTC, ETH, LTC, DOGE...) for the next blocks."""
+        return _quote(self._fetch_json("GET", f"blockchain/fee/{chain.upper()}"))
+
+
+class AsyncTatumFees(AsyncBaseRequestHandler):
+    """Asyncio counterpart of `TatumFees`."""
+
+    async def get_blockchain_fees(self, chain: str) -> FeeQuote:
+        return _quote(await self._fetch_json("GET", f"blockchain/fee/{chain.upper()}"))
+
+
+class FeeEstimator:
+    """Per-chain fee quotes, cached and shared by every on-chain operation.
+
+    Args:
+        client (TatumFees, optional): Client fetching the quotes.
+        ttl (float, optional): Seconds a quote is served from memory. Defaults to TATUM_FEE_TTL.
+        window (int, optional): Recent quotes kept per chain. Defaults to TATUM_FEE_WINDOW.
+        tiers (dict[str, float], optional): Percentile taken of each tier's price, by
+            tier. Defaults to TATUM_FEE_TIERS.
+    """
+
+    def __init__(self, client: TatumFees = None, ttl: float = None, window: int = None, tiers: dict[str, float] = None):
+        self.client = client or TatumFees()
+        self.ttl = conf.TATUM_FEE_TTL if ttl is None else ttl
+        self.window = max(conf.TATUM_FEE_WINDOW if window is None else window, 1)
+        self.tiers = parse_tiers(conf.TATUM_FEE_TIERS) if tiers is None else tiers
+        self._lock = threading.Lock()
+        self._chain_locks: dict[str, threading.Lock] = {}
+        self._quotes: dict[str, list[FeeQuote]] = {}
+        # Monotonic time of each chain's latest quote and last use.
+        self._fetched: dict[str, float] = {}
+        self._used: dict[str, float] = {}
+
+    def _fresh(self, chain: str) -> bool:
+        return time.monotonic() - self._fetched.get(chain, float("-inf")) < self.ttl
+
+    def refresh(self, chain: str) -> FeeQuote:
+        """Fetch a new quote of `chain` and add it to the window."""
+        quote = self.client.get_blockchain_fees(chain)
+        with self._lock:
+            history = self._quotes.setdefault(chain, [])
+            history.append(quote)
+            del history[: -self.window]
+            self._fetched[chain] = time.monotonic()
+        return quote
+
+    def _history(self, chain: str) -> list[FeeQuote]:
+        chain = chain.upper()
+        with self._lock:
+            self._used[chain] = time.monotonic()
+            if self._fresh(chain):
+                return list(self._quotes[chain])
+            chain_lock = self._chain_locks.setdefault(chain, threading.Lock())
+        with chain_lock:
+            # Another caller may have refreshed the quote while this one waited.
+            if not self._fresh(chain):
+                self.refresh(chain)
+        with self._lock:
+            return list(self._quotes[chain])
+
+    def quote(self, chain: str) -> FeeQuote:
+        """The latest fee quote of `chain`, fetched only if the cached one expired."""
+        return self._history(chain)[-1]
+
+    def fee(self, chain: str, tier: str = "medium") -> Decimal:
+        """The fee of a tier: sat/byte for UTXO chains, wei per unit of gas for ETH.
+
+        It is the tier's percentile of the prices quoted for that speed in the window.
+
+        Raises:
+            ValueError: If the tier is not configured.
+        """
+        if tier not in self.tiers or tier not in SPEEDS:
+            raise ValueError(f"Unknown fee tier {tier!r}; expected one of {', '.join(self.tiers)}.")
+        values = [quote[tier] for quote in self._history(chain)]
+        return Decimal(repr(percentile(values, self.tiers[tier])))
+
+    def gas_fee(self, chain: str, gas_limit: int, tier: str = "medium") -> GasFeeDict:
+        """The `fee` payload of Tatum's EVM transaction endpoints, with the gas price in gwei."""
+        if chain.upper() not in GAS_CHAINS:
+            raise ValueError(f"Tatum does not quote gas prices for {chain}.")
+        gwei = (self.fee(chain, tier) / Decimal(10**9)).quantize(Decimal("1e-9"))
+        return {"gasLimit": str(gas_limit), "gasPrice": format(gwei.normalize(), "f")}
+
+    def recent_chains(self, within: float) -> list[str]:
+        """The chains quoted for a caller in the last `within` seconds."""
+        since = time.monotonic() - within
+        with self._lock:
+            return [chain for chain, used in self._used.items() if used >= since]
+
+    def invalidate(self, chain: str = None):
+        """Drop the quotes of `chain`, or of every chain."""
+        with self._lock:
+            for cached in [chain.upper()] if chain else list(self._quotes):
+                self._quotes.pop(cached, None)
+                self._fetched.pop(cached, None)
+
+
+class FeeRefresher:
+    """Background thread requoting the chains in use before their quotes expire.
+
+    A chain stops being refreshed once no caller asked for it for `idle_after` seconds.
+
+    Args:
+        estimator (FeeEstimator, optional): The quotes to refresh. Defaults to the
+            process-wide estimator.
+        interval (float, optional): Seconds between two refreshes. Defaults to
+            TATUM_FEE_REFRESH_INTERVAL.
+        idle_after (float, optional): Defaults to ten refresh intervals.
+    """
+
+    def __init__(self, estimator: FeeEstimator = None, interval: float = None, idle_after: float = None):
+        self.estimator = estimator or get_fee_estimator()
+        self.interval = conf.TATUM_FEE_REFRESH_INTERVAL if interval is None else interval
+        self.idle_after = self.interval * 10 if idle_after is None else idle_after
+        self._stop = threading.Event()
+        self._thread: threading.Thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="tatum-fee-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            for chain in self.estimator.recent_chains(self.idle_after):
+                try:
+                    self.estimator.refresh(chain)
+                except Exception:
+                    logger.exception("Failed to refresh the %s fee quote", chain)
+
+
+_default_estimator: Optional[FeeEstimator] = None
+_default_estimator_lock = threading.Lock()
+
+
+def get_fee_estimator() -> FeeEstimator:
+    """Return the process-wide fee estimator."""
+    global _default_estimator
+    if _default_estimator is None:
+        with _default_estimator_lock:
+            if _default_estimator is None:
+                _default_estimator = FeeEstimator()
+    return _default_estimator
+
+
+def set_fee_estimator(estimator: FeeEstimator):
+    """Replace the process-wide fee estimator."""
+    global _default_estimator
+    with _default_estimator_lock:
+        _default_estimator = estimator
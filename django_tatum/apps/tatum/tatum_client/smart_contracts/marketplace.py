@@ -1,18 +1,7 @@
-from django_tatum.apps.tatum.tatum_client import creds
-from django_tatum.apps.tatum.utils.requestHandler import RequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
 
 
-class Marketplace:
-    def __init__(self):
-        self.requestUrl = f"{creds.TATUM_BASE_URL}blockchain/marketplace/listing"
-        self.Handler = RequestHandler(
-            self.requestUrl,
-            {
-                "Content-Type": "application/json",
-                "x-api-key": creds.TATUM_API_KEY,
-            },
-        )
-
+class Marketplace(BaseRequestHandler):
     def create_marketplace_contract_onchain(
         self,
         chain: str,
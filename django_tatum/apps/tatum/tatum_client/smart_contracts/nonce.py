@@ -0,0 +1,253 @@
+"""Local nonce allocation for hot wallets sending many transactions.
+
+Waiting for each transaction to confirm before sending the next one caps a hot wallet at
+one transaction per block. `NonceManager` hands out nonces per chain and address from a
+shared store instead, so signed transactions can be pipelined:
+
+- Allocation is atomic across threads and processes: the store is locked (a file lock, or
+  a row lock with `apps.tatum.nonces.DatabaseNonceStore`) while a nonce is taken.
+- Nonces of transactions Tatum rejected are released and handed out again first, so no
+  gap stalls the transactions queued behind them. After a timeout or a server error the
+  transaction may have been broadcast anyway, so its nonce is kept and the state is
+  resynchronised with the chain instead.
+- The next nonce is resynchronised with the chain's transaction count on first use,
+  periodically, and whenever Tatum reports a nonce error.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+from typing import TypedDict
+from typing import Union
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client.exceptions import TatumAPIException
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import AsyncBaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - optional dependency
+    fcntl = None
+
+# Tatum path segment of each chain's endpoints.
+CHAIN_PATHS = {
+    "ETH": "ethereum",
+    "MATIC": "polygon",
+    "BSC": "bsc",
+    "CELO": "celo",
+    "KLAY": "klaytn",
+    "ONE": "one",
+}
+
+
+class NonceState(TypedDict):
+    """Stored allocation state of one chain and address."""
+
+    next: Optional[int]
+    released: list[int]
+    synced_at: float
+
+
+def _empty_state() -> NonceState:
+    return {"next": None, "released": [], "synced_at": 0.0}
+
+
+class NonceStore(ABC):
+    """Storage of the nonce states, locked per chain and address."""
+
+    @contextmanager
+    @abstractmethod
+    def locked(self, chain: str, address: str) -> Iterator[NonceState]:
+        """Yield the state of `chain` and `address` under an exclusive lock and save it on exit."""
+
+
+class FileNonceStore(NonceStore):
+    """Nonce states kept as JSON files, locked with `flock` across processes.
+
+    Args:
+        directory (Union[str, Path], optional): Where the states are kept. Defaults to
+            TATUM_NONCE_DIR, or a `tatum-nonces` directory in the temporary directory.
+    """
+
+    def __init__(self, directory: Union[str, Path] = None):
+        if fcntl is None:
+            raise RuntimeError("FileNonceStore needs fcntl; use DatabaseNonceStore on this platform.")
+        self.directory = Path(directory or conf.TATUM_NONCE_DIR or Path(tempfile.gettempdir()) / "tatum-nonces")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _path(self, chain: str, address: str) -> Path:
+        digest = hashlib.sha256(f"{chain.upper()}:{address.lower()}".encode()).hexdigest()[:32]
+        return self.directory / f"{chain.lower()}-{digest}.json"
+
+    @contextmanager
+    def locked(self, chain: str, address: str) -> Iterator[NonceState]:
+        path = self._path(chain, address)
+        with self._locks_lock:
+            thread_lock = self._locks.setdefault(path.name, threading.Lock())
+        with thread_lock, open(path.with_suffix(".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    state = json.loads(path.read_text())
+                except (FileNotFoundError, ValueError):
+                    state = _empty_state()
+                yield state
+                partial = path.with_suffix(".tmp")
+                partial.write_text(json.dumps(state))
+                os.replace(partial, path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class TatumTransactionCount(BaseRequestHandler):
+    def get_transaction_count(self, chain: str, address: str) -> int:
+        """Number of transactions sent from `address`, pending ones included: its next nonce."""
+        chain_path = CHAIN_PATHS.get(chain.upper(), chain.lower())
+        return int(self._fetch_json("GET", f"{chain_path}/transaction/count/{address}"))
+
+
+class AsyncTatumTransactionCount(AsyncBaseRequestHandler):
+    """Asyncio counterpart of `TatumTransactionCount`."""
+
+    async def get_transaction_count(self, chain: str, address: str) -> int:
+        chain_path = CHAIN_PATHS.get(chain.upper(), chain.lower())
+        return int(await self._fetch_json("GET", f"{chain_path}/transaction/count/{address}"))
+
+
+def is_nonce_error(error: Exception) -> bool:
+    """Whether a failed transaction was rejected because of its nonce."""
+    return isinstance(error, TatumAPIException) and "nonce" in str(error).lower()
+
+
+def is_rejected_before_broadcast(error: Exception) -> bool:
+    """Whether Tatum refused a transaction outright, so its nonce was not used."""
+    return isinstance(error, TatumAPIException) and 400 <= error.status_code < 500 and not is_nonce_error(error)
+
+
+class NonceManager:
+    """Allocate transaction nonces per chain and address.
+
+    Args:
+        store (NonceStore, optional): Shared allocation state. Defaults to a FileNonceStore.
+        transaction_count (Callable[[str, str], int], optional): Returns the chain's next
+            nonce for a chain and address. Defaults to Tatum's transaction count endpoint.
+        resync_interval (float, optional): Seconds after which the next allocation checks
+            the chain again. Defaults to TATUM_NONCE_RESYNC_INTERVAL; 0 disables it.
+    """
+
+    def __init__(
+        self,
+        store: NonceStore = None,
+        transaction_count: Callable[[str, str], int] = None,
+        resync_interval: float = None,
+    ):
+        self.store = store or FileNonceStore()
+        self.transaction_count = transaction_count or TatumTransactionCount().get_transaction_count
+        self.resync_interval = conf.TATUM_NONCE_RESYNC_INTERVAL if resync_interval is None else resync_interval
+
+    def _sync(self, state: NonceState, chain: str, address: str, reset: bool = False):
+        on_chain = self.transaction_count(chain, address)
+        if reset or state["next"] is None:
+            state["next"] = on_chain
+            state["released"] = []
+        else:
+            # Transactions sent from elsewhere moved the chain ahead of us.
+            state["next"] = max(state["next"], on_chain)
+            state["released"] = [nonce for nonce in state["released"] if nonce >= on_chain]
+        state["synced_at"] = time.time()
+
+    def allocate(self, chain: str, address: str) -> int:
+        """Take the next nonce of `address` on `chain`, released nonces first."""
+        with self.store.locked(chain, address) as state:
+            stale = self.resync_interval and time.time() - state["synced_at"] > self.resync_interval
+            if state["next"] is None or not state["synced_at"] or stale:
+                self._sync(state, chain, address)
+            if state["released"]:
+                return state["released"].pop(0)
+            nonce = state["next"]
+            state["next"] += 1
+            return nonce
+
+    def release(self, chain: str, address: str, nonce: int):
+        """Give back the nonce of a transaction that never reached the chain."""
+        with self.store.locked(chain, address) as state:
+            if state["next"] is None or nonce >= state["next"] or nonce in state["released"]:
+                return
+            released = sorted(state["released"] + [nonce])
+            # Nonces at the top of the range go back to the counter.
+            while released and released[-1] == state["next"] - 1:
+                released.pop()
+                state["next"] -= 1
+            state["released"] = released
+
+    def resync(self, chain: str, address: str, reset: bool = False):
+        """Align the next nonce with the chain.
+
+        Args:
+            chain (str): The chain, e.g. "ETH".
+            address (str): The sending address.
+            reset (bool, optional): Start over from the chain's count, dropping the released
+                nonces. Use it when nothing is in flight, e.g. after a stuck gap was cleared.
+                Defaults to False, which only moves the next nonce forward.
+        """
+        with self.store.locked(chain, address) as state:
+            self._sync(state, chain, address, reset=reset)
+
+    @contextmanager
+    def reserve(self, chain: str, address: str) -> Iterator[int]:
+        """Allocate a nonce for the transaction sent in the block.
+
+        If Tatum rejects the transaction with a 4xx, the nonce is released. On any other
+        error, a nonce error, a timeout or a 5xx, the transaction may be on its way, so the
+        nonce is kept and the state is resynchronised with the chain instead::
+
+            with nonce_manager.reserve("ETH", address) as nonce:
+                client.send_transaction({..., "nonce": nonce})
+        """
+        nonce = self.allocate(chain, address)
+        try:
+            yield nonce
+        except Exception as error:
+            if is_rejected_before_broadcast(error):
+                self.release(chain, address, nonce)
+            else:
+                try:
+                    self.resync(chain, address)
+                except Exception:
+                    # Tatum is unreachable as well; the next allocation resynchronises.
+                    with self.store.locked(chain, address) as state:
+                        state["synced_at"] = 0.0
+            raise
+
+
+_default_manager: Optional[NonceManager] = None
+_default_manager_lock = threading.Lock()
+
+
+def get_nonce_manager() -> NonceManager:
+    """Return the process-wide nonce manager."""
+    global _default_manager
+    if _default_manager is None:
+        with _default_manager_lock:
+            if _default_manager is None:
+                _default_manager = NonceManager()
+    return _default_manager
+
+
+def set_nonce_manager(manager: NonceManager):
+    """Replace the process-wide nonce manager."""
+    global _default_manager
+    with _default_manager_lock:
+        _default_manager = manager
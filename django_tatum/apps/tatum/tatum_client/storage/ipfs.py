@@ -1,17 +1,157 @@
-from tatum_client import creds
-from utils.requestHandler import RequestHandler
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO
+from typing import Optional
+from typing import Union
+
+from django_tatum.apps.tatum.tatum_client import creds
+from django_tatum.apps.tatum.tatum_client.exceptions import raise_for_tatum_error
+from django_tatum.apps.tatum.utils.codec import get_codec
+from django_tatum.apps.tatum.utils.content_cache import ContentCache
+from django_tatum.apps.tatum.utils.content_cache import get_content_cache
+from django_tatum.apps.tatum.utils.multipart import DEFAULT_CHUNK_SIZE
+from django_tatum.apps.tatum.utils.multipart import MultipartFile
+from django_tatum.apps.tatum.utils.multipart import Source
+from django_tatum.apps.tatum.utils.requestHandler import RequestHandler
 
 
 class IPFSStorage:
-    def store_data(self, file: str):
+    """Tatum IPFS storage.
+
+    Args:
+        cache (ContentCache, optional): Local cache of the fetched content, which IPFS
+            addresses immutably. Defaults to the one in TATUM_IPFS_CACHE_DIR, if set.
+    """
+
+    def __init__(self, cache: ContentCache = None):
+        self._cache = cache
+
+    @property
+    def cache(self) -> Optional[ContentCache]:
+        return get_content_cache() if self._cache is None else self._cache
+
+    def store_data(self, file: Source, filename: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Upload a file to IPFS, streaming it from disk instead of loading it in memory.
+
+        A non-seekable file object is spooled to a temporary file first, so the upload can be
+        resent when Tatum rate-limits it.
+
+        Args:
+            file (Union[str, bytes, os.PathLike, BinaryIO]): A path to the file, an open binary
+                file object, or the content itself. A string that is not the path of an
+                existing file is uploaded as text.
+            filename (str, optional): File name sent to Tatum. Defaults to the path's name.
+            chunk_size (int, optional): Bytes read at a time. Defaults to 1 MiB.
+
+        Returns:
+            dict: Tatum's response, with the `ipfsHash` of the stored file.
+        """
+        if isinstance(file, str) and not os.path.isfile(file):
+            file = file.encode()
+        body = MultipartFile(file, filename=filename, chunk_size=chunk_size)
         requestUrl = f"{creds.TATUM_BASE_URL}ipfs"
-        Handler = RequestHandler(requestUrl, {"Content-Type": "multipart/form-data", "x-api-key": creds.TATUM_API_KEY})
-        payload = {"data": file}
-        response = Handler.post(data=payload)
-        return response.json()
+        Handler = RequestHandler(requestUrl, {"Content-Type": body.content_type, "x-api-key": creds.TATUM_API_KEY})
+        body.buffer()
+        try:
+            response = Handler.send("POST", data=body)
+        finally:
+            body.close()
+        return raise_for_tatum_error(response).json()
 
     def get_data(self, id: str):
+        cache = self.cache
+        if cache is None:
+            requestUrl = f"{creds.TATUM_BASE_URL}ipfs/{id}"
+            Handler = RequestHandler(requestUrl, {"x-api-key": creds.TATUM_API_KEY})
+            response = Handler.get()
+            return response.json()
+        return get_codec().loads(self.read(id, use_mmap=False))
+
+    def _fetch_into_cache(self, id: str, cache: ContentCache, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Path:
         requestUrl = f"{creds.TATUM_BASE_URL}ipfs/{id}"
         Handler = RequestHandler(requestUrl, {"x-api-key": creds.TATUM_API_KEY})
-        response = Handler.get()
-        return response.json()
+        with Handler.send("GET", stream=True) as response:
+            raise_for_tatum_error(response)
+            return cache.put(id, response.iter_content(chunk_size))
+
+    def read(self, id: str, use_mmap: bool = None) -> Union[bytes, mmap.mmap]:
+        """Return the content of an IPFS file, from the local cache when it holds it.
+
+        Args:
+            id (str): The IPFS hash of the file.
+            use_mmap (bool, optional): Return a read-only memory map of the cached file.
+                Defaults to doing so from the cache's mmap threshold; ignored without a cache.
+
+        Raises:
+            TatumAPIException: If Tatum answers with an error status.
+        """
+        cache = self.cache
+        content = cache.read(id, use_mmap) if cache is not None else None
+        if content is None and cache is not None:
+            self._fetch_into_cache(id, cache)
+            content = cache.read(id, use_mmap)
+        if content is None:
+            requestUrl = f"{creds.TATUM_BASE_URL}ipfs/{id}"
+            Handler = RequestHandler(requestUrl, {"x-api-key": creds.TATUM_API_KEY})
+            content = raise_for_tatum_error(Handler.send("GET")).content
+        return content
+
+    def download(
+        self,
+        id: str,
+        destination: Union[str, os.PathLike, BinaryIO],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """Download an IPFS file to a path or a writable binary file, in constant memory.
+
+        A path is written through a temporary file in the same directory and renamed into
+        place once the download completes, so it never holds a partial file. With a cache,
+        the file is streamed into the cache first and copied from there.
+
+        Args:
+            id (str): The IPFS hash of the file.
+            destination (Union[str, os.PathLike, BinaryIO]): Where to write the content.
+            chunk_size (int, optional): Bytes written at a time. Defaults to 1 MiB.
+
+        Returns:
+            int: The number of bytes written.
+
+        Raises:
+            TatumAPIException: If Tatum answers with an error status.
+        """
+        cache = self.cache
+        if cache is not None:
+            source = cache.get(id) or self._fetch_into_cache(id, cache, chunk_size)
+            with open(source, "rb") as f:
+                return _write_to(destination, lambda out: _copy_chunks(iter(lambda: f.read(chunk_size), b""), out))
+        requestUrl = f"{creds.TATUM_BASE_URL}ipfs/{id}"
+        Handler = RequestHandler(requestUrl, {"x-api-key": creds.TATUM_API_KEY})
+        with Handler.send("GET", stream=True) as response:
+            raise_for_tatum_error(response)
+            return _write_to(destination, lambda out: _copy_chunks(response.iter_content(chunk_size), out))
+
+
+def _copy_chunks(chunks, out: BinaryIO) -> int:
+    written = 0
+    for chunk in chunks:
+        out.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def _write_to(destination: Union[str, os.PathLike, BinaryIO], write) -> int:
+    """Call `write` with a writable file; a path is written atomically through a temporary file."""
+    if not isinstance(destination, (str, os.PathLike)):
+        return write(destination)
+    path = Path(destination)
+    fd, partial = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            written = write(f)
+        os.replace(partial, path)
+    except BaseException:
+        os.unlink(partial)
+        raise
+    return written
@@ -28,7 +28,7 @@ class TransactionDict(TypedDict, total=False):
 
 class BatchPaymentDict(SendPaymentDict):
     senderAccountId: str
-    transactions: TransactionDict
+    transaction: list[TransactionDict]
 
 
 class AmountDict(TypedDict, total=False):
@@ -83,3 +83,33 @@ class FindLedgerTransactionDict(TypedDict, total=False):
     paymentId: str
     recipientNote: str
     senderNote: str
+
+
+class StoreTradeDict(TypedDict, total=False):
+    type: str
+    price: str
+    amount: str
+    pair: str
+    currency1AccountId: str
+    currency2AccountId: str
+    fee: float
+    feeAccountId: str
+    attr: dict
+
+
+class TradeDict(StoreTradeDict, total=False):
+    id: str
+    fill: str
+    isMaker: bool
+    created: int
+
+
+class WithdrawalDict(TypedDict, total=False):
+    senderAccountId: str
+    address: str
+    amount: str
+    fee: str
+    multipleAmounts: list[str]
+    attr: str
+    paymentId: str
+    senderNote: str
@@ -39,8 +39,8 @@ class CreateAccountXpubDict(TypedDict, total=False):
     xpub: str
 
 
-class BatchAccountDict(CreateAccountDict):
-    pass
+class BatchAccountDict(CreateAccountDict, total=False):
+    xpub: str
 
 
 class UpdateAccountDict(TypedDict):
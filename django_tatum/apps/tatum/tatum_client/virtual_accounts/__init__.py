@@ -1,9 +1,13 @@
 """Tatum virtual account exports"""
 
+from .base import AsyncBaseRequestHandler
 from .base import BaseRequestHandler
+from .account import AsyncTatumVirtualAccounts
 from .account import TatumVirtualAccounts
 
 __all__ = [
+    "AsyncBaseRequestHandler",
+    "AsyncTatumVirtualAccounts",
     "BaseRequestHandler",
     "TatumVirtualAccounts",
 ]
@@ -1,12 +1,19 @@
 """Virtual Account handler"""
-import json
 
+from decimal import Decimal
+from decimal import localcontext
+from decimal import MAX_PREC
 from requests import Response
 from typing import Any
+from typing import AsyncIterator
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
 from typing import Union
 
 
 from django_tatum.apps.tatum.tatum_client.exceptions.virtual_account_exceptions import (
+    BulkOperationException,
     MissingparameterException,
 )
 from django_tatum.apps.tatum.tatum_client.types.virtual_account_types import AccountQueryDict
@@ -15,32 +22,172 @@ from django_tatum.apps.tatum.tatum_client.types.virtual_account_types import Cre
 from django_tatum.apps.tatum.tatum_client.types.virtual_account_types import CreateAccountXpubDict
 from django_tatum.apps.tatum.tatum_client.types.virtual_account_types import UpdateAccountDict
 
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client import creds
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import AsyncBaseRequestHandler
 from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
+from django_tatum.apps.tatum.utils.bulk import BulkItemResult
+from django_tatum.apps.tatum.utils.bulk import arun_chunked
+from django_tatum.apps.tatum.utils.bulk import run_chunked
+from django_tatum.apps.tatum.utils.bulk import split_results
+from django_tatum.apps.tatum.utils.cache import BaseCache
+from django_tatum.apps.tatum.utils.cache import cache_key
+from django_tatum.apps.tatum.utils.export import NDJSONSink
+from django_tatum.apps.tatum.utils.pagination import MAX_PAGE_SIZE
+from django_tatum.apps.tatum.utils.pagination import aiter_records
+from django_tatum.apps.tatum.utils.pagination import aprefetch_records
+from django_tatum.apps.tatum.utils.pagination import check_page_size
+from django_tatum.apps.tatum.utils.pagination import iter_records
+from django_tatum.apps.tatum.utils.pagination import prefetch_records
 
 # TODO: Error handling
 
 
+# Query parameters accepted by `list_all_virtual_accounts` and their expected types.
+ACCOUNT_QUERY_PARAMS: dict[str, type] = {
+    "page_size": int,
+    "page": int,
+    "sort": str,
+    "sort_by": str,
+    "active": bool,
+    "only_non_zero_balance": bool,
+    "frozen": bool,
+    "currency": str,
+    "account_number": str,
+}
+
+
+# Tatum names of the snake_case account query parameters.
+ACCOUNT_QUERY_API_NAMES: dict[str, str] = {
+    "page_size": "pageSize",
+    "sort_by": "sortBy",
+    "only_non_zero_balance": "onlyNonZeroBalance",
+    "account_number": "accountNumber",
+}
+
+
+def _account_query_params(query: AccountQueryDict) -> dict[str, Any]:
+    """Translate an account query into the query string parameters Tatum expects."""
+    return {
+        ACCOUNT_QUERY_API_NAMES.get(param, param): str(value).lower() if isinstance(value, bool) else value
+        for param, value in query.items()
+    }
+
+
+def _validate_account_query(query: AccountQueryDict):
+    """Raise a ValueError for unknown or wrongly typed account query parameters."""
+    for param, param_type in query.items():
+        if param not in ACCOUNT_QUERY_PARAMS:
+            raise ValueError(f"Invalid query parameter '{param}'")
+        if not isinstance(param_type, ACCOUNT_QUERY_PARAMS[param]):
+            raise ValueError(f"Invalid type for query parameter '{param}'")
+
+
+def _unblock_transaction_payload(
+    recipientAccountId: str,
+    amount: str,
+    anonymous: bool,
+    compliant: bool,
+    transaction_code: str,
+    payment_id: str,
+    recipient_note: str,
+    base_rate: int,
+    sender_note: str,
+) -> dict[str, Union[str, bool, int]]:
+    """Build the body of an unblock-and-transfer request.
+
+    Only the optional parameters that are supplied are added to the payload.
+    """
+    payload: dict[str, Union[str, bool, int]] = {
+        "recipientAccountId": recipientAccountId,
+        "amount": amount,
+        "anonymous": anonymous,
+    }
+
+    if compliant:
+        payload["compliant"] = compliant
+    else:
+        raise ValueError("This transaction will fail because 'compliance' is set to a 'False' value.")
+    if transaction_code:
+        payload["transactionCode"] = transaction_code
+    if payment_id:
+        payload["paymentId"] = payment_id
+    if recipient_note:
+        payload["recipientNote"] = recipient_note
+    if base_rate:
+        payload["baseRate"] = base_rate
+    if sender_note:
+        payload["senderNote"] = sender_note
+    return payload
+
+
+def aggregate_balances(
+    accounts: Iterable[dict],
+    balances: Mapping[str, dict] = None,
+) -> dict[str, dict[str, dict[str, Decimal]]]:
+    """Add up account balances per customer and per currency.
+
+    The amounts are summed as `Decimal` without rounding, so the totals are exact.
+
+    Args:
+        accounts (Iterable[dict]): Tatum accounts, with their `id`, `customerId` and `currency`.
+        balances (Mapping[str, dict], optional): Balances by account ID, as returned by
+            `get_account_balances`. Defaults to the `balance` embedded in each account.
+
+    Returns:
+        dict[str, dict[str, dict[str, Decimal]]]: {customerId: {currency: {"accountBalance",
+            "availableBalance", "accounts"}}}. Accounts without a customer are grouped under None,
+            and accounts without a known balance are skipped.
+    """
+    totals: dict = {}
+    with localcontext() as context:
+        context.prec = MAX_PREC
+        for account in accounts:
+            balance = account.get("balance") if balances is None else balances.get(account["id"])
+            if not balance:
+                continue
+            currency_totals = totals.setdefault(account.get("customerId"), {}).setdefault(
+                account.get("currency"),
+                {"accountBalance": Decimal(0), "availableBalance": Decimal(0), "accounts": 0},
+            )
+            currency_totals["accountBalance"] += Decimal(str(balance["accountBalance"]))
+            currency_totals["availableBalance"] += Decimal(str(balance["availableBalance"]))
+            currency_totals["accounts"] += 1
+    return totals
+
+
+def _bulk_outcome(values: dict, errors: dict, raise_on_error: bool) -> dict:
+    if errors and raise_on_error:
+        raise BulkOperationException(values, errors)
+    return values
+
+
+def _no_content_response(message: str) -> dict[str, Union[str, int]]:
+    return {
+        "message": message,
+        "status_code": 204,
+    }
+
+
 class TatumVirtualAccounts(BaseRequestHandler):
     """Interacting with Tatum Virtual Accounts. See https://apidoc.tatum.io/tag/Account for full docs."""
 
-    def __init__(self):
-        """Initialize TatumVirtualAccounts class."""
-        self.setup_request_handler("ledger/account")
-        super().__init__()
-
-    def _write_json_to_file(
-        self,
-        filename: str,
-        response: Any,
-    ):
-        """Write the dumped response to a json file.
+    def __init__(self, export_sink: NDJSONSink = None, cache: BaseCache = None):
+        """Initialize TatumVirtualAccounts class.
 
         Args:
-            filename (str): name of the output file.
-            response (Any): The response.json object from the response to a request.
+            export_sink (NDJSONSink, optional): When given, the records returned by the account
+                and blockage listing calls are also streamed to this sink. Defaults to None,
+                in which case no file I/O happens.
+            cache (BaseCache, optional): Cache for account and balance lookups. Defaults to the
+                process-wide cache.
         """
-        with open(filename, "w") as f:
-            json.dump(response, f, indent=4)
+        super().__init__(cache)
+        self.export_sink = export_sink
+
+    def _export(self, records: Any):
+        if self.export_sink is not None:
+            self.export_sink.write_many(records)
 
     def generate_virtual_account_no_xpub(
         self,
@@ -89,8 +236,8 @@ class TatumVirtualAccounts(BaseRequestHandler):
         """
         if len(data["accountCode"]) > 50:
             raise ValueError("Account code cannot be greater than 50 characters.")
-        self.setup_request_handler("ledger/account")
-        response = self.Handler.post(data)
+        handler = self.setup_request_handler("ledger/account")
+        response = handler.post(data)
         return response.json()
 
     def generate_virtual_account_with_xpub(
@@ -137,14 +284,14 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Returns:
             Response: _description_
         """
-        self.setup_request_handler("ledger/account")
-        response = self.Handler.post(data)
+        handler = self.setup_request_handler("ledger/account")
+        response = handler.post(data)
         return response.json()
 
     def list_all_virtual_accounts(
         self,
         query: AccountQueryDict = None,
-    ) -> Response:
+    ) -> list[dict]:
         """Lists all accounts. Inactive accounts are also visible.
 
         Args:
@@ -165,41 +312,24 @@ class TatumVirtualAccounts(BaseRequestHandler):
             ValueError: Raised when an invalid query parameter is provided.
 
         Returns:
-            200 Response: An array of a JSON object.
+            list[dict]: The decoded accounts (or the decoded Tatum error). This used to be the
+                `requests.Response` itself; callers must use the value instead of calling `.json()`.
 
         """
-        self.setup_request_handler("ledger/account")
+        handler = self.setup_request_handler("ledger/account")
         if query is None:
             query = {}
+        _validate_account_query(query)
 
-        # Define the expected query parameters and their types
-        expected_params = {
-            "page_size": int,
-            "page": int,
-            "sort": str,
-            "sort_by": str,
-            "active": bool,
-            "only_non_zero_balance": bool,
-            "frozen": bool,
-            "currency": str,
-            "account_number": str,
-        }
-
-        # Validate the provided query parameters
-        for param, param_type in query.items():
-            if param not in expected_params:
-                raise ValueError(f"Invalid query parameter '{param}'")
-            if not isinstance(param_type, expected_params[param]):
-                raise ValueError(f"Invalid type for query parameter '{param}'")
-
-        response = self.Handler.get(params=json.dumps(query))
-        self._write_json_to_file(filename="all_virtual_accounts.json", response=response.json())
-        return json.dumps(response.json())
+        response = handler.get(params=_account_query_params(query))
+        accounts = response.json()
+        self._export(accounts)
+        return accounts
 
     def get_account_entities_count(
         self,
         query: AccountQueryDict = None,
-    ) -> str:
+    ) -> dict[str, int]:
         """Count of accounts that were found from /v3/ledger/account.
 
         Args:
@@ -207,15 +337,17 @@ class TatumVirtualAccounts(BaseRequestHandler):
             Defaults to None.
 
         Returns:
-            _type_: JSON serialized string.
+            dict[str, int]: The decoded count, e.g. {"total": 1234}. This used to be the
+                `requests.Response` itself; callers must use the value instead of calling `.json()`.
         """
         if query is None:
             query = {}
-        self.setup_request_handler("ledger/account/count")
-        response = self.Handler.get(
-            params=query,
+        _validate_account_query(query)
+        handler = self.setup_request_handler("ledger/account/count")
+        response = handler.get(
+            params=_account_query_params(query),
         )
-        return json.dumps(response.json())
+        return response.json()
 
     def get_account_balance(self, account_id: str):
         """
@@ -235,9 +367,86 @@ class TatumVirtualAccounts(BaseRequestHandler):
         if not account_id:
             raise ValueError("MissingParameterError. account_id must be specified.")
 
-        self.setup_request_handler(f"ledger/account/{account_id}/balance")
-        response = self.Handler.get()
-        return response.json()
+        return self._cached_get(
+            cache_key("balance", account_id),
+            conf.TATUM_CACHE_TTL_BALANCE,
+            f"ledger/account/{account_id}/balance",
+        )
+
+    def _fetch_balance(self, account_id: str, use_cache: bool) -> dict:
+        url_prefix = f"ledger/account/{account_id}/balance"
+        if not use_cache:
+            return self._fetch_json("GET", url_prefix)
+        return self._cached_get(cache_key("balance", account_id), conf.TATUM_CACHE_TTL_BALANCE, url_prefix, raise_errors=True)
+
+    def get_account_balances(
+        self,
+        account_ids: Iterable[str],
+        max_workers: int = None,
+        use_cache: bool = True,
+        raise_on_error: bool = True,
+    ) -> dict[str, dict]:
+        """Fetch the balances of many accounts concurrently.
+
+        Each account is requested once however often it is listed. The requests share the
+        pooled session and go through the rate-limit scheduler; transient failures are retried.
+
+        Args:
+            account_ids (Iterable[str]): The accounts.
+            max_workers (int, optional): Requests in flight. Defaults to TATUM_BULK_MAX_WORKERS.
+            use_cache (bool, optional): Serve balances fetched less than TATUM_CACHE_TTL_BALANCE
+                seconds ago from the cache. Defaults to True.
+            raise_on_error (bool, optional): Raise if any balance could not be fetched.
+                Defaults to True.
+
+        Returns:
+            dict[str, dict]: {"accountBalance", "availableBalance"} by account ID.
+
+        Raises:
+            BulkOperationException: If some balances failed and `raise_on_error` is set. Its
+                `results` hold the balances fetched and its `errors` the failures.
+        """
+        account_ids = list(dict.fromkeys(account_ids))
+        results = run_chunked(
+            account_ids,
+            lambda chunk: [self._fetch_balance(chunk[0], use_cache)],
+            1,
+            max_workers=max_workers or conf.TATUM_BULK_MAX_WORKERS,
+            max_attempts=conf.TATUM_BULK_MAX_ATTEMPTS,
+        )
+        return _bulk_outcome(*split_results(account_ids, results), raise_on_error)
+
+    def get_customer_balances(
+        self,
+        customer_ids: Iterable[str],
+        fresh: bool = True,
+        max_workers: int = None,
+        use_cache: bool = True,
+    ) -> dict[str, dict[str, dict[str, Decimal]]]:
+        """Total the balances of every account of each customer, per currency.
+
+        Args:
+            customer_ids (Iterable[str]): The customers.
+            fresh (bool, optional): Fetch each account's balance concurrently with
+                `get_account_balances` (True) or use the balances embedded in the account
+                listing (False). Defaults to True.
+            max_workers (int, optional): Requests in flight. Defaults to TATUM_BULK_MAX_WORKERS.
+            use_cache (bool, optional): See `get_account_balances`. Defaults to True.
+
+        Returns:
+            dict[str, dict[str, dict[str, Decimal]]]: The totals built by `aggregate_balances`.
+
+        Raises:
+            TatumAPIException: If an account listing fails.
+            BulkOperationException: If some balances could not be fetched.
+        """
+        accounts = [
+            account for customer_id in dict.fromkeys(customer_ids) for account in self.iter_customer_accounts(customer_id)
+        ]
+        balances = None
+        if fresh:
+            balances = self.get_account_balances((account["id"] for account in accounts), max_workers, use_cache)
+        return aggregate_balances(accounts, balances)
 
     def get_account_by_id(
         self,
@@ -260,9 +469,11 @@ class TatumVirtualAccounts(BaseRequestHandler):
         if not account_id:
             raise MissingparameterException([account_id], "Missing parameter.")
 
-        self.setup_request_handler(f"ledger/account/{account_id}")
-        response = self.Handler.get()
-        return response.json()
+        return self._cached_get(
+            cache_key("account", account_id),
+            conf.TATUM_CACHE_TTL_ACCOUNT,
+            f"ledger/account/{account_id}",
+        )
 
     def create_batch_accounts(
         self,
@@ -282,16 +493,50 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Raises:
             ValueError: If the account_data is not provided or is not a list.
         """
-        self.setup_request_handler("ledger/account/batch")
+        handler = self.setup_request_handler("ledger/account/batch")
         payload: dict[str, Any] = {
             "accounts": accounts,
         }
-        response = self.Handler.post(
+        response = handler.post(
             data=payload,
         )
-        print(response.json())
         return response.json()
 
+    def create_accounts_in_bulk(
+        self,
+        accounts: list[BatchAccountDict],
+        chunk_size: int = None,
+        max_workers: int = None,
+        max_attempts: int = None,
+    ) -> list[BulkItemResult]:
+        """Create any number of accounts through concurrent `ledger/account/batch` calls.
+
+        The accounts are split into chunks of at most `chunk_size`, which are sent in parallel.
+        Chunks that failed before reaching Tatum are retried. A chunk Tatum rejects is split until
+        the rejected accounts are isolated, so a single invalid account does not fail its
+        neighbours.
+
+        Args:
+            accounts (list[BatchAccountDict]): The accounts to create.
+            chunk_size (int, optional): Accounts per call. Defaults to TATUM_ACCOUNT_BATCH_SIZE.
+            max_workers (int, optional): Calls in flight. Defaults to TATUM_BULK_MAX_WORKERS.
+            max_attempts (int, optional): Sends per chunk on a 429 or a failed connection;
+                a chunk that may have been applied is not sent again.
+                Defaults to TATUM_BULK_MAX_ATTEMPTS.
+
+        Returns:
+            list[BulkItemResult]: One entry per input account, in input order, with the created
+                account as `result` or the exception as `error`.
+        """
+        return run_chunked(
+            accounts,
+            lambda chunk: self._fetch_json("POST", "ledger/account/batch", data={"accounts": chunk}),
+            chunk_size or conf.TATUM_ACCOUNT_BATCH_SIZE,
+            max_workers=max_workers or conf.TATUM_BULK_MAX_WORKERS,
+            max_attempts=max_attempts or conf.TATUM_BULK_MAX_ATTEMPTS,
+            idempotent=False,
+        )
+
     def list_all_customer_accounts(
         self,
         customer_id: str,
@@ -316,8 +561,10 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Raises:
             ValueError: If the customer_id is not provided.
         """
-        self.setup_request_handler(f"ledger/account/customer/{customer_id}")
-        self.Handler.headers.pop("Content-Type")
+        handler = self.setup_request_handler(
+            f"ledger/account/customer/{customer_id}",
+            {"x-api-key": creds.TATUM_API_KEY},
+        )
         query: dict = {
             "pageSize": page_size,
         }
@@ -327,10 +574,125 @@ class TatumVirtualAccounts(BaseRequestHandler):
         if offset:
             query["offset"] = offset
 
-        response: Response = self.Handler.get(params=query)
-        self._write_json_to_file(filename="all_customer_accounts.json", response=response.json())
+        response: Response = handler.get(params=query)
+        self._export(response.json())
         return response.json()
 
+    def iter_virtual_accounts(
+        self,
+        query: AccountQueryDict = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every virtual account matching `query`.
+
+        Pages are requested one at a time, with the largest page size Tatum allows by default,
+        and the accounts are yielded one by one.
+
+        Args:
+            query (AccountQueryDict, optional): Same filters as `list_all_virtual_accounts`.
+                Any `page` or `page_size` entry is ignored.
+            page_size (int, optional): Accounts requested per page. Defaults to 50.
+
+        Raises:
+            TatumAPIException: If Tatum answers a page request with an error.
+        """
+        query = dict(query or {})
+        _validate_account_query(query)
+        query.pop("page", None)
+        query.pop("page_size", None)
+        params = _account_query_params(query)
+        params["pageSize"] = check_page_size(page_size)
+        return iter_records(
+            lambda page: self._fetch_json("GET", "ledger/account", params={**params, "page": page}),
+            page_size,
+        )
+
+    def iter_virtual_accounts_parallel(
+        self,
+        query: AccountQueryDict = None,
+        max_workers: int = 8,
+        ordered: bool = True,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Iterate over every virtual account matching `query`, fetching pages concurrently.
+
+        The number of matching accounts is read once from the account count endpoint, the
+        page offsets are planned from it and the pages are fetched with bounded parallelism.
+        Meant for full ledger scans and exports; use `iter_virtual_accounts` for short walks.
+
+        Args:
+            query (AccountQueryDict, optional): Same filters as `list_all_virtual_accounts`.
+                Any `page` or `page_size` entry is ignored.
+            max_workers (int, optional): Maximum number of pages in flight. Defaults to 8.
+            ordered (bool, optional): Yield accounts in listing order (True) or as their pages
+                arrive (False). Defaults to True.
+            page_size (int, optional): Accounts requested per page. Defaults to 50.
+
+        Raises:
+            TatumAPIException: If Tatum answers the count or a page request with an error.
+        """
+        query = dict(query or {})
+        query.pop("page", None)
+        query.pop("page_size", None)
+        _validate_account_query(query)
+        params = _account_query_params(query)
+        total = self._fetch_json("GET", "ledger/account/count", params=params)["total"]
+        params["pageSize"] = check_page_size(page_size)
+        return prefetch_records(
+            lambda page: self._fetch_json("GET", "ledger/account", params={**params, "page": page}),
+            total,
+            page_size,
+            max_workers=max_workers,
+            ordered=ordered,
+        )
+
+    def iter_customer_accounts(
+        self,
+        customer_id: str,
+        account_code: str = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every active account of a customer.
+
+        Args:
+            customer_id (str): The internal customer ID supplied when creating a virtual account.
+            account_code (str, optional): Only return accounts with this account code.
+            page_size (int, optional): Accounts requested per page. Defaults to 50.
+        """
+        params: dict = {"pageSize": check_page_size(page_size)}
+        if account_code:
+            params["accountCode"] = account_code
+        return iter_records(
+            lambda page: self._fetch_json(
+                "GET",
+                f"ledger/account/customer/{customer_id}",
+                params={**params, "offset": page * page_size},
+                headers={"x-api-key": creds.TATUM_API_KEY},
+            ),
+            page_size,
+        )
+
+    def iter_blocked_amounts(
+        self,
+        account_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every blockage of an account.
+
+        Args:
+            account_id (str): The account ID on Tatum.
+            page_size (int, optional): Blockages requested per page. Defaults to 50.
+        """
+        check_page_size(page_size)
+        return iter_records(
+            lambda page: self._fetch_json(
+                "GET",
+                f"ledger/account/block/{account_id}",
+                params={"pageSize": page_size, "offset": page * page_size},
+            ),
+            page_size,
+        )
+
     def update_virtual_account(
         self,
         account_id: str,
@@ -352,16 +714,17 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Raises:
             ValueError: If the account_id or account_data is not provided.
         """
-        self.setup_request_handler(f"ledger/account/{account_id}")
+        handler = self.setup_request_handler(f"ledger/account/{account_id}")
         payload: UpdateAccountDict = {
             "id": account_id,
             "accountCode": account_code,
             "accountNumber": account_number,
         }
 
-        response: Response = self.Handler.put(
+        response: Response = handler.put(
             data=payload,
         )
+        self._invalidate_accounts(account_id)
         print(response)
         return response
 
@@ -408,18 +771,21 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Raises:
             ValueError: If the account_id or amount is not provided.
         """
-        self.setup_request_handler(f"ledger/account/block/{id}")
+        handler = self.setup_request_handler(f"ledger/account/block/{id}")
         payload: dict[str, Union[str, list]] = {
             "amount": amount,
             "type": str(type),
         }
         if description:
             payload["description"] = description
-        response: Response = self.Handler.post(
+        response: Response = handler.post(
             data=payload,
         )
-
-        return response.json()
+        self._invalidate_accounts(id)
+        content = response.json()
+        if response.status_code == 200:
+            self._remember_blockage(content.get("id"), id)
+        return content
 
     def unblock_amount_and_perform_transaction(
         self,
@@ -433,6 +799,7 @@ class TatumVirtualAccounts(BaseRequestHandler):
         recipient_note: str = None,
         base_rate: int = 1,
         sender_note: str = None,
+        account_id: str = None,
     ) -> dict[str, str]:
         """Unblocks a previously blocked amount in an account and invokes a ledger transaction from that
         account to a different recipient. If the request fails, the amount is not unblocked.
@@ -468,6 +835,9 @@ class TatumVirtualAccounts(BaseRequestHandler):
             sender_note (str, optional): Note visible to sender. should be between 1 and 500 characters long. \
                 Defaults to None.
 
+            account_id (str, optional): The account the amount is blocked on, whose cached details \
+                are dropped. Defaults to the account recorded when the amount was blocked through this cache.
+
         Returns:
             dict[str, str]: A dictionary containing the reference to the transaction.
                 200 Response Sample:
@@ -480,42 +850,36 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Raises:
             ValueError: If the account_id, amount, or transaction_data is not provided.
         """
-        self.setup_request_handler(f"ledger/account/block/{blockage_id}")
-        # Only add the optional parameters to the payload if they are supplied
-        payload: dict[str, Union[str, bool, int]] = {
-            "recipientAccountId": recipientAccountId,
-            "amount": amount,
-            "anonymous": anonymous,
-        }
+        blocked_account_id = self._blocked_account(blockage_id, account_id)
+        handler = self.setup_request_handler(f"ledger/account/block/{blockage_id}")
+        payload = _unblock_transaction_payload(
+            recipientAccountId,
+            amount,
+            anonymous,
+            compliant,
+            transaction_code,
+            payment_id,
+            recipient_note,
+            base_rate,
+            sender_note,
+        )
 
-        if compliant:
-            payload["compliant"] = compliant
-        else:
-            raise ValueError("This transaction will fail because 'compliance' is set to a 'False' value.")
-        if transaction_code:
-            payload["transactionCode"] = transaction_code
-        if payment_id:
-            payload["paymentId"] = payment_id
-        if recipient_note:
-            payload["recipientNote"] = recipient_note
-        if base_rate:
-            payload["baseRate"] = base_rate
-        if sender_note:
-            payload["senderNote"] = sender_note
-
-        response: Response = self.Handler.put(
+        response: Response = handler.put(
             data=payload,
         )
+        self._invalidate_accounts(blocked_account_id, recipientAccountId)
 
         if response.status_code != 200:
-            content = json.loads(response.content)
+            content = response.json()
             content.pop("dashboardLog")
             return content
+        self.cache.delete(cache_key("blockage", blockage_id))
         return response.json()
 
     def unblock_amount_in_an_account(
         self,
         blockage_id: str,
+        account_id: str = None,
     ) -> dict[str, str]:
         """Unblocks a previously blocked amount in an account.
             Increases the available balance in the account where
@@ -524,6 +888,9 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Args:
             blockage_id (str): The blocakge ID obtained from a previous amount
                 blocking operation.
+            account_id (str, optional): The account the amount is blocked on, whose cached
+                details are dropped. Defaults to the account recorded when the amount was
+                blocked through this cache.
 
         Returns:
             dict[str, str]: A dictionary containing the status code and message.
@@ -533,9 +900,12 @@ class TatumVirtualAccounts(BaseRequestHandler):
                         "status_code": 200,
                     }
         """
-        self.setup_request_handler(f"ledger/account/block/{blockage_id}")
-        response: Response = self.Handler.delete()
+        blocked_account_id = self._blocked_account(blockage_id, account_id)
+        handler = self.setup_request_handler(f"ledger/account/block/{blockage_id}")
+        response: Response = handler.delete()
+        self._invalidate_accounts(blocked_account_id)
         if response.status_code == 204:
+            self.cache.delete(cache_key("blockage", blockage_id))
             response_object: dict[str, str] = {
                 "message": "Amount unblocked successfully.",
                 "status_code": 204,
@@ -590,7 +960,7 @@ class TatumVirtualAccounts(BaseRequestHandler):
         if page_size > 50:
             raise ValueError("Page size cannot be greater than 50.")
 
-        self.setup_request_handler(f"ledger/account/block/{account_id}")
+        handler = self.setup_request_handler(f"ledger/account/block/{account_id}")
         query: dict = {
             "pageSize": page_size,
         }
@@ -598,9 +968,8 @@ class TatumVirtualAccounts(BaseRequestHandler):
         if offset:
             query["offset"] = offset
 
-        response: Response = self.Handler.get(params=query)
-        # write the content to a json file
-        self._write_json_to_file("blocked_amounts.json", response.json())
+        response: Response = handler.get(params=query)
+        self._export(response.json())
         return response.json()
 
     def get_blocked_amount_by_id(
@@ -633,8 +1002,8 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Raises:
             ValueError: If the blockage_id is not provided.
         """
-        self.setup_request_handler(f"ledger/account/block/{blockage_id}/detail")
-        response: Response = self.Handler.get()
+        handler = self.setup_request_handler(f"ledger/account/block/{blockage_id}/detail")
+        response: Response = handler.get()
         return response.json()
 
     def activate_account(
@@ -651,8 +1020,9 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Returns:
             dict[str, str]: _description_
         """
-        self.setup_request_handler(f"ledger/account/{account_id}/activate")
-        response: Response = self.Handler.put()
+        handler = self.setup_request_handler(f"ledger/account/{account_id}/activate")
+        response: Response = handler.put()
+        self._invalidate_accounts(account_id)
         if response.status_code == 204:
             response_object: dict[str, str] = {
                 "message": "Account activated successfully.",
@@ -684,8 +1054,9 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Raises:
             ValueError: If the account_id is not provided.
         """
-        self.setup_request_handler(f"ledger/account/{account_id}/deactivate")
-        response: Response = self.Handler.put()
+        handler = self.setup_request_handler(f"ledger/account/{account_id}/deactivate")
+        response: Response = handler.put()
+        self._invalidate_accounts(account_id)
         if response.status_code == 204:
             response_object: dict[str, Union[str, int]] = {
                 "message": "Account deactivated successfully.",
@@ -719,8 +1090,9 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Raises:
             ValueError: If the account_id is not provided.
         """
-        self.setup_request_handler(f"ledger/account/{account_id}/freeze")
-        response: Response = self.Handler.put()
+        handler = self.setup_request_handler(f"ledger/account/{account_id}/freeze")
+        response: Response = handler.put()
+        self._invalidate_accounts(account_id)
         if response.status_code == 204:
             response_object: dict[str, Union[str, int]] = {
                 "message": "Account frozen successfully.",
@@ -750,8 +1122,9 @@ class TatumVirtualAccounts(BaseRequestHandler):
         Raises:
             ValueError: If the account_id is not provided.
         """
-        self.setup_request_handler(f"ledger/account/{account_id}/unfreeze")
-        response: Response = self.Handler.put()
+        handler = self.setup_request_handler(f"ledger/account/{account_id}/unfreeze")
+        response: Response = handler.put()
+        self._invalidate_accounts(account_id)
         if response.status_code == 204:
             response_object: dict[str, Union[str, int]] = {
                 "message": "Account unfrozen successfully.",
@@ -761,6 +1134,346 @@ class TatumVirtualAccounts(BaseRequestHandler):
         return response.json()
 
 
+class AsyncTatumVirtualAccounts(AsyncBaseRequestHandler):
+    """Asyncio counterpart of `TatumVirtualAccounts`.
+
+    Every method mirrors the synchronous method of the same name; see its docstring for
+    the parameters and the shape of the Tatum response.
+    """
+
+    def __init__(self, export_sink: NDJSONSink = None, cache: BaseCache = None):
+        super().__init__(cache)
+        self.export_sink = export_sink
+
+    def _export(self, records: Any):
+        # Never wait for the writer thread on the event loop; a full buffer drops the records.
+        if self.export_sink is not None:
+            self.export_sink.write_many(records, block=False)
+
+    async def generate_virtual_account_no_xpub(self, data: CreateAccountDict):
+        if len(data["accountCode"]) > 50:
+            raise ValueError("Account code cannot be greater than 50 characters.")
+        response = await self.setup_request_handler("ledger/account").post(data)
+        return response.json()
+
+    async def generate_virtual_account_with_xpub(self, data: CreateAccountXpubDict):
+        response = await self.setup_request_handler("ledger/account").post(data)
+        return response.json()
+
+    async def list_all_virtual_accounts(self, query: AccountQueryDict = None) -> list[dict]:
+        if query is None:
+            query = {}
+        _validate_account_query(query)
+        response = await self.setup_request_handler("ledger/account").get(params=_account_query_params(query))
+        accounts = response.json()
+        self._export(accounts)
+        return accounts
+
+    async def get_account_entities_count(self, query: AccountQueryDict = None) -> dict[str, int]:
+        if query is None:
+            query = {}
+        _validate_account_query(query)
+        response = await self.setup_request_handler("ledger/account/count").get(params=_account_query_params(query))
+        return response.json()
+
+    async def get_account_balance(self, account_id: str):
+        if not account_id:
+            raise ValueError("MissingParameterError. account_id must be specified.")
+        return await self._cached_get(
+            cache_key("balance", account_id),
+            conf.TATUM_CACHE_TTL_BALANCE,
+            f"ledger/account/{account_id}/balance",
+        )
+
+    async def _fetch_balance(self, account_id: str, use_cache: bool) -> dict:
+        url_prefix = f"ledger/account/{account_id}/balance"
+        if not use_cache:
+            return await self._fetch_json("GET", url_prefix)
+        return await self._cached_get(
+            cache_key("balance", account_id), conf.TATUM_CACHE_TTL_BALANCE, url_prefix, raise_errors=True
+        )
+
+    async def get_account_balances(
+        self,
+        account_ids: Iterable[str],
+        max_workers: int = None,
+        use_cache: bool = True,
+        raise_on_error: bool = True,
+    ) -> dict[str, dict]:
+        account_ids = list(dict.fromkeys(account_ids))
+
+        async def fetch(chunk):
+            return [await self._fetch_balance(chunk[0], use_cache)]
+
+        results = await arun_chunked(
+            account_ids,
+            fetch,
+            1,
+            max_workers=max_workers or conf.TATUM_BULK_MAX_WORKERS,
+            max_attempts=conf.TATUM_BULK_MAX_ATTEMPTS,
+        )
+        return _bulk_outcome(*split_results(account_ids, results), raise_on_error)
+
+    async def get_customer_balances(
+        self,
+        customer_ids: Iterable[str],
+        fresh: bool = True,
+        max_workers: int = None,
+        use_cache: bool = True,
+    ) -> dict[str, dict[str, dict[str, Decimal]]]:
+        accounts = [
+            account for customer_id in dict.fromkeys(customer_ids) async for account in self.iter_customer_accounts(customer_id)
+        ]
+        balances = None
+        if fresh:
+            balances = await self.get_account_balances((account["id"] for account in accounts), max_workers, use_cache)
+        return aggregate_balances(accounts, balances)
+
+    async def get_account_by_id(self, account_id: str) -> dict[str, str]:
+        if not account_id:
+            raise MissingparameterException([account_id], "Missing parameter.")
+        return await self._cached_get(
+            cache_key("account", account_id),
+            conf.TATUM_CACHE_TTL_ACCOUNT,
+            f"ledger/account/{account_id}",
+        )
+
+    async def create_batch_accounts(self, accounts: list[BatchAccountDict]):
+        response = await self.setup_request_handler("ledger/account/batch").post(data={"accounts": accounts})
+        return response.json()
+
+    async def create_accounts_in_bulk(
+        self,
+        accounts: list[BatchAccountDict],
+        chunk_size: int = None,
+        max_workers: int = None,
+        max_attempts: int = None,
+    ) -> list[BulkItemResult]:
+        return await arun_chunked(
+            accounts,
+            lambda chunk: self._fetch_json("POST", "ledger/account/batch", data={"accounts": chunk}),
+            chunk_size or conf.TATUM_ACCOUNT_BATCH_SIZE,
+            max_workers=max_workers or conf.TATUM_BULK_MAX_WORKERS,
+            max_attempts=max_attempts or conf.TATUM_BULK_MAX_ATTEMPTS,
+            idempotent=False,
+        )
+
+    async def list_all_customer_accounts(
+        self,
+        customer_id: str,
+        account_code: str = None,
+        page_size: int = 10,
+        offset: int = 0,
+    ):
+        query: dict = {
+            "pageSize": page_size,
+        }
+        if account_code:
+            query["accountCode"] = account_code
+        if offset:
+            query["offset"] = offset
+
+        handler = self.setup_request_handler(
+            f"ledger/account/customer/{customer_id}",
+            {"x-api-key": creds.TATUM_API_KEY},
+        )
+        response = await handler.get(params=query)
+        self._export(response.json())
+        return response.json()
+
+    def iter_virtual_accounts(
+        self,
+        query: AccountQueryDict = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        query = dict(query or {})
+        _validate_account_query(query)
+        query.pop("page", None)
+        query.pop("page_size", None)
+        params = _account_query_params(query)
+        params["pageSize"] = check_page_size(page_size)
+        return aiter_records(
+            lambda page: self._fetch_json("GET", "ledger/account", params={**params, "page": page}),
+            page_size,
+        )
+
+    async def iter_virtual_accounts_parallel(
+        self,
+        query: AccountQueryDict = None,
+        max_workers: int = 8,
+        ordered: bool = True,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        query = dict(query or {})
+        query.pop("page", None)
+        query.pop("page_size", None)
+        _validate_account_query(query)
+        params = _account_query_params(query)
+        total = (await self._fetch_json("GET", "ledger/account/count", params=params))["total"]
+        params["pageSize"] = check_page_size(page_size)
+        async for account in aprefetch_records(
+            lambda page: self._fetch_json("GET", "ledger/account", params={**params, "page": page}),
+            total,
+            page_size,
+            max_workers=max_workers,
+            ordered=ordered,
+        ):
+            yield account
+
+    def iter_customer_accounts(
+        self,
+        customer_id: str,
+        account_code: str = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        params: dict = {"pageSize": check_page_size(page_size)}
+        if account_code:
+            params["accountCode"] = account_code
+        return aiter_records(
+            lambda page: self._fetch_json(
+                "GET",
+                f"ledger/account/customer/{customer_id}",
+                params={**params, "offset": page * page_size},
+                headers={"x-api-key": creds.TATUM_API_KEY},
+            ),
+            page_size,
+        )
+
+    def iter_blocked_amounts(
+        self,
+        account_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        check_page_size(page_size)
+        return aiter_records(
+            lambda page: self._fetch_json(
+                "GET",
+                f"ledger/account/block/{account_id}",
+                params={"pageSize": page_size, "offset": page * page_size},
+            ),
+            page_size,
+        )
+
+    async def update_virtual_account(
+        self,
+        account_id: str,
+        account_code: str = None,
+        account_number: str = None,
+    ):
+        payload: UpdateAccountDict = {
+            "id": account_id,
+            "accountCode": account_code,
+            "accountNumber": account_number,
+        }
+        response = await self.setup_request_handler(f"ledger/account/{account_id}").put(data=payload)
+        self._invalidate_accounts(account_id)
+        return response
+
+    async def block_amount_in_account(
+        self,
+        id: str,
+        amount: str,
+        type: list[int],
+        description: str = None,
+    ):
+        payload: dict[str, Union[str, list]] = {
+            "amount": amount,
+            "type": str(type),
+        }
+        if description:
+            payload["description"] = description
+        response = await self.setup_request_handler(f"ledger/account/block/{id}").post(data=payload)
+        self._invalidate_accounts(id)
+        content = response.json()
+        if response.status_code == 200:
+            self._remember_blockage(content.get("id"), id)
+        return content
+
+    async def unblock_amount_and_perform_transaction(
+        self,
+        blockage_id: str,
+        recipientAccountId: str,
+        amount: str,
+        anonymous: bool = False,
+        compliant: bool = True,
+        transaction_code: str = None,
+        payment_id: str = None,
+        recipient_note: str = None,
+        base_rate: int = 1,
+        sender_note: str = None,
+        account_id: str = None,
+    ) -> dict[str, str]:
+        payload = _unblock_transaction_payload(
+            recipientAccountId,
+            amount,
+            anonymous,
+            compliant,
+            transaction_code,
+            payment_id,
+            recipient_note,
+            base_rate,
+            sender_note,
+        )
+        blocked_account_id = self._blocked_account(blockage_id, account_id)
+        response = await self.setup_request_handler(f"ledger/account/block/{blockage_id}").put(data=payload)
+        self._invalidate_accounts(blocked_account_id, recipientAccountId)
+        if response.status_code != 200:
+            content = response.json()
+            content.pop("dashboardLog", None)
+            return content
+        self.cache.delete(cache_key("blockage", blockage_id))
+        return response.json()
+
+    async def unblock_amount_in_an_account(self, blockage_id: str, account_id: str = None) -> dict[str, str]:
+        blocked_account_id = self._blocked_account(blockage_id, account_id)
+        response = await self.setup_request_handler(f"ledger/account/block/{blockage_id}").delete()
+        self._invalidate_accounts(blocked_account_id)
+        if response.status_code == 204:
+            self.cache.delete(cache_key("blockage", blockage_id))
+            return _no_content_response("Amount unblocked successfully.")
+        return response.json()
+
+    async def get_blocked_amounts_for_an_account(
+        self,
+        account_id: str,
+        page_size: int = 10,
+        offset: int = None,
+    ):
+        if page_size > 50:
+            raise ValueError("Page size cannot be greater than 50.")
+        query: dict = {
+            "pageSize": page_size,
+        }
+        if offset:
+            query["offset"] = offset
+        response = await self.setup_request_handler(f"ledger/account/block/{account_id}").get(params=query)
+        self._export(response.json())
+        return response.json()
+
+    async def get_blocked_amount_by_id(self, blockage_id: str) -> dict[str, str]:
+        response = await self.setup_request_handler(f"ledger/account/block/{blockage_id}/detail").get()
+        return response.json()
+
+    async def activate_account(self, account_id: str) -> dict[str, Union[str, int]]:
+        return await self._account_state_put(account_id, "activate", "Account activated successfully.")
+
+    async def deactivate_account(self, account_id: str) -> dict[str, Union[str, int]]:
+        return await self._account_state_put(account_id, "deactivate", "Account deactivated successfully.")
+
+    async def freeze_account(self, account_id: str) -> dict[str, Union[str, int]]:
+        return await self._account_state_put(account_id, "freeze", "Account frozen successfully.")
+
+    async def unfreeze_account(self, account_id: str) -> dict[str, Union[str, int]]:
+        return await self._account_state_put(account_id, "unfreeze", "Account unfrozen successfully.")
+
+    async def _account_state_put(self, account_id: str, action: str, message: str) -> dict[str, Union[str, int]]:
+        response = await self.setup_request_handler(f"ledger/account/{account_id}/{action}").put()
+        self._invalidate_accounts(account_id)
+        if response.status_code == 204:
+            return _no_content_response(message)
+        return response.json()
+
+
 # ---
 creatr_bulk_account_payload = {
     "accounts": [
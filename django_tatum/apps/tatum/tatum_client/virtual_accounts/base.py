@@ -1,26 +1,171 @@
+from types import MappingProxyType
+from typing import Mapping
+
 from django_tatum.apps.tatum.tatum_client import creds
+from django_tatum.apps.tatum.tatum_client.exceptions.api_exceptions import raise_for_tatum_error
+from django_tatum.apps.tatum.utils.asyncRequestHandler import AsyncRequestHandler
+from django_tatum.apps.tatum.utils.cache import MISSING
+from django_tatum.apps.tatum.utils.cache import BaseCache
+from django_tatum.apps.tatum.utils.cache import cache_key
+from django_tatum.apps.tatum.utils.cache import get_default_cache
 from django_tatum.apps.tatum.utils.requestHandler import RequestHandler
 
 
-class BaseRequestHandler:
-    def __init__(self):
-        self.url_prefix: str = ""
-        self.Handler: RequestHandler = None  # Initialize the handler as None
+class _ClientConfig:
+    """Immutable base configuration shared by the sync and async clients.
+
+    The base URL and default headers are fixed when the client is created and every call
+    gets its own handler built from them, so one client instance can be shared across
+    threads (or coroutines) without any call seeing another call's URL or headers.
+
+    Args:
+        cache (BaseCache, optional): Cache for repeated lookups. Defaults to the process-wide
+            cache selected by TATUM_CACHE_BACKEND.
+    """
 
-    def setup_request_handler(self, url_prefix) -> RequestHandler:
-        self.url_prefix = url_prefix
-        self.requestUrl = f"{creds.TATUM_BASE_URL}{url_prefix}"
-        self.Handler = RequestHandler(
-            self.requestUrl,
+    def __init__(self, cache: BaseCache = None):
+        self._cache = cache
+        self._base_url: str = creds.TATUM_BASE_URL
+        self._default_headers: Mapping[str, str] = MappingProxyType(
             {
                 "Content-Type": "application/json",
                 "x-api-key": creds.TATUM_API_KEY,
-            },
+            }
         )
 
-        return self.Handler
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    @property
+    def default_headers(self) -> Mapping[str, str]:
+        return self._default_headers
+
+    @property
+    def cache(self) -> BaseCache:
+        return get_default_cache() if self._cache is None else self._cache
+
+    def _invalidate_accounts(self, *account_ids: str):
+        """Drop the cached details and balances of accounts touched by a mutation."""
+        keys = []
+        for account_id in filter(None, account_ids):
+            keys += [cache_key("account", account_id), cache_key("balance", account_id)]
+        self.cache.delete(*keys)
+
+    def _remember_blockage(self, blockage_id: str, account_id: str):
+        """Record the account of a new blockage, so unblocking it can invalidate that account."""
+        if blockage_id:
+            self.cache.set(cache_key("blockage", blockage_id), account_id)
+
+    def _blocked_account(self, blockage_id: str, account_id: str = None) -> str:
+        """The account a blockage is on: `account_id` when given, else the one recorded when it was made."""
+        if account_id:
+            return account_id
+        recorded = self.cache.get(cache_key("blockage", blockage_id))
+        return None if recorded is MISSING else recorded
+
+    def _request_args(self, url_prefix: str, headers: Mapping[str, str] = None) -> tuple[str, dict]:
+        return f"{self._base_url}{url_prefix}", dict(self._default_headers if headers is None else headers)
+
+
+class BaseRequestHandler(_ClientConfig):
+    def setup_request_handler(self, url_prefix: str, headers: Mapping[str, str] = None) -> RequestHandler:
+        """Build the handler for a single call.
+
+        Args:
+            url_prefix (str): Path of the endpoint, relative to the Tatum base URL.
+            headers (Mapping[str, str], optional): Headers to send instead of the default
+                JSON + API key headers.
+
+        Returns:
+            RequestHandler: A new handler that is not stored on the client.
+        """
+        return RequestHandler(*self._request_args(url_prefix, headers))
 
     def extracted_from_send_payment(self, arg0, data):
-        self.setup_request_handler(arg0)
-        response = self.Handler.post(data)
+        response = self.setup_request_handler(arg0).post(data)
         return response.json()
+
+    def _cached_get(
+        self,
+        key: str,
+        ttl: float,
+        url_prefix: str,
+        headers: Mapping[str, str] = None,
+        raise_errors: bool = False,
+    ):
+        """GET `url_prefix` through the cache; only successful responses are cached.
+
+        Error responses are returned decoded, or raised as TatumAPIException with `raise_errors`.
+        """
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            return cached
+        response = self.setup_request_handler(url_prefix, headers).get()
+        if raise_errors:
+            raise_for_tatum_error(response)
+        data = response.json()
+        if response.status_code == 200:
+            self.cache.set(key, data, ttl)
+        return data
+
+    def _fetch_json(
+        self,
+        method: str,
+        url_prefix: str,
+        params: dict = None,
+        data=None,
+        headers: Mapping[str, str] = None,
+    ):
+        """Send a request and return its decoded body, raising TatumAPIException on error statuses."""
+        handler = self.setup_request_handler(url_prefix, headers)
+        if method in ("GET", "DELETE"):
+            response = getattr(handler, method.lower())(params=params)
+        else:
+            response = getattr(handler, method.lower())(data, params=params)
+        return raise_for_tatum_error(response).json()
+
+
+class AsyncBaseRequestHandler(_ClientConfig):
+    """Base class for the asyncio clients."""
+
+    def setup_request_handler(self, url_prefix: str, headers: Mapping[str, str] = None) -> AsyncRequestHandler:
+        return AsyncRequestHandler(*self._request_args(url_prefix, headers))
+
+    async def extracted_from_send_payment(self, arg0, data):
+        response = await self.setup_request_handler(arg0).post(data)
+        return response.json()
+
+    async def _cached_get(
+        self,
+        key: str,
+        ttl: float,
+        url_prefix: str,
+        headers: Mapping[str, str] = None,
+        raise_errors: bool = False,
+    ):
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            return cached
+        response = await self.setup_request_handler(url_prefix, headers).get()
+        if raise_errors:
+            raise_for_tatum_error(response)
+        data = response.json()
+        if response.status_code == 200:
+            self.cache.set(key, data, ttl)
+        return data
+
+    async def _fetch_json(
+        self,
+        method: str,
+        url_prefix: str,
+        params: dict = None,
+        data=None,
+        headers: Mapping[str, str] = None,
+    ):
+        handler = self.setup_request_handler(url_prefix, headers)
+        if method in ("GET", "DELETE"):
+            response = await getattr(handler, method.lower())(params=params)
+        else:
+            response = await getattr(handler, method.lower())(data, params=params)
+        return raise_for_tatum_error(response).json()
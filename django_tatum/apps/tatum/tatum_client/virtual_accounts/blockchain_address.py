@@ -1,28 +1,184 @@
+from pathlib import Path
+from typing import Iterable
+from typing import Union
+
+from django_tatum.apps.tatum.tatum_client import conf
 from django_tatum.apps.tatum.tatum_client import creds
-from django_tatum.apps.tatum.utils.requestHandler import RequestHandler
+from django_tatum.apps.tatum.tatum_client.exceptions import BulkOperationException
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import AsyncBaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
+from django_tatum.apps.tatum.utils.bulk import BulkItemResult
+from django_tatum.apps.tatum.utils.bulk import arun_chunked
+from django_tatum.apps.tatum.utils.bulk import is_rejection
+from django_tatum.apps.tatum.utils.bulk import run_chunked
+from django_tatum.apps.tatum.utils.checkpoint import JSONLCheckpoint
+
+
+def _batch_address_request(account_ids: list[str]) -> tuple:
+    """Arguments of `_fetch_json` requesting addresses for a chunk of accounts."""
+    return "offchain/account/address/batch", None, {"addresses": [{"accountId": id} for id in account_ids]}
+
+
+def _address_request(account_id: str) -> tuple:
+    """Arguments of `_fetch_json` requesting the address of a single account."""
+    return f"offchain/account/{account_id}/address", None, None, {"x-api-key": creds.TATUM_API_KEY}
+
 
+class _BulkAddressRun:
+    """State of one bulk deposit address run, shared by the sync and async clients."""
 
-class TatumBlockchainAdress:
-    def __init__(self):
-        self.requestUrl = f"{creds.TATUM_BASE_URL}offchain/account"
-        self.Handler = RequestHandler(
-            self.requestUrl,
-            {
-                "Content-Type": "application/json",
-                "x-api-key": creds.TATUM_API_KEY,
-            },
-        )
+    def __init__(self, account_ids: Iterable[str], checkpoint: Union[str, Path, JSONLCheckpoint] = None):
+        if checkpoint is not None and not isinstance(checkpoint, JSONLCheckpoint):
+            checkpoint = JSONLCheckpoint(checkpoint)
+        self.checkpoint = checkpoint
+        self.addresses: dict[str, dict] = checkpoint.load() if checkpoint is not None else {}
+        self.pending = [id for id in dict.fromkeys(account_ids) if id not in self.addresses]
+        self.errors: dict[str, Exception] = {}
 
+    def record(self, account_ids: list[str], addresses: list) -> list:
+        """Keep (and checkpoint) the addresses returned for a chunk of accounts."""
+        if isinstance(addresses, list) and len(addresses) == len(account_ids):
+            created = dict(zip(account_ids, addresses))
+            if self.checkpoint is not None:
+                self.checkpoint.record_many(created)
+            self.addresses.update(created)
+        return addresses
+
+    def collect(self, account_ids: list[str], results: list[BulkItemResult]) -> list[str]:
+        """Record the failures of a pass and return the accounts worth sending one by one."""
+        retry = []
+        for account_id, result in zip(account_ids, results):
+            if result["ok"]:
+                continue
+            if is_rejection(result["error"]):
+                retry.append(account_id)
+            self.errors[account_id] = result["error"]
+        return retry
+
+    def finish(self, raise_on_error: bool) -> dict[str, dict]:
+        for account_id in self.addresses:
+            self.errors.pop(account_id, None)
+        if self.errors and raise_on_error:
+            raise BulkOperationException(self.addresses, self.errors)
+        return self.addresses
+
+
+class TatumBlockchainAdress(BaseRequestHandler):
     def create_deposit_address(self, id: str):
-        self.requestUrl = f"{self.requestUrl}/{id}/address"
-        self.Handler = RequestHandler(
-            self.requestUrl,
-            {"x-api-key": creds.TATUM_API_KEY},
-        )
+        handler = self.setup_request_handler(f"offchain/account/{id}/address", {"x-api-key": creds.TATUM_API_KEY})
+        response = handler.post()
+        return response.json()
 
-        response = self.Handler.post()
+    def create_deposit_addresses(
+        self,
+        account_ids: Iterable[str],
+        checkpoint: Union[str, Path, JSONLCheckpoint] = None,
+        use_batch: bool = True,
+        chunk_size: int = None,
+        max_workers: int = None,
+        raise_on_error: bool = True,
+    ) -> dict[str, dict]:
+        """Assign a new deposit address to each of many accounts.
+
+        The addresses are requested through Tatum's `offchain/account/address/batch` endpoint
+        in concurrent chunks. Accounts the batch endpoint rejects, or every account when
+        `use_batch` is False, are sent one by one to `offchain/account/{id}/address` with
+        bounded concurrency.
+
+        Args:
+            account_ids (Iterable[str]): The accounts; duplicates get a single address.
+            checkpoint (Union[str, Path, JSONLCheckpoint], optional): JSON lines file recording
+                every created address as it arrives. Accounts already recorded in it are
+                skipped, so an interrupted run can be resumed with the same file.
+            use_batch (bool, optional): Use the batch endpoint. Defaults to True.
+            chunk_size (int, optional): Accounts per batch call. Defaults to TATUM_ADDRESS_BATCH_SIZE.
+            max_workers (int, optional): Calls in flight. Defaults to TATUM_BULK_MAX_WORKERS.
+            raise_on_error (bool, optional): Raise once the run is over if any account failed.
+                Defaults to True.
+
+        Returns:
+            dict[str, dict]: The Tatum address object of every account, by account ID,
+                including those loaded from the checkpoint.
+
+        Raises:
+            BulkOperationException: If some accounts failed and `raise_on_error` is set. Its
+                `results` hold the addresses created and its `errors` the failures.
+        """
+        run = _BulkAddressRun(account_ids, checkpoint)
+        max_workers = max_workers or conf.TATUM_BULK_MAX_WORKERS
+        single = run.pending
+        if use_batch and run.pending:
+            results = run_chunked(
+                run.pending,
+                lambda chunk: run.record(chunk, self._fetch_json("POST", *_batch_address_request(chunk))),
+                chunk_size or conf.TATUM_ADDRESS_BATCH_SIZE,
+                max_workers=max_workers,
+                max_attempts=conf.TATUM_BULK_MAX_ATTEMPTS,
+                idempotent=False,
+            )
+            single = run.collect(run.pending, results)
+        if single:
+            results = run_chunked(
+                single,
+                lambda chunk: run.record(chunk, [self._fetch_json("POST", *_address_request(chunk[0]))]),
+                1,
+                max_workers=max_workers,
+                max_attempts=conf.TATUM_BULK_MAX_ATTEMPTS,
+                idempotent=False,
+            )
+            run.collect(single, results)
+        return run.finish(raise_on_error)
+
+
+class AsyncTatumBlockchainAdress(AsyncBaseRequestHandler):
+    """Asyncio counterpart of `TatumBlockchainAdress`."""
+
+    async def create_deposit_address(self, id: str):
+        handler = self.setup_request_handler(f"offchain/account/{id}/address", {"x-api-key": creds.TATUM_API_KEY})
+        response = await handler.post()
         return response.json()
 
+    async def create_deposit_addresses(
+        self,
+        account_ids: Iterable[str],
+        checkpoint: Union[str, Path, JSONLCheckpoint] = None,
+        use_batch: bool = True,
+        chunk_size: int = None,
+        max_workers: int = None,
+        raise_on_error: bool = True,
+    ) -> dict[str, dict]:
+        run = _BulkAddressRun(account_ids, checkpoint)
+        max_workers = max_workers or conf.TATUM_BULK_MAX_WORKERS
+
+        async def send_batch(chunk):
+            return run.record(chunk, await self._fetch_json("POST", *_batch_address_request(chunk)))
+
+        async def send_single(chunk):
+            return run.record(chunk, [await self._fetch_json("POST", *_address_request(chunk[0]))])
+
+        single = run.pending
+        if use_batch and run.pending:
+            results = await arun_chunked(
+                run.pending,
+                send_batch,
+                chunk_size or conf.TATUM_ADDRESS_BATCH_SIZE,
+                max_workers=max_workers,
+                max_attempts=conf.TATUM_BULK_MAX_ATTEMPTS,
+                idempotent=False,
+            )
+            single = run.collect(run.pending, results)
+        if single:
+            results = await arun_chunked(
+                single,
+                send_single,
+                1,
+                max_workers=max_workers,
+                max_attempts=conf.TATUM_BULK_MAX_ATTEMPTS,
+                idempotent=False,
+            )
+            run.collect(single, results)
+        return run.finish(raise_on_error)
+
 
 if __name__ == "__main__":
     tatum_blockchain_address = TatumBlockchainAdress()
@@ -1,18 +1,18 @@
+from typing import AsyncIterator
+from typing import Iterator
+
+from django_tatum.apps.tatum.tatum_client import conf
 from django_tatum.apps.tatum.tatum_client import creds
-from django_tatum.apps.tatum.utils.requestHandler import RequestHandler
-
-
-class TatumCustomer:
-    def __init__(self):
-        self.requestUrl = f"{creds.TATUM_BASE_URL}ledger/customer"
-        self.Handler = RequestHandler(
-            self.requestUrl,
-            {
-                "Content-Type": "application/json",
-                "x-api-key": creds.TATUM_API_KEY,
-            },
-        )
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import AsyncBaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
+from django_tatum.apps.tatum.utils.cache import cache_key
+from django_tatum.apps.tatum.utils.pagination import MAX_PAGE_SIZE
+from django_tatum.apps.tatum.utils.pagination import aiter_records
+from django_tatum.apps.tatum.utils.pagination import check_page_size
+from django_tatum.apps.tatum.utils.pagination import iter_records
+
 
+class TatumCustomer(BaseRequestHandler):
     def list_all_customers(self, pageSize: int, offset: int = None):
         query = {}
         if pageSize:
@@ -20,19 +20,36 @@ class TatumCustomer:
         if offset:
             query["offset"] = offset
 
-        response = self.Handler.get(params=query)
+        response = self.setup_request_handler("ledger/customer").get(params=query)
         return response.json()
 
+    def iter_customers(self, page_size: int = MAX_PAGE_SIZE) -> Iterator[dict]:
+        """Lazily iterate over every customer, fetching one page at a time.
+
+        Args:
+            page_size (int, optional): Customers requested per page. Defaults to 50.
+
+        Raises:
+            TatumAPIException: If Tatum answers a page request with an error.
+        """
+        check_page_size(page_size)
+        return iter_records(
+            lambda page: self._fetch_json(
+                "GET",
+                "ledger/customer",
+                params={"pageSize": page_size, "offset": page * page_size},
+            ),
+            page_size,
+        )
+
     def get_customer_details(self, id: str):
-        self.requestUrl = f"{creds.TATUM_BASE_URL}ledger/customer/{id}"
-        self.Handler = RequestHandler(
-            self.requestUrl,
+        return self._cached_get(
+            cache_key("customer", id),
+            conf.TATUM_CACHE_TTL_CUSTOMER,
+            f"ledger/customer/{id}",
             {"x-api-key": creds.TATUM_API_KEY},
         )
 
-        response = self.Handler.get()
-        return response.json()
-
     def update_customer(
         self,
         id: str,
@@ -41,12 +58,6 @@ class TatumCustomer:
         customerCountry: str = None,
         providerCountry: str = None,
     ):
-        self.requestUrl = f"{creds.TATUM_BASE_URL}ledger/customer/{id}"
-        self.Handler = RequestHandler(
-            self.requestUrl,
-            {"Content-Type": "application/json", "x-api-key": creds.TATUM_API_KEY},
-        )
-
         payload = {
             "externalId": externalId,
             "accountingCurrency": accountingCurrency,
@@ -54,7 +65,8 @@ class TatumCustomer:
             "providerCountry": providerCountry,
         }
 
-        response = self.Handler.put(data=payload)
+        response = self.setup_request_handler(f"ledger/customer/{id}").put(data=payload)
+        self.cache.delete(cache_key("customer", id))
         return response.json()
 
     def activate_customer(self, id: str):
@@ -72,10 +84,83 @@ class TatumCustomer:
 
     def _customer_id_parser(self, id, url_suffix, message_suffix):
         response = self._activation_toggle_put_request(id, url_suffix)
-        return f"Customer {id} {message_suffix}" if response.status == 204 else response.json()
+        return f"Customer {id} {message_suffix}" if response.status_code == 204 else response.json()
 
     def _activation_toggle_put_request(self, id, url_suffix):
-        requestUrl = f"{creds.TATUM_BASE_URL}ledger/customer/{id}{url_suffix}"
-        Handler = RequestHandler(requestUrl, {"Content-Type": "application/json", "x-api-key": creds.TATUM_API_KEY})
+        response = self.setup_request_handler(f"ledger/customer/{id}{url_suffix}").put()
+        self.cache.delete(cache_key("customer", id))
+        return response
+
+
+class AsyncTatumCustomer(AsyncBaseRequestHandler):
+    """Asyncio counterpart of `TatumCustomer`."""
+
+    async def list_all_customers(self, pageSize: int, offset: int = None):
+        query = {}
+        if pageSize:
+            query["pageSize"] = pageSize
+        if offset:
+            query["offset"] = offset
+
+        response = await self.setup_request_handler("ledger/customer").get(params=query)
+        return response.json()
+
+    def iter_customers(self, page_size: int = MAX_PAGE_SIZE) -> AsyncIterator[dict]:
+        check_page_size(page_size)
+        return aiter_records(
+            lambda page: self._fetch_json(
+                "GET",
+                "ledger/customer",
+                params={"pageSize": page_size, "offset": page * page_size},
+            ),
+            page_size,
+        )
+
+    async def get_customer_details(self, id: str):
+        return await self._cached_get(
+            cache_key("customer", id),
+            conf.TATUM_CACHE_TTL_CUSTOMER,
+            f"ledger/customer/{id}",
+            {"x-api-key": creds.TATUM_API_KEY},
+        )
+
+    async def update_customer(
+        self,
+        id: str,
+        externalId: str,
+        accountingCurrency: str = None,
+        customerCountry: str = None,
+        providerCountry: str = None,
+    ):
+        payload = {
+            "externalId": externalId,
+            "accountingCurrency": accountingCurrency,
+            "customerCountry": customerCountry,
+            "providerCountry": providerCountry,
+        }
+
+        response = await self.setup_request_handler(f"ledger/customer/{id}").put(data=payload)
+        self.cache.delete(cache_key("customer", id))
+        return response.json()
+
+    async def activate_customer(self, id: str):
+        response = await self._activation_toggle_put_request(id, "/activate")
+        return response.json()
+
+    async def deactivate_customer(self, id: str):
+        return await self._customer_id_parser(id, "/deactivate", " deactivated successfully")
+
+    async def enable_customer(self, id: str):
+        return await self._customer_id_parser(id, "/enable", " enabled successfully.")
+
+    async def disable_customer(self, id: str):
+        return await self._customer_id_parser(id, "/disable", " disabled successfully.")
+
+    async def _customer_id_parser(self, id, url_suffix, message_suffix):
+        response = await self._activation_toggle_put_request(id, url_suffix)
+        return f"Customer {id} {message_suffix}" if response.status_code == 204 else response.json()
 
-        return Handler.put()
+    async def _activation_toggle_put_request(self, id, url_suffix):
+        response = await self.setup_request_handler(f"ledger/customer/{id}{url_suffix}").put()
+        self.cache.delete(cache_key("customer", id))
+        return response
@@ -0,0 +1,251 @@
+"""Incremental tailing of the deposits credited to the ledger.
+
+Finding new deposits by scanning transaction pages rereads the whole history on every
+pass. `DepositTail` keeps a persisted high-water mark instead, the creation time of the
+newest deposit delivered, and only asks Tatum for the deposits created after it:
+
+- The query starts `overlap_seconds` before the mark, so a deposit committed slightly
+  out of order is still picked up; the references of the deposits delivered within the
+  overlap are remembered, so none is delivered twice.
+- New deposits are yielded oldest first, and the mark only moves past a deposit once the
+  consumer asked for the next one, so a consumer that crashes mid-way gets the deposit it
+  was handling again on restart.
+- A new cursor starts at the current time rather than replaying the whole ledger, unless
+  an earlier `start` is given, so a poll only ever reads the deposits of its window.
+- `follow` polls in a loop, sleeping only while there is nothing new.
+
+The mark is kept in a JSON file by default, or in the database with
+`apps.tatum.deposits.DatabaseCursorStore`.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from pathlib import Path
+from typing import AsyncIterator
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import TypedDict
+from typing import Union
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client.types.transaction_types import FindLedgerTransactionDict
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.transaction import AsyncTatumTransactions
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.transaction import TatumTransactions
+from django_tatum.apps.tatum.utils.pagination import MAX_PAGE_SIZE
+
+
+class CursorState(TypedDict):
+    """High-water mark of a tail, in milliseconds, and the references delivered within the overlap."""
+
+    position: int
+    recent: dict[str, int]
+
+
+class CursorStore(ABC):
+    """Persistence of named tail cursors."""
+
+    @abstractmethod
+    def load(self, name: str) -> Optional[CursorState]:
+        """The saved state of cursor `name`, or None if it was never saved."""
+
+    @abstractmethod
+    def save(self, name: str, state: CursorState):
+        """Replace the saved state of cursor `name`."""
+
+    async def aload(self, name: str) -> Optional[CursorState]:
+        """Asyncio counterpart of `load`; runs it in a worker thread unless overridden."""
+        return await asyncio.to_thread(self.load, name)
+
+    async def asave(self, name: str, state: CursorState):
+        """Asyncio counterpart of `save`; runs it in a worker thread unless overridden."""
+        await asyncio.to_thread(self.save, name, state)
+
+
+class FileCursorStore(CursorStore):
+    """Cursors kept as JSON files, replaced atomically on save.
+
+    Args:
+        directory (Union[str, Path], optional): Where the cursors are kept. Defaults to
+            TATUM_DEPOSIT_CURSOR_DIR, or a `tatum-cursors` directory in the temporary directory.
+    """
+
+    def __init__(self, directory: Union[str, Path] = None):
+        self.directory = Path(directory or conf.TATUM_DEPOSIT_CURSOR_DIR or Path(tempfile.gettempdir()) / "tatum-cursors")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def load(self, name: str) -> Optional[CursorState]:
+        try:
+            return json.loads(self._path(name).read_text())
+        except FileNotFoundError:
+            return None
+
+    def save(self, name: str, state: CursorState):
+        path = self._path(name)
+        partial = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        partial.write_text(json.dumps(state))
+        os.replace(partial, path)
+
+
+class _TailState:
+    """The in-memory cursor of one poll, with the deduplication of the overlap window."""
+
+    def __init__(self, state: CursorState, overlap_ms: int):
+        self.position = state["position"]
+        self.recent = dict(state["recent"])
+        self.overlap_ms = overlap_ms
+        self.marked = 0
+
+    def window_start(self) -> int:
+        return max(self.position - self.overlap_ms, 0)
+
+    def new(self, records: Iterable[dict]) -> list[dict]:
+        """The records not delivered yet, oldest first; the others are dropped as they are read."""
+        fresh = {record["reference"]: record for record in records if record["reference"] not in self.recent}
+        return sorted(fresh.values(), key=lambda record: record["created"])
+
+    def mark(self, record: dict):
+        self.position = max(self.position, record["created"])
+        self.recent[record["reference"]] = record["created"]
+        self.marked += 1
+
+    def dump(self) -> CursorState:
+        horizon = self.window_start()
+        return {"position": self.position, "recent": {ref: at for ref, at in self.recent.items() if at >= horizon}}
+
+
+class DepositTail:
+    """Follow the deposits credited to the ledger, from a persisted high-water mark.
+
+    Args:
+        name (str, optional): Name of the cursor, one per consumer. Defaults to "deposits".
+        query (FindLedgerTransactionDict, optional): Extra filters, e.g. `account` or `currency`.
+        transactions (TatumTransactions, optional): Client reading the ledger.
+        store (CursorStore, optional): Where the cursor is kept. Defaults to a FileCursorStore.
+        overlap_seconds (float, optional): How far before the mark each poll starts. Defaults
+            to TATUM_DEPOSIT_OVERLAP.
+        page_size (int, optional): Deposits requested per page. Defaults to 50.
+        start (int, optional): Position of the cursor the first time it is used, in
+            milliseconds. Defaults to the current time; 0 replays every deposit.
+    """
+
+    def __init__(
+        self,
+        name: str = "deposits",
+        query: FindLedgerTransactionDict = None,
+        transactions: TatumTransactions = None,
+        store: CursorStore = None,
+        overlap_seconds: float = None,
+        page_size: int = MAX_PAGE_SIZE,
+        start: int = None,
+    ):
+        self.name = name
+        self.query = dict(query or {})
+        self.transactions = transactions or TatumTransactions()
+        self.store = store or FileCursorStore()
+        overlap_seconds = conf.TATUM_DEPOSIT_OVERLAP if overlap_seconds is None else overlap_seconds
+        self.overlap_ms = int(overlap_seconds * 1000)
+        self.page_size = page_size
+        self.start = start
+
+    def _initial(self) -> CursorState:
+        return {"position": int(time.time() * 1000) if self.start is None else self.start, "recent": {}}
+
+    def _load(self) -> _TailState:
+        saved = self.store.load(self.name)
+        if saved is None:
+            # Saved at once, so the deposits arriving before the first one is marked are kept.
+            saved = self._initial()
+            self.store.save(self.name, saved)
+        return _TailState(saved, self.overlap_ms)
+
+    def _window(self, state: _TailState) -> dict:
+        return {**self.query, "opType": "DEPOSIT", "from": state.window_start()}
+
+    def poll(self) -> Iterator[dict]:
+        """Yield the deposits created since the mark, oldest first, moving the mark as they are consumed.
+
+        The mark is saved when the generator is exhausted or closed, if it moved.
+
+        Tatum lists the window newest first, so it is read to its end before the oldest new
+        deposit can be yielded; deposits already delivered are dropped while it is read.
+        """
+        state = self._load()
+        records = state.new(self.transactions.iter_transactions_within_ledger(self._window(state), self.page_size))
+        try:
+            for record in records:
+                yield record
+                state.mark(record)
+        finally:
+            if state.marked:
+                self.store.save(self.name, state.dump())
+
+    def follow(self, interval: float = None, stop: threading.Event = None) -> Iterator[dict]:
+        """Yield new deposits as they arrive, until `stop` is set.
+
+        Args:
+            interval (float, optional): Seconds slept after a poll that found nothing.
+                Defaults to TATUM_DEPOSIT_POLL_INTERVAL.
+            stop (threading.Event, optional): Ends the loop once set.
+        """
+        interval = conf.TATUM_DEPOSIT_POLL_INTERVAL if interval is None else interval
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            found = False
+            for record in self.poll():
+                found = True
+                yield record
+            if not found:
+                stop.wait(interval)
+
+
+class AsyncDepositTail(DepositTail):
+    """Asyncio counterpart of `DepositTail`; the cursor is loaded and saved with `aload` and `asave`.
+
+    Args:
+        transactions (AsyncTatumTransactions, optional): Client reading the ledger.
+    """
+
+    def __init__(self, *args, transactions: AsyncTatumTransactions = None, **kwargs):
+        super().__init__(*args, transactions=transactions or AsyncTatumTransactions(), **kwargs)
+
+    async def _aload(self) -> _TailState:
+        saved = await self.store.aload(self.name)
+        if saved is None:
+            saved = self._initial()
+            await self.store.asave(self.name, saved)
+        return _TailState(saved, self.overlap_ms)
+
+    async def poll(self) -> AsyncIterator[dict]:
+        state = await self._aload()
+        listing = self.transactions.iter_transactions_within_ledger(self._window(state), self.page_size)
+        records = state.new([record async for record in listing if record["reference"] not in state.recent])
+        try:
+            for record in records:
+                yield record
+                state.mark(record)
+        finally:
+            if state.marked:
+                await self.store.asave(self.name, state.dump())
+
+    async def follow(self, interval: float = None, stop: asyncio.Event = None) -> AsyncIterator[dict]:
+        interval = conf.TATUM_DEPOSIT_POLL_INTERVAL if interval is None else interval
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            found = False
+            async for record in self.poll():
+                found = True
+                yield record
+            if not found:
+                try:
+                    await asyncio.wait_for(stop.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,432 @@
+"""Tatum order book client and a local, incrementally updated copy of the book.
+
+Depth and best price queries served by REST calls cost a round trip per tick.
+`OrderBookMirror` keeps a `LocalOrderBook` per currency pair in memory instead, loaded from
+Tatum's active trade listings and then kept current from the newest listing and history
+pages and the best-priced page of each side, so matching and risk checks read the book in
+microseconds.
+
+Each side of a `LocalOrderBook` is a dict of price levels plus a heap of their prices:
+
+- Inserting an order is O(1) on an existing level and O(log n) when it opens a level.
+- Cancelling an order is O(1); an emptied level is deleted from the dict at once and its
+  heap entry lazily, so the heap top is always a live level and the best price is O(1).
+- Reading the best k levels walks the heap from its top, in O(k log k).
+- Orders in a level keep their arrival order, i.e. their time priority.
+"""
+import heapq
+import threading
+from decimal import Decimal
+from itertools import islice
+from typing import AsyncIterator
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client.exceptions import TatumAPIException
+from django_tatum.apps.tatum.tatum_client.types.transaction_types import StoreTradeDict
+from django_tatum.apps.tatum.tatum_client.types.transaction_types import TradeDict
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import AsyncBaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
+from django_tatum.apps.tatum.utils.pagination import MAX_PAGE_SIZE
+from django_tatum.apps.tatum.utils.pagination import aiter_records
+from django_tatum.apps.tatum.utils.pagination import check_page_size
+from django_tatum.apps.tatum.utils.pagination import iter_records
+
+BUY = "BUY"
+SELL = "SELL"
+# Trade types resting on each side of the book.
+SIDES = {"BUY": BUY, "FUTURE_BUY": BUY, "SELL": SELL, "FUTURE_SELL": SELL}
+
+
+def _listing_body(pair: str, page_size: int, offset: int, sort: str) -> dict:
+    return {"pair": pair, "pageSize": page_size, "offset": offset, "sort": [sort]}
+
+
+class TatumOrderBook(BaseRequestHandler):
+    def store_trade(self, data: StoreTradeDict) -> dict:
+        """Place a buy or sell trade; Tatum matches it against the opposite side.
+
+        Returns:
+            dict: The `id` of the stored trade.
+        """
+        return self._fetch_json("POST", "trade", data=data)
+
+    def get_trade(self, trade_id: str) -> TradeDict:
+        return self._fetch_json("GET", f"trade/{trade_id}")
+
+    def cancel_trade(self, trade_id: str):
+        """Cancel an open trade, unblocking the rest of its amount."""
+        return self._fetch_json("DELETE", f"trade/{trade_id}")
+
+    def cancel_account_trades(self, account_id: str):
+        """Cancel every open trade of an account."""
+        return self._fetch_json("DELETE", f"trade/account/{account_id}")
+
+    def iter_active_trades(
+        self,
+        side: str,
+        pair: str,
+        sort: str = "CREATED_DESC",
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[TradeDict]:
+        """Lazily iterate over the open trades of one side of a pair.
+
+        Args:
+            side (str): "BUY" or "SELL".
+            pair (str): The currency pair, e.g. "VC_DEMO/VC_EUR".
+            sort (str, optional): Tatum sort order, e.g. "PRICE_ASC". Defaults to newest first.
+            page_size (int, optional): Trades requested per page. Defaults to 50.
+        """
+        check_page_size(page_size)
+        return iter_records(
+            lambda page: self._fetch_json(
+                "POST", f"trade/{side.lower()}", data=_listing_body(pair, page_size, page * page_size, sort)
+            ),
+            page_size,
+        )
+
+    def iter_history(self, pair: str, sort: str = "CREATED_DESC", page_size: int = MAX_PAGE_SIZE) -> Iterator[TradeDict]:
+        """Lazily iterate over the closed trades of a pair, newest first by default."""
+        check_page_size(page_size)
+        return iter_records(
+            lambda page: self._fetch_json(
+                "POST", "trade/history", data=_listing_body(pair, page_size, page * page_size, sort)
+            ),
+            page_size,
+        )
+
+
+class AsyncTatumOrderBook(AsyncBaseRequestHandler):
+    """Asyncio counterpart of `TatumOrderBook`."""
+
+    async def store_trade(self, data: StoreTradeDict) -> dict:
+        return await self._fetch_json("POST", "trade", data=data)
+
+    async def get_trade(self, trade_id: str) -> TradeDict:
+        return await self._fetch_json("GET", f"trade/{trade_id}")
+
+    async def cancel_trade(self, trade_id: str):
+        return await self._fetch_json("DELETE", f"trade/{trade_id}")
+
+    async def cancel_account_trades(self, account_id: str):
+        return await self._fetch_json("DELETE", f"trade/account/{account_id}")
+
+    def iter_active_trades(
+        self,
+        side: str,
+        pair: str,
+        sort: str = "CREATED_DESC",
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[TradeDict]:
+        check_page_size(page_size)
+        return aiter_records(
+            lambda page: self._fetch_json(
+                "POST", f"trade/{side.lower()}", data=_listing_body(pair, page_size, page * page_size, sort)
+            ),
+            page_size,
+        )
+
+    def iter_history(self, pair: str, sort: str = "CREATED_DESC", page_size: int = MAX_PAGE_SIZE) -> AsyncIterator[TradeDict]:
+        check_page_size(page_size)
+        return aiter_records(
+            lambda page: self._fetch_json(
+                "POST", "trade/history", data=_listing_body(pair, page_size, page * page_size, sort)
+            ),
+            page_size,
+        )
+
+
+class Level(NamedTuple):
+    price: Decimal
+    quantity: Decimal
+    orders: int
+
+
+class _Level:
+    __slots__ = ("quantity", "orders")
+
+    def __init__(self):
+        self.quantity = Decimal(0)
+        # Remaining amount by trade ID, in arrival order.
+        self.orders: dict[str, Decimal] = {}
+
+
+class _BookSide:
+    """Price levels of one side, best first: highest price for bids, lowest for asks."""
+
+    def __init__(self, descending: bool):
+        self._sign = -1 if descending else 1
+        self.levels: dict[Decimal, _Level] = {}
+        # Signed prices, so the heap top is the best price; may hold prices of deleted levels.
+        self._heap: list[Decimal] = []
+        self._in_heap: set[Decimal] = set()
+
+    def add(self, price: Decimal, trade_id: str, quantity: Decimal):
+        level = self.levels.get(price)
+        if level is None:
+            level = self.levels[price] = _Level()
+            key = price * self._sign
+            if key not in self._in_heap:
+                heapq.heappush(self._heap, key)
+                self._in_heap.add(key)
+        level.orders[trade_id] = quantity
+        level.quantity += quantity
+
+    def update(self, price: Decimal, trade_id: str, quantity: Decimal):
+        level = self.levels[price]
+        level.quantity += quantity - level.orders[trade_id]
+        level.orders[trade_id] = quantity
+
+    def discard(self, price: Decimal, trade_id: str):
+        level = self.levels[price]
+        level.quantity -= level.orders.pop(trade_id)
+        if level.orders:
+            return
+        del self.levels[price]
+        # Pop the deleted levels off the top now, so `best` stays a plain lookup.
+        while self._heap and self._heap[0] * self._sign not in self.levels:
+            self._in_heap.discard(heapq.heappop(self._heap))
+        if len(self._heap) > 2 * len(self.levels) + 64:
+            self._heap = [price * self._sign for price in self.levels]
+            heapq.heapify(self._heap)
+            self._in_heap = set(self._heap)
+
+    def best(self) -> Optional[Level]:
+        if not self._heap:
+            return None
+        price = self._heap[0] * self._sign
+        level = self.levels[price]
+        return Level(price, level.quantity, len(level.orders))
+
+    def walk(self) -> Iterator[tuple[Decimal, _Level]]:
+        """Yield the live levels best first, in O(log k) each: the heap is walked from its top in order."""
+        frontier = [(self._heap[0], 0)] if self._heap else []
+        while frontier:
+            key, index = heapq.heappop(frontier)
+            level = self.levels.get(key * self._sign)
+            if level is not None:
+                yield key * self._sign, level
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self._heap):
+                    heapq.heappush(frontier, (self._heap[child], child))
+
+    def better(self, price: Decimal, than: Decimal) -> bool:
+        return price * self._sign < than * self._sign
+
+    def depth(self, levels: int) -> list[Level]:
+        """The best `levels` levels, in O(k log k)."""
+        return [Level(price, level.quantity, len(level.orders)) for price, level in islice(self.walk(), levels)]
+
+
+class LocalOrderBook:
+    """In-memory order book of one currency pair, safe to share between threads.
+
+    Args:
+        pair (str): The currency pair, e.g. "VC_DEMO/VC_EUR".
+    """
+
+    def __init__(self, pair: str):
+        self.pair = pair
+        self._sides = {BUY: _BookSide(descending=True), SELL: _BookSide(descending=False)}
+        # Side and price of every resting trade, by trade ID.
+        self._orders: dict[str, tuple[str, Decimal]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, trade_id: str) -> bool:
+        return trade_id in self._orders
+
+    def apply(self, trade: TradeDict):
+        """Insert or update a trade from its Tatum record; a filled trade is removed."""
+        side = SIDES[trade["type"]]
+        price = Decimal(str(trade["price"]))
+        remaining = Decimal(str(trade["amount"])) - Decimal(str(trade.get("fill") or 0))
+        trade_id = trade["id"]
+        with self._lock:
+            if remaining <= 0:
+                self.remove(trade_id)
+            elif self._orders.get(trade_id) == (side, price):
+                self._sides[side].update(price, trade_id, remaining)
+            else:
+                self.remove(trade_id)
+                self._sides[side].add(price, trade_id, remaining)
+                self._orders[trade_id] = (side, price)
+
+    def remove(self, trade_id: str) -> bool:
+        """Drop a cancelled or closed trade. Returns whether it was in the book."""
+        with self._lock:
+            entry = self._orders.pop(trade_id, None)
+            if entry is None:
+                return False
+            side, price = entry
+            self._sides[side].discard(price, trade_id)
+            return True
+
+    def reconcile(self, side: str, trades: list[TradeDict], complete: bool = False) -> int:
+        """Align the top of one side with a best-first page of its open trades.
+
+        The trades of the page are applied. Trades of the book priced strictly better than
+        the last one of the page but missing from it were closed, and are removed.
+
+        Args:
+            side (str): "BUY" or "SELL".
+            trades (list[TradeDict]): Open trades of the side, best price first.
+            complete (bool, optional): The page holds every open trade of the side, so
+                every trade missing from it is removed. Defaults to False.
+
+        Returns:
+            int: The number of trades removed.
+        """
+        with self._lock:
+            for trade in trades:
+                self.apply(trade)
+            listed = {trade["id"] for trade in trades}
+            book_side = self._sides[side]
+            bound = None if complete or not trades else Decimal(str(trades[-1]["price"]))
+            if bound is None and not complete:
+                return 0
+            closed = []
+            for price, level in book_side.walk():
+                if bound is not None and not book_side.better(price, bound):
+                    break
+                closed += [trade_id for trade_id in level.orders if trade_id not in listed]
+            for trade_id in closed:
+                self.remove(trade_id)
+            return len(closed)
+
+    def clear(self):
+        with self._lock:
+            self._sides = {BUY: _BookSide(descending=True), SELL: _BookSide(descending=False)}
+            self._orders.clear()
+
+    def best_bid(self) -> Optional[Level]:
+        with self._lock:
+            return self._sides[BUY].best()
+
+    def best_ask(self) -> Optional[Level]:
+        with self._lock:
+            return self._sides[SELL].best()
+
+    def spread(self) -> Optional[Decimal]:
+        with self._lock:
+            bid, ask = self._sides[BUY].best(), self._sides[SELL].best()
+        return ask.price - bid.price if bid and ask else None
+
+    def depth(self, levels: int = 10) -> dict[str, list[Level]]:
+        """The best `levels` price levels of each side, best first."""
+        with self._lock:
+            return {"bids": self._sides[BUY].depth(levels), "asks": self._sides[SELL].depth(levels)}
+
+
+class OrderBookMirror:
+    """Local order books of the pairs in use, kept in step with Tatum.
+
+    `load` reads a pair's open trades once. `poll` then only reads the newest pages:
+    open trades created since the last poll are added, and trades created and closed since
+    then, read from the trade history, are removed. A new trade that crossed the book also
+    filled older trades, which are not in the newest history page as it is sorted by
+    creation time; so whenever a poll sees new trades, it also reads the best-priced page of
+    each side and reconciles the top of the book with it. Cancellations made elsewhere and
+    changes further down the book are picked up by the full reload `poll` runs every
+    `reload_every` polls. Trades placed or cancelled through the mirror update the book
+    straight away.
+
+    Args:
+        client (TatumOrderBook, optional): Client reading the trades.
+        page_size (int, optional): Trades requested per page. Defaults to 50.
+        reload_every (int, optional): Polls between two full reloads; 0 disables them.
+            Defaults to TATUM_ORDER_BOOK_RELOAD_EVERY.
+    """
+
+    def __init__(self, client: TatumOrderBook = None, page_size: int = MAX_PAGE_SIZE, reload_every: int = None):
+        self.client = client or TatumOrderBook()
+        self.page_size = page_size
+        self.reload_every = conf.TATUM_ORDER_BOOK_RELOAD_EVERY if reload_every is None else reload_every
+        self._books: dict[str, LocalOrderBook] = {}
+        # Creation time of the newest open and closed trade seen, by pair.
+        self._marks: dict[str, dict[str, int]] = {}
+        self._polls: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def book(self, pair: str) -> LocalOrderBook:
+        """The local book of `pair`, loaded from Tatum on first use."""
+        if pair not in self._books:
+            self.load(pair)
+        return self._books[pair]
+
+    def load(self, pair: str) -> LocalOrderBook:
+        """Rebuild the book of `pair` from its open trades."""
+        book = LocalOrderBook(pair)
+        marks = {BUY: 0, SELL: 0, "history": self._newest_closed(pair)}
+        for side in (BUY, SELL):
+            for trade in self.client.iter_active_trades(side, pair, page_size=self.page_size):
+                book.apply(trade)
+                marks[side] = max(marks[side], trade.get("created") or 0)
+        with self._lock:
+            self._books[pair] = book
+            self._marks[pair] = marks
+            self._polls[pair] = 0
+        return book
+
+    def _newest_closed(self, pair: str) -> int:
+        newest = next(iter(self.client.iter_history(pair, page_size=1)), None)
+        return (newest or {}).get("created") or 0
+
+    def _newer(self, trades: Iterator[TradeDict], mark: int) -> Iterator[TradeDict]:
+        """The trades of a newest-first listing created at or after `mark`."""
+        for trade in trades:
+            if (trade.get("created") or 0) < mark:
+                return
+            yield trade
+
+    def poll(self, pair: str) -> LocalOrderBook:
+        """Bring the book of `pair` up to date from the newest listing and history pages."""
+        with self._lock:
+            polls = self._polls.get(pair)
+            if polls is not None:
+                self._polls[pair] = polls + 1
+        if polls is None or (self.reload_every and polls + 1 >= self.reload_every):
+            return self.load(pair)
+        book, marks = self._books[pair], self._marks[pair]
+        changed = False
+        # Trades created at the mark itself are read again, as more may share its timestamp.
+        for side in (BUY, SELL):
+            for trade in self._newer(self.client.iter_active_trades(side, pair, page_size=self.page_size), marks[side]):
+                changed |= trade["id"] not in book or (trade.get("created") or 0) > marks[side]
+                book.apply(trade)
+                marks[side] = max(marks[side], trade.get("created") or 0)
+        for trade in self._newer(self.client.iter_history(pair, page_size=self.page_size), marks["history"]):
+            changed |= book.remove(trade["id"]) or (trade.get("created") or 0) > marks["history"]
+            marks["history"] = max(marks["history"], trade.get("created") or 0)
+        if changed:
+            for side, sort in ((BUY, "PRICE_DESC"), (SELL, "PRICE_ASC")):
+                top = list(islice(self.client.iter_active_trades(side, pair, sort, self.page_size), self.page_size))
+                book.reconcile(side, top, complete=len(top) < self.page_size)
+        return book
+
+    def place(self, data: StoreTradeDict) -> dict:
+        """Store a trade with Tatum and add it to the local book of its pair.
+
+        The trade may have been matched on arrival, so it is read back before being applied.
+        """
+        stored = self.client.store_trade(data)
+        if data["pair"] in self._books:
+            try:
+                trade = self.client.get_trade(stored["id"])
+            except TatumAPIException:
+                # Filled on arrival and closed: nothing rests in the book.
+                return stored
+            self._books[data["pair"]].apply(trade)
+        return stored
+
+    def cancel(self, trade_id: str):
+        """Cancel a trade with Tatum and drop it from the local books."""
+        response = self.client.cancel_trade(trade_id)
+        for book in list(self._books.values()):
+            if book.remove(trade_id):
+                break
+        return response
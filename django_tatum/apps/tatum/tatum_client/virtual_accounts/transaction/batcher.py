@@ -0,0 +1,294 @@
+"""Micro-batching of ledger payments.
+
+`PaymentBatcher` collects the payments submitted concurrently from the same sender
+account and posts them as one `ledger/transaction/batch` call once the batch is full or
+its wait window has elapsed. Each caller gets back the result for its own payment, in
+the same shape `TatumTransactions.send_payment` returns.
+
+Tatum applies a batch atomically. When a batch is rejected with a 4xx status nothing
+was transferred, so its payments are resent one by one and only the offending payment
+fails. A 5xx response or a transport error leaves the outcome unknown; those payments
+are not resent, and every caller of the batch receives the error.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client.exceptions import TatumAPIException
+from django_tatum.apps.tatum.tatum_client.types.transaction_types import SendPaymentDict
+from django_tatum.apps.tatum.tatum_client.types.transaction_types import TransactionDict
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.transaction import AsyncTatumTransactions
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.transaction import TatumTransactions
+
+
+def _split_payment(data: SendPaymentDict) -> tuple[str, TransactionDict]:
+    """Split a payment into its sender account and the batch entry of the transfer."""
+    if not data or not data.get("senderAccountId"):
+        raise ValueError("senderAccountId is required to batch a payment.")
+    transaction = {key: value for key, value in data.items() if key != "senderAccountId"}
+    return data["senderAccountId"], transaction
+
+
+def _batch_results(batch: list[dict], response: Any) -> list[Any]:
+    """Match the references returned for a batch with its payments."""
+    if not isinstance(response, list) or len(response) != len(batch):
+        raise TatumAPIException(200, response, "Tatum returned an unexpected batch payment response.")
+    return response
+
+
+def _resolve(future, result: Any = None, error: Exception = None):
+    """Complete an asyncio future unless its caller stopped waiting for it."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {"batches": 0, "batched_payments": 0, "single_payments": 0, "fallbacks": 0}
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, count in counts.items():
+                self.counters[name] += count
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+
+class PaymentBatcher:
+    """Fold concurrent payments from the same sender into batch payments.
+
+    Args:
+        client (TatumTransactions, optional): Client the payments are sent with. It must not
+            route its own `send_payment` through a batcher. Defaults to a new client.
+        max_batch_size (int, optional): Payments per batch; a full batch is sent immediately.
+            Defaults to TATUM_PAYMENT_BATCH_SIZE.
+        max_wait (float, optional): Seconds the first payment of a batch waits for others.
+            Defaults to TATUM_PAYMENT_BATCH_WAIT.
+        max_workers (int, optional): Batches sent concurrently. Defaults to 4.
+    """
+
+    def __init__(
+        self,
+        client: TatumTransactions = None,
+        max_batch_size: int = None,
+        max_wait: float = None,
+        max_workers: int = 4,
+    ):
+        self.client = client or TatumTransactions()
+        self.max_batch_size = max(max_batch_size or conf.TATUM_PAYMENT_BATCH_SIZE, 1)
+        self.max_wait = conf.TATUM_PAYMENT_BATCH_WAIT if max_wait is None else max_wait
+        self.stats = _Stats()
+        self._condition = threading.Condition()
+        # senderAccountId -> (deadline, [(data, transaction, future), ...])
+        self._pending: dict[str, tuple[float, list]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tatum-payment-batch")
+        self._closed = False
+        self._timer = threading.Thread(target=self._run_timer, name="tatum-payment-batch-timer", daemon=True)
+        self._timer.start()
+
+    def submit(self, data: SendPaymentDict) -> Future:
+        """Queue a payment and return a future resolving to its result.
+
+        Raises:
+            ValueError: If the payment has no senderAccountId.
+            RuntimeError: If the batcher was closed.
+        """
+        sender, transaction = _split_payment(data)
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot submit a payment to a closed batcher.")
+            deadline, items = self._pending.setdefault(sender, (time.monotonic() + self.max_wait, []))
+            items.append((data, transaction, future))
+            if len(items) >= self.max_batch_size:
+                del self._pending[sender]
+                self._dispatch(sender, items)
+            else:
+                self._condition.notify()
+        return future
+
+    def send_payment(self, data: SendPaymentDict = None):
+        """Send a payment through the batcher and wait for its result.
+
+        Returns:
+            The Tatum response for this payment, e.g. {"reference": "..."}, or its error body.
+        """
+        return self.submit(data).result()
+
+    def flush(self):
+        """Send every pending batch now, without waiting for their windows to elapse."""
+        with self._condition:
+            pending, self._pending = self._pending, {}
+            for sender, (_, items) in pending.items():
+                self._dispatch(sender, items)
+
+    def close(self):
+        """Send the pending batches, wait for every batch in flight and stop the batcher."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._timer.join()
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run_timer(self):
+        with self._condition:
+            while not self._closed:
+                now = time.monotonic()
+                due = [sender for sender, (deadline, _) in self._pending.items() if deadline <= now]
+                for sender in due:
+                    self._dispatch(sender, self._pending.pop(sender)[1])
+                deadlines = [deadline for deadline, _ in self._pending.values()]
+                self._condition.wait(timeout=min(deadlines) - now if deadlines else None)
+
+    def _dispatch(self, sender: str, items: list):
+        self._executor.submit(self._send, sender, items)
+
+    def _send(self, sender: str, items: list):
+        # Payments cancelled while waiting are dropped; the others can no longer be cancelled.
+        items = [item for item in items if item[2].set_running_or_notify_cancel()]
+        if not items:
+            return
+        try:
+            if len(items) == 1:
+                self._send_singly(items)
+                return
+            body = {"senderAccountId": sender, "transaction": [transaction for _, transaction, _ in items]}
+            try:
+                response = self.client._fetch_json("POST", "ledger/transaction/batch", data=body)
+            except TatumAPIException as e:
+                if 400 <= e.status_code < 500:
+                    self.stats.add(fallbacks=1)
+                    self._send_singly(items)
+                else:
+                    for _, _, future in items:
+                        future.set_result(e.payload)
+                return
+            finally:
+                self.client._invalidate_accounts(sender, *(t.get("recipientAccountId") for _, t, _ in items))
+            self.stats.add(batches=1, batched_payments=len(items))
+            for (_, _, future), result in zip(items, _batch_results(items, response)):
+                future.set_result(result)
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _send_singly(self, items: list):
+        for data, _, future in items:
+            try:
+                future.set_result(self.client.send_payment(data))
+            except Exception as e:
+                future.set_exception(e)
+            self.stats.add(single_payments=1)
+
+
+class AsyncPaymentBatcher:
+    """Asyncio counterpart of `PaymentBatcher`.
+
+    A batcher belongs to the event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        client: AsyncTatumTransactions = None,
+        max_batch_size: int = None,
+        max_wait: float = None,
+    ):
+        self.client = client or AsyncTatumTransactions()
+        self.max_batch_size = max(max_batch_size or conf.TATUM_PAYMENT_BATCH_SIZE, 1)
+        self.max_wait = conf.TATUM_PAYMENT_BATCH_WAIT if max_wait is None else max_wait
+        self.stats = _Stats()
+        # senderAccountId -> (flush timer, [(data, transaction, future), ...])
+        self._pending: dict[str, tuple[asyncio.TimerHandle, list]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def send_payment(self, data: SendPaymentDict = None):
+        sender, transaction = _split_payment(data)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if sender not in self._pending:
+            self._pending[sender] = (loop.call_later(self.max_wait, self._flush_sender, sender), [])
+        items = self._pending[sender][1]
+        items.append((data, transaction, future))
+        if len(items) >= self.max_batch_size:
+            self._flush_sender(sender)
+        return await future
+
+    async def flush(self):
+        """Send every pending batch now and wait for the batches in flight."""
+        for sender in list(self._pending):
+            self._flush_sender(sender)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self):
+        await self.flush()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _flush_sender(self, sender: str):
+        timer, items = self._pending.pop(sender)
+        timer.cancel()
+        task = asyncio.ensure_future(self._send(sender, items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, sender: str, items: list):
+        items = [item for item in items if not item[2].cancelled()]
+        if not items:
+            return
+        try:
+            if len(items) == 1:
+                await self._send_singly(items)
+                return
+            body = {"senderAccountId": sender, "transaction": [transaction for _, transaction, _ in items]}
+            try:
+                response = await self.client._fetch_json("POST", "ledger/transaction/batch", data=body)
+            except TatumAPIException as e:
+                if 400 <= e.status_code < 500:
+                    self.stats.add(fallbacks=1)
+                    await self._send_singly(items)
+                else:
+                    for _, _, future in items:
+                        _resolve(future, e.payload)
+                return
+            finally:
+                self.client._invalidate_accounts(sender, *(t.get("recipientAccountId") for _, t, _ in items))
+            self.stats.add(batches=1, batched_payments=len(items))
+            for (_, _, future), result in zip(items, _batch_results(items, response)):
+                _resolve(future, result)
+        except Exception as e:
+            for _, _, future in items:
+                _resolve(future, error=e)
+
+    async def _send_singly(self, items: list):
+        for data, _, future in items:
+            try:
+                _resolve(future, await self.client.send_payment(data))
+            except Exception as e:
+                _resolve(future, error=e)
+            self.stats.add(single_payments=1)
@@ -1,4 +1,9 @@
+from typing import TYPE_CHECKING
+from typing import AsyncIterator
+from typing import Iterator
+
 from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import (
+    AsyncBaseRequestHandler,
     BaseRequestHandler,
 )
 from django_tatum.apps.tatum.tatum_client.types.transaction_types import (
@@ -9,13 +14,45 @@ from django_tatum.apps.tatum.tatum_client.types.transaction_types import (
     FindLedgerTransactionDict,
 )
 
+from django_tatum.apps.tatum.utils.cache import BaseCache
+from django_tatum.apps.tatum.utils.cache import cache_key
+from django_tatum.apps.tatum.utils.pagination import MAX_PAGE_SIZE
+from django_tatum.apps.tatum.utils.pagination import aiter_records
+from django_tatum.apps.tatum.utils.pagination import check_page_size
+from django_tatum.apps.tatum.utils.pagination import iter_records
+
 # from django_tatum.apps.tatum.utils.utility import validate_required_fields
 
+if TYPE_CHECKING:
+    from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.batcher import PaymentBatcher
+
+
+def _payment_account_ids(data: dict) -> list[str]:
+    """Return the sender and recipient account IDs of a single or batch payment."""
+    if not data:
+        return []
+    transactions = data.get("transactions") or data.get("transaction") or []
+    if isinstance(transactions, dict):
+        transactions = [transactions]
+    return [
+        data.get("senderAccountId"),
+        data.get("recipientAccountId"),
+        *(transaction.get("recipientAccountId") for transaction in transactions),
+    ]
+
 
 class TatumTransactions(BaseRequestHandler):
-    def __init__(self):
-        self.setup_request_handler("ledger/transaction")
-        super().__init__()
+    def __init__(self, cache: BaseCache = None, batcher: "PaymentBatcher" = None):
+        """Initialize TatumTransactions class.
+
+        Args:
+            cache (BaseCache, optional): Cache for transaction lookups. Defaults to the
+                process-wide cache.
+            batcher (PaymentBatcher, optional): When given, `send_payment` calls are queued on
+                it and sent as batch payments. Defaults to None.
+        """
+        super().__init__(cache)
+        self.batcher = batcher
 
     def send_payment(
         self,
@@ -36,9 +73,12 @@ class TatumTransactions(BaseRequestHandler):
         Returns:
             Response: The response object containing transaction information.
         """
+        if self.batcher is not None:
+            return self.batcher.send_payment(data)
 
-        self.setup_request_handler("ledger/transaction")
-        response = self.Handler.post(data)
+        handler = self.setup_request_handler("ledger/transaction")
+        response = handler.post(data)
+        self._invalidate_accounts(*_payment_account_ids(data))
         return response.json()
 
     def send_batch_payment(
@@ -50,12 +90,15 @@ class TatumTransactions(BaseRequestHandler):
         Args:
             data (BatchPaymentDict): Parameters required by Tatum API to send a batch payment.
                 The structure of BatchPaymentDict includes:
-                    payments: List[SendPaymentDict]
+                    senderAccountId: str
+                    transaction: List[TransactionDict]
 
         Returns:
             Response: The response object containing transaction information.
         """
-        return self.extracted_from_send_payment("ledger/transaction/batch", data)
+        response = self.extracted_from_send_payment("ledger/transaction/batch", data)
+        self._invalidate_accounts(*_payment_account_ids(data))
+        return response
 
     def find_transaction_for_account(
         self,
@@ -78,7 +121,7 @@ class TatumTransactions(BaseRequestHandler):
         """
 
         try:
-            self.setup_request_handler("ledger/transaction/account")
+            handler = self.setup_request_handler("ledger/transaction/account")
 
             # if "id" not in data or data["id"] is None:
             #     raise ValueError("Missing 'id' field in data")
@@ -96,7 +139,7 @@ class TatumTransactions(BaseRequestHandler):
             if count:
                 query["count"] = count
 
-            response = self.Handler.post(params=query)
+            response = handler.post(params=query)
             return response.json()
 
         except Exception as e:
@@ -129,7 +172,7 @@ class TatumTransactions(BaseRequestHandler):
         """
 
         try:
-            self.setup_request_handler("ledger/transaction/customer")
+            handler = self.setup_request_handler("ledger/transaction/customer")
 
             # if "id" not in data or data["id"] is None:
             #     raise ValueError("Missing 'id' field in data")
@@ -147,7 +190,7 @@ class TatumTransactions(BaseRequestHandler):
             if count:
                 query["count"] = count
 
-            response = self.Handler.post(params=query)
+            response = handler.post(params=query)
             return response.json()
 
         except Exception as e:
@@ -178,7 +221,7 @@ class TatumTransactions(BaseRequestHandler):
         """
 
         try:
-            self.setup_request_handler("ledger/transaction/ledger")
+            handler = self.setup_request_handler("ledger/transaction/ledger")
 
             # if "id" not in data or data["id"] is None:
             #     raise ValueError("Missing 'id' field in data")
@@ -196,7 +239,7 @@ class TatumTransactions(BaseRequestHandler):
             if count:
                 query["count"] = count
 
-            response = self.Handler.post(params=query)
+            response = handler.post(params=query)
             return response.json()
 
         except ValueError as e:
@@ -224,10 +267,171 @@ class TatumTransactions(BaseRequestHandler):
             Response: The response object containing transaction information.
         """
 
-        self.setup_request_handler(f"ledger/transaction/reference/{reference_id}")
+        # Ledger transactions are immutable, so the lookup is cached until evicted.
+        return self._cached_get(
+            cache_key("txref", reference_id),
+            None,
+            f"ledger/transaction/reference/{reference_id}",
+        )
 
-        response = self.Handler.get()
-        return response.json()
+    def iter_transactions_for_account(
+        self,
+        data: FindTransactionDict,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every transaction of an account matching the filter.
+
+        Args:
+            data (FindTransactionDict): The transaction filter; `id` (the account ID) is required by Tatum.
+            page_size (int, optional): Transactions requested per page. Defaults to 50.
+
+        Raises:
+            TatumAPIException: If Tatum answers a page request with an error.
+        """
+        return self._iter_transactions("ledger/transaction/account", data, page_size)
+
+    def iter_transactions_accross_all_customer_accounts(
+        self,
+        data: FindCustomerTransactionDict,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every transaction of a customer matching the filter.
+
+        Args:
+            data (FindCustomerTransactionDict): The transaction filter; `id` (the customer ID) is required by Tatum.
+            page_size (int, optional): Transactions requested per page. Defaults to 50.
+        """
+        return self._iter_transactions("ledger/transaction/customer", data, page_size)
+
+    def iter_transactions_within_ledger(
+        self,
+        data: FindLedgerTransactionDict = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every ledger transaction matching the filter.
+
+        Args:
+            data (FindLedgerTransactionDict, optional): The transaction filter.
+            page_size (int, optional): Transactions requested per page. Defaults to 50.
+        """
+        return self._iter_transactions("ledger/transaction/ledger", data, page_size)
+
+    def _iter_transactions(self, url_prefix: str, data: dict, page_size: int) -> Iterator[dict]:
+        check_page_size(page_size)
+        return iter_records(
+            lambda page: self._fetch_json(
+                "POST",
+                url_prefix,
+                params={"pageSize": page_size, "offset": page * page_size},
+                data=data or {},
+            ),
+            page_size,
+        )
+
+
+class AsyncTatumTransactions(AsyncBaseRequestHandler):
+    """Asyncio counterpart of `TatumTransactions`.
+
+    Every method mirrors the synchronous method of the same name; see its docstring for
+    the parameters and the shape of the Tatum response.
+    """
+
+    async def send_payment(self, data: SendPaymentDict = None):
+        response = await self.extracted_from_send_payment("ledger/transaction", data)
+        self._invalidate_accounts(*_payment_account_ids(data))
+        return response
+
+    async def send_batch_payment(self, data: BatchPaymentDict = None):
+        response = await self.extracted_from_send_payment("ledger/transaction/batch", data)
+        self._invalidate_accounts(*_payment_account_ids(data))
+        return response
+
+    async def find_transaction_for_account(
+        self,
+        data: FindTransactionDict = None,
+        pageSize: int = None,
+        offset: int = None,
+        count: bool = None,
+    ):
+        return await self._find_transactions("ledger/transaction/account", data, pageSize, offset, count)
+
+    async def find_transaction_accross_all_customer_accounts(
+        self,
+        data: FindCustomerTransactionDict = None,
+        pageSize: int = None,
+        offset: int = None,
+        count: bool = None,
+    ):
+        return await self._find_transactions("ledger/transaction/customer", data, pageSize, offset, count)
+
+    async def find_transaction_within_ledger(
+        self,
+        data: FindLedgerTransactionDict = None,
+        pageSize: int = None,
+        offset: int = None,
+        count: bool = None,
+    ):
+        return await self._find_transactions("ledger/transaction/ledger", data, pageSize, offset, count)
+
+    async def find_transaction_by_reference(self, reference_id: str):
+        return await self._cached_get(
+            cache_key("txref", reference_id),
+            None,
+            f"ledger/transaction/reference/{reference_id}",
+        )
+
+    def iter_transactions_for_account(
+        self,
+        data: FindTransactionDict,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        return self._iter_transactions("ledger/transaction/account", data, page_size)
+
+    def iter_transactions_accross_all_customer_accounts(
+        self,
+        data: FindCustomerTransactionDict,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        return self._iter_transactions("ledger/transaction/customer", data, page_size)
+
+    def iter_transactions_within_ledger(
+        self,
+        data: FindLedgerTransactionDict = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        return self._iter_transactions("ledger/transaction/ledger", data, page_size)
+
+    def _iter_transactions(self, url_prefix: str, data: dict, page_size: int) -> AsyncIterator[dict]:
+        check_page_size(page_size)
+        return aiter_records(
+            lambda page: self._fetch_json(
+                "POST",
+                url_prefix,
+                params={"pageSize": page_size, "offset": page * page_size},
+                data=data or {},
+            ),
+            page_size,
+        )
+
+    async def _find_transactions(self, url_prefix, data, pageSize, offset, count):
+        query = {}
+        if data:
+            query |= data
+        if pageSize:
+            query["pageSize"] = pageSize
+        if offset:
+            query["offset"] = offset
+        if count:
+            query["count"] = count
+
+        try:
+            response = await self.setup_request_handler(url_prefix).post(params=query)
+            return response.json()
+        except Exception as e:
+            return {
+                "error": "An error occured while trying to send payment",
+                "details": str(e),
+            }
 
 
 send_payment_payload = {
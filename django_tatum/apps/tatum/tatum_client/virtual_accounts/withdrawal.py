@@ -0,0 +1,189 @@
+"""Tatum ledger withdrawals, with idempotency keys and UTXO batching.
+
+A withdrawal first stores the debit in the ledger (`store_withdrawal`), then the signed
+blockchain transaction is broadcast (`broadcast`) and the withdrawal completed with its
+transaction ID. The durable queue and the workers sending withdrawals are in
+`apps.tatum.withdrawals`.
+
+UTXO chains pay several recipients in one transaction: same-sender withdrawals of BTC,
+LTC, DOGE or BCH can be merged into one with `batch_withdrawals`, which lists the
+addresses comma separated with their `multipleAmounts`.
+
+`withdrawal_fee` prices a withdrawal from the shared fee estimates, so withdrawals sent
+without a `fee` of their own share one quote instead of each asking Tatum for one.
+"""
+import hashlib
+from decimal import ROUND_UP
+from decimal import Decimal
+from typing import AsyncIterator
+from typing import Iterator
+
+from django_tatum.apps.tatum.tatum_client.exceptions import MissingparameterException
+from django_tatum.apps.tatum.tatum_client.smart_contracts.fees import FeeEstimator
+from django_tatum.apps.tatum.tatum_client.smart_contracts.fees import get_fee_estimator
+from django_tatum.apps.tatum.tatum_client.types.transaction_types import WithdrawalDict
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import AsyncBaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
+from django_tatum.apps.tatum.utils.pagination import MAX_PAGE_SIZE
+from django_tatum.apps.tatum.utils.pagination import aiter_records
+from django_tatum.apps.tatum.utils.pagination import check_page_size
+from django_tatum.apps.tatum.utils.pagination import iter_records
+
+# Currencies whose withdrawals may pay several addresses in one transaction.
+BATCHABLE_CURRENCIES = frozenset({"BTC", "LTC", "DOGE", "BCH"})
+# Currencies whose withdrawal fee can be priced from Tatum's fee quotes.
+FEE_QUOTED_CURRENCIES = frozenset({"BTC", "LTC", "DOGE", "ETH"})
+
+# Size of a UTXO withdrawal in bytes: overhead, inputs, and one output per recipient plus change.
+# Tatum picks the inputs once the withdrawal is stored, so two are assumed.
+_TX_OVERHEAD_BYTES = 11
+_INPUT_BYTES = 68
+_OUTPUT_BYTES = 31
+_ASSUMED_INPUTS = 2
+# Gas used by a plain ether transfer.
+_ETH_TRANSFER_GAS = 21000
+
+
+def idempotency_key(data: WithdrawalDict) -> str:
+    """Idempotency key of a withdrawal, derived from its sender and `paymentId`.
+
+    Raises:
+        MissingparameterException: If the withdrawal has no `paymentId`.
+    """
+    if not data.get("paymentId"):
+        raise MissingparameterException(["paymentId"], "Withdrawals need a paymentId to be idempotent")
+    return hashlib.sha256(f"{data['senderAccountId']}:{data['paymentId']}".encode()).hexdigest()
+
+
+def batch_payment_id(payment_ids: list[str]) -> str:
+    """The `paymentId` of a merged withdrawal, stable for the same set of withdrawals."""
+    return "batch-" + hashlib.sha256(",".join(sorted(payment_ids)).encode()).hexdigest()[:32]
+
+
+def batch_withdrawals(withdrawals: list[WithdrawalDict]) -> WithdrawalDict:
+    """Merge same-sender withdrawals of a UTXO currency into one multi-recipient withdrawal.
+
+    Raises:
+        ValueError: If the withdrawals do not share their sender account.
+    """
+    senders = {withdrawal["senderAccountId"] for withdrawal in withdrawals}
+    if len(senders) != 1:
+        raise ValueError("Only withdrawals from the same account can be batched.")
+    amounts = [str(withdrawal["amount"]) for withdrawal in withdrawals]
+    merged: WithdrawalDict = {
+        "senderAccountId": senders.pop(),
+        "address": ",".join(withdrawal["address"] for withdrawal in withdrawals),
+        "amount": str(sum((Decimal(amount) for amount in amounts), Decimal(0))),
+        "multipleAmounts": amounts,
+        "paymentId": batch_payment_id([withdrawal["paymentId"] for withdrawal in withdrawals]),
+    }
+    fees = [Decimal(str(withdrawal["fee"])) for withdrawal in withdrawals if withdrawal.get("fee")]
+    if fees:
+        # One transaction pays one fee; the largest requested covers every recipient.
+        merged["fee"] = str(max(fees))
+    return merged
+
+
+def withdrawal_fee(currency: str, recipients: int = 1, tier: str = "medium", estimator: FeeEstimator = None) -> str:
+    """The `fee` of a withdrawal, in units of `currency`, priced from the shared fee estimates.
+
+    Args:
+        currency (str): Currency of the withdrawal, one of FEE_QUOTED_CURRENCIES.
+        recipients (int, optional): Addresses paid by the withdrawal. Defaults to 1.
+        tier (str, optional): The fee tier. Defaults to "medium".
+        estimator (FeeEstimator, optional): Defaults to the process-wide estimator.
+
+    Raises:
+        ValueError: If Tatum does not quote fees for the currency.
+    """
+    currency = currency.upper()
+    if currency not in FEE_QUOTED_CURRENCIES:
+        raise ValueError(f"Tatum does not quote withdrawal fees for {currency}.")
+    price = (estimator or get_fee_estimator()).fee(currency, tier)
+    if currency == "ETH":
+        fee, decimals = price * _ETH_TRANSFER_GAS / Decimal(10**18), Decimal("1e-18")
+    else:
+        size = _TX_OVERHEAD_BYTES + _INPUT_BYTES * _ASSUMED_INPUTS + _OUTPUT_BYTES * (recipients + 1)
+        fee, decimals = price * size / Decimal(10**8), Decimal("1e-8")
+    return format(fee.quantize(decimals, rounding=ROUND_UP).normalize(), "f")
+
+
+class TatumWithdrawals(BaseRequestHandler):
+    def store_withdrawal(self, data: WithdrawalDict) -> dict:
+        """Store a withdrawal in the ledger, blocking its amount on the sender account.
+
+        Returns:
+            dict: The withdrawal `id` and ledger `reference`, and the UTXOs to spend for UTXO chains.
+        """
+        response = self._fetch_json("POST", "offchain/withdrawal", data=data)
+        self._invalidate_accounts(data.get("senderAccountId"))
+        return response
+
+    def broadcast(self, tx_data: str, withdrawal_id: str, currency: str, signature_id: str = None) -> dict:
+        """Broadcast the signed transaction of a stored withdrawal and complete it."""
+        data = {"txData": tx_data, "withdrawalId": withdrawal_id, "currency": currency}
+        if signature_id:
+            data["signatureId"] = signature_id
+        return self._fetch_json("POST", "offchain/withdrawal/broadcast", data=data)
+
+    def complete_withdrawal(self, withdrawal_id: str, tx_id: str):
+        """Mark a withdrawal broadcast by other means as completed."""
+        return self._fetch_json("PUT", f"offchain/withdrawal/{withdrawal_id}/{tx_id}")
+
+    def cancel_withdrawal(self, withdrawal_id: str, revert: bool = True):
+        """Cancel a withdrawal; with `revert`, its amount is given back to the sender."""
+        return self._fetch_json("DELETE", f"offchain/withdrawal/{withdrawal_id}", params={"revert": str(revert).lower()})
+
+    def iter_withdrawals(
+        self,
+        currency: str = None,
+        status: str = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Lazily iterate over the withdrawals, optionally of a currency and status (InProgress, Done...)."""
+        params = {"pageSize": check_page_size(page_size)}
+        if currency:
+            params["currency"] = currency
+        if status:
+            params["status"] = status
+        return iter_records(
+            lambda page: self._fetch_json("GET", "offchain/withdrawal", params={**params, "offset": page * page_size}),
+            page_size,
+        )
+
+
+class AsyncTatumWithdrawals(AsyncBaseRequestHandler):
+    """Asyncio counterpart of `TatumWithdrawals`."""
+
+    async def store_withdrawal(self, data: WithdrawalDict) -> dict:
+        response = await self._fetch_json("POST", "offchain/withdrawal", data=data)
+        self._invalidate_accounts(data.get("senderAccountId"))
+        return response
+
+    async def broadcast(self, tx_data: str, withdrawal_id: str, currency: str, signature_id: str = None) -> dict:
+        data = {"txData": tx_data, "withdrawalId": withdrawal_id, "currency": currency}
+        if signature_id:
+            data["signatureId"] = signature_id
+        return await self._fetch_json("POST", "offchain/withdrawal/broadcast", data=data)
+
+    async def complete_withdrawal(self, withdrawal_id: str, tx_id: str):
+        return await self._fetch_json("PUT", f"offchain/withdrawal/{withdrawal_id}/{tx_id}")
+
+    async def cancel_withdrawal(self, withdrawal_id: str, revert: bool = True):
+        return await self._fetch_json("DELETE", f"offchain/withdrawal/{withdrawal_id}", params={"revert": str(revert).lower()})
+
+    def iter_withdrawals(
+        self,
+        currency: str = None,
+        status: str = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        params = {"pageSize": check_page_size(page_size)}
+        if currency:
+            params["currency"] = currency
+        if status:
+            params["status"] = status
+        return aiter_records(
+            lambda page: self._fetch_json("GET", "offchain/withdrawal", params={**params, "offset": page * page_size}),
+            page_size,
+        )
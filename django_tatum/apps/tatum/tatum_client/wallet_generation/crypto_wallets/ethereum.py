@@ -1,31 +1,24 @@
-from django_tatum.apps.tatum.tatum_client import creds
-from django_tatum.apps.tatum.utils.requestHandler import RequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import AsyncBaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.wallet_generation.crypto_wallets.hd import ETHEREUM_PATH
+from django_tatum.apps.tatum.tatum_client.wallet_generation.crypto_wallets.hd import EVMAddressDerivation
 
 
-class EthereumWallet:
-    def __init__(self):
-        self.requestUrl = f"{creds.TATUM_BASE_URL}ethereum/wallet"
-
-        self.Handler = RequestHandler(
-            self.requestUrl,
-            {
-                "Content-Type": "application/json",
-                "x-api-key": creds.TATUM_API_KEY,
-            },
-        )
+class EthereumWallet(EVMAddressDerivation, BaseRequestHandler):
+    derivation_path = ETHEREUM_PATH
 
     def generate_ethereum_wallet(self):
-        self.requestUrl = f"{creds.TATUM_BASE_URL}ethereum/wallet"
+        response = self.setup_request_handler("ethereum/wallet").get()
+        return response.json()
+
+
+class AsyncEthereumWallet(EVMAddressDerivation, AsyncBaseRequestHandler):
+    """Asyncio counterpart of `EthereumWallet`."""
 
-        self.Handler = RequestHandler(
-            self.requestUrl,
-            {
-                "Content-Type": "application/json",
-                "x-api-key": creds.TATUM_API_KEY,
-            },
-        )
+    derivation_path = ETHEREUM_PATH
 
-        response = self.Handler.get()
+    async def generate_ethereum_wallet(self):
+        response = await self.setup_request_handler("ethereum/wallet").get()
         return response.json()
 
 
@@ -0,0 +1,607 @@
+"""Offline BIP32/BIP44 address derivation for EVM chains.
+
+Tatum's Ethereum and Polygon wallets hand out an extended public key (xpub) at the
+`m/44'/<coin>'/0'/0` level, and the deposit address of index `i` is the child `xpub/i`.
+This module derives those addresses locally, so assigning an address costs no Tatum call:
+
+- secp256k1 point arithmetic in Jacobian coordinates, with a fixed-base table that turns
+  every multiplication by the generator into at most 64 point additions,
+- Keccak-256 for the address, and EIP-55 for its optional checksum,
+- `derive_addresses`, which parses the xpub once and converts a whole index range to
+  affine coordinates with a single modular inversion.
+
+Everything is pure Python on the standard library; Keccak uses pycryptodome when it is
+installed. Private key derivation is provided for completeness and tests; the keys never
+leave the process.
+"""
+import hashlib
+import hmac
+import threading
+from functools import lru_cache
+from typing import Optional
+
+try:
+    from Crypto.Hash import keccak as _pycryptodome_keccak
+except ImportError:  # pragma: no cover - optional dependency
+    _pycryptodome_keccak = None
+
+# secp256k1 domain parameters.
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+G = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+)
+
+HARDENED = 0x80000000
+XPUB_VERSION = bytes.fromhex("0488b21e")
+XPRV_VERSION = bytes.fromhex("0488ade4")
+TPUB_VERSION = bytes.fromhex("043587cf")
+
+# BIP44 account paths whose xpubs Tatum returns for its EVM wallets.
+ETHEREUM_PATH = "m/44'/60'/0'/0"
+POLYGON_PATH = "m/44'/966'/0'/0"
+
+_BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_MASK64 = (1 << 64) - 1
+
+
+# KECCAK-256
+# ------------------------------------------------------------------------------
+def _round_constants() -> tuple[int, ...]:
+    constants = []
+    state = 1
+    for _ in range(24):
+        constant = 0
+        for j in range(7):
+            state = ((state << 1) ^ ((state >> 7) * 0x71)) % 256
+            if state & 2:
+                constant ^= 1 << ((1 << j) - 1)
+        constants.append(constant)
+    return tuple(constants)
+
+
+_ROUND_CONSTANTS = _round_constants()
+
+
+def _keccak_f(lanes: list[int]) -> list[int]:
+    """Keccak-f[1600], unrolled over the 25 lanes kept in locals (lane x + 5y is `a{x+5y}`)."""
+    (
+        a0, a1, a2, a3, a4, a5, a6, a7, a8, a9, a10, a11, a12,
+        a13, a14, a15, a16, a17, a18, a19, a20, a21, a22, a23, a24,
+    ) = lanes  # fmt: skip
+    for constant in _ROUND_CONSTANTS:
+        c0 = a0 ^ a5 ^ a10 ^ a15 ^ a20
+        c1 = a1 ^ a6 ^ a11 ^ a16 ^ a21
+        c2 = a2 ^ a7 ^ a12 ^ a17 ^ a22
+        c3 = a3 ^ a8 ^ a13 ^ a18 ^ a23
+        c4 = a4 ^ a9 ^ a14 ^ a19 ^ a24
+        d0 = c4 ^ (((c1 << 1) | (c1 >> 63)) & _MASK64)
+        d1 = c0 ^ (((c2 << 1) | (c2 >> 63)) & _MASK64)
+        d2 = c1 ^ (((c3 << 1) | (c3 >> 63)) & _MASK64)
+        d3 = c2 ^ (((c4 << 1) | (c4 >> 63)) & _MASK64)
+        d4 = c3 ^ (((c0 << 1) | (c0 >> 63)) & _MASK64)
+        b0 = a0 ^ d0
+        lane = a5 ^ d0
+        b16 = ((lane << 36) | (lane >> 28)) & _MASK64
+        lane = a10 ^ d0
+        b7 = ((lane << 3) | (lane >> 61)) & _MASK64
+        lane = a15 ^ d0
+        b23 = ((lane << 41) | (lane >> 23)) & _MASK64
+        lane = a20 ^ d0
+        b14 = ((lane << 18) | (lane >> 46)) & _MASK64
+        lane = a1 ^ d1
+        b10 = ((lane << 1) | (lane >> 63)) & _MASK64
+        lane = a6 ^ d1
+        b1 = ((lane << 44) | (lane >> 20)) & _MASK64
+        lane = a11 ^ d1
+        b17 = ((lane << 10) | (lane >> 54)) & _MASK64
+        lane = a16 ^ d1
+        b8 = ((lane << 45) | (lane >> 19)) & _MASK64
+        lane = a21 ^ d1
+        b24 = ((lane << 2) | (lane >> 62)) & _MASK64
+        lane = a2 ^ d2
+        b20 = ((lane << 62) | (lane >> 2)) & _MASK64
+        lane = a7 ^ d2
+        b11 = ((lane << 6) | (lane >> 58)) & _MASK64
+        lane = a12 ^ d2
+        b2 = ((lane << 43) | (lane >> 21)) & _MASK64
+        lane = a17 ^ d2
+        b18 = ((lane << 15) | (lane >> 49)) & _MASK64
+        lane = a22 ^ d2
+        b9 = ((lane << 61) | (lane >> 3)) & _MASK64
+        lane = a3 ^ d3
+        b5 = ((lane << 28) | (lane >> 36)) & _MASK64
+        lane = a8 ^ d3
+        b21 = ((lane << 55) | (lane >> 9)) & _MASK64
+        lane = a13 ^ d3
+        b12 = ((lane << 25) | (lane >> 39)) & _MASK64
+        lane = a18 ^ d3
+        b3 = ((lane << 21) | (lane >> 43)) & _MASK64
+        lane = a23 ^ d3
+        b19 = ((lane << 56) | (lane >> 8)) & _MASK64
+        lane = a4 ^ d4
+        b15 = ((lane << 27) | (lane >> 37)) & _MASK64
+        lane = a9 ^ d4
+        b6 = ((lane << 20) | (lane >> 44)) & _MASK64
+        lane = a14 ^ d4
+        b22 = ((lane << 39) | (lane >> 25)) & _MASK64
+        lane = a19 ^ d4
+        b13 = ((lane << 8) | (lane >> 56)) & _MASK64
+        lane = a24 ^ d4
+        b4 = ((lane << 14) | (lane >> 50)) & _MASK64
+        a0 = b0 ^ (~b1 & b2)
+        a1 = b1 ^ (~b2 & b3)
+        a2 = b2 ^ (~b3 & b4)
+        a3 = b3 ^ (~b4 & b0)
+        a4 = b4 ^ (~b0 & b1)
+        a5 = b5 ^ (~b6 & b7)
+        a6 = b6 ^ (~b7 & b8)
+        a7 = b7 ^ (~b8 & b9)
+        a8 = b8 ^ (~b9 & b5)
+        a9 = b9 ^ (~b5 & b6)
+        a10 = b10 ^ (~b11 & b12)
+        a11 = b11 ^ (~b12 & b13)
+        a12 = b12 ^ (~b13 & b14)
+        a13 = b13 ^ (~b14 & b10)
+        a14 = b14 ^ (~b10 & b11)
+        a15 = b15 ^ (~b16 & b17)
+        a16 = b16 ^ (~b17 & b18)
+        a17 = b17 ^ (~b18 & b19)
+        a18 = b18 ^ (~b19 & b15)
+        a19 = b19 ^ (~b15 & b16)
+        a20 = b20 ^ (~b21 & b22)
+        a21 = b21 ^ (~b22 & b23)
+        a22 = b22 ^ (~b23 & b24)
+        a23 = b23 ^ (~b24 & b20)
+        a24 = b24 ^ (~b20 & b21)
+        a0 ^= constant
+    return [
+        a0, a1, a2, a3, a4, a5, a6, a7, a8, a9, a10, a11, a12,
+        a13, a14, a15, a16, a17, a18, a19, a20, a21, a22, a23, a24,
+    ]  # fmt: skip
+
+
+def keccak256(data: bytes) -> bytes:
+    """Keccak-256 as used by Ethereum (the original padding, not SHA3-256)."""
+    if _pycryptodome_keccak is not None:
+        return _pycryptodome_keccak.new(data=data, digest_bits=256).digest()
+    rate = 136
+    padded = bytearray(data) + b"\x01" + bytes(-(len(data) + 1) % rate)
+    padded[-1] |= 0x80
+    lanes = [0] * 25
+    for offset in range(0, len(padded), rate):
+        for i in range(rate // 8):
+            lanes[i] ^= int.from_bytes(padded[offset + 8 * i : offset + 8 * i + 8], "little")
+        lanes = _keccak_f(lanes)
+    return b"".join(lane.to_bytes(8, "little") for lane in lanes[:4])
+
+
+# SECP256K1
+# ------------------------------------------------------------------------------
+# Affine points are (x, y) tuples and Jacobian points (X, Y, Z) tuples with Z = 0 at infinity.
+_INFINITY = (0, 1, 0)
+
+
+def _double(point: tuple[int, int, int]) -> tuple[int, int, int]:
+    x, y, z = point
+    if not z or not y:
+        return _INFINITY
+    yy = y * y % P
+    s = 4 * x * yy % P
+    m = 3 * x * x % P
+    x3 = (m * m - 2 * s) % P
+    return x3, (m * (s - x3) - 8 * yy * yy) % P, 2 * y * z % P
+
+
+def _add_affine(point: tuple[int, int, int], other: tuple[int, int]) -> tuple[int, int, int]:
+    """Add an affine point to a Jacobian one."""
+    x1, y1, z1 = point
+    if not z1:
+        return other[0], other[1], 1
+    zz = z1 * z1 % P
+    h = (other[0] * zz - x1) % P
+    r = (other[1] * zz * z1 - y1) % P
+    if not h:
+        return _double(point) if not r else _INFINITY
+    hh = h * h % P
+    hhh = h * hh % P
+    v = x1 * hh % P
+    x3 = (r * r - hhh - 2 * v) % P
+    return x3, (r * (v - x3) - y1 * hhh) % P, z1 * h % P
+
+
+def _to_affine(point: tuple[int, int, int]) -> tuple[int, int]:
+    x, y, z = point
+    if not z:
+        raise ValueError("Point at infinity.")
+    z_inv = pow(z, -1, P)
+    zz_inv = z_inv * z_inv % P
+    return x * zz_inv % P, y * zz_inv * z_inv % P
+
+
+def _batch_to_affine(points: list[tuple[int, int, int]]) -> list[tuple[int, int]]:
+    """Convert many Jacobian points with one modular inversion (Montgomery's trick)."""
+    if any(not z for _, _, z in points):
+        raise ValueError("Point at infinity.")
+    prefix = [1]
+    for _, _, z in points:
+        prefix.append(prefix[-1] * z % P)
+    inverse = pow(prefix[-1], -1, P)
+    affine = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        x, y, z = points[i]
+        z_inv = inverse * prefix[i] % P
+        inverse = inverse * z % P
+        zz_inv = z_inv * z_inv % P
+        affine[i] = (x * zz_inv % P, y * zz_inv * z_inv % P)
+    return affine
+
+
+_generator_table: Optional[list[list[tuple[int, int]]]] = None
+_generator_table_lock = threading.Lock()
+
+
+def _build_generator_table() -> list[list[tuple[int, int]]]:
+    """`table[w][j] = j * 16**w * G` for the 64 four-bit windows of a scalar."""
+    table = []
+    base = (G[0], G[1], 1)
+    for _ in range(64):
+        row = [base]
+        base_affine = _to_affine(base)
+        for _ in range(14):
+            row.append(_add_affine(row[-1], base_affine))
+        table.append([None] + _batch_to_affine(row))
+        for _ in range(4):
+            base = _double(base)
+    return table
+
+
+def _multiply_generator(scalar: int) -> tuple[int, int, int]:
+    global _generator_table
+    if _generator_table is None:
+        with _generator_table_lock:
+            if _generator_table is None:
+                _generator_table = _build_generator_table()
+    point = _INFINITY
+    for window, row in enumerate(_generator_table):
+        digit = (scalar >> (4 * window)) & 15
+        if digit:
+            point = _add_affine(point, row[digit])
+    return point
+
+
+def public_point(private_key: int) -> tuple[int, int]:
+    """The public point of a private scalar."""
+    return _to_affine(_multiply_generator(private_key))
+
+
+def serialize_point(point: tuple[int, int], compressed: bool = True) -> bytes:
+    x, y = point
+    if compressed:
+        return bytes([2 + (y & 1)]) + x.to_bytes(32, "big")
+    return b"\x04" + x.to_bytes(32, "big") + y.to_bytes(32, "big")
+
+
+def deserialize_point(data: bytes) -> tuple[int, int]:
+    if len(data) == 33 and data[0] in (2, 3):
+        x = int.from_bytes(data[1:], "big")
+        y = pow((x * x * x + 7) % P, (P + 1) // 4, P)
+        if (y * y - x * x * x - 7) % P:
+            raise ValueError("Not a point on secp256k1.")
+        return x, y if y & 1 == data[0] & 1 else P - y
+    if len(data) == 65 and data[0] == 4:
+        x, y = int.from_bytes(data[1:33], "big"), int.from_bytes(data[33:], "big")
+        if (y * y - x * x * x - 7) % P:
+            raise ValueError("Not a point on secp256k1.")
+        return x, y
+    raise ValueError("Invalid public key encoding.")
+
+
+# ENCODINGS
+# ------------------------------------------------------------------------------
+def _sha256d(data: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def _hash160(data: bytes) -> bytes:
+    return hashlib.new("ripemd160", hashlib.sha256(data).digest()).digest()
+
+
+def b58check_encode(payload: bytes) -> str:
+    data = payload + _sha256d(payload)[:4]
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = _BASE58_ALPHABET[remainder] + encoded
+    return "1" * (len(data) - len(data.lstrip(b"\0"))) + encoded
+
+
+def b58check_decode(text: str) -> bytes:
+    number = 0
+    for char in text:
+        index = _BASE58_ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"Invalid base58 character {char!r}.")
+        number = number * 58 + index
+    body = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    data = b"\0" * (len(text) - len(text.lstrip("1"))) + body
+    payload, checksum = data[:-4], data[-4:]
+    if _sha256d(payload)[:4] != checksum:
+        raise ValueError("Invalid base58 checksum.")
+    return payload
+
+
+def to_checksum_address(address: str) -> str:
+    """EIP-55 mixed-case form of a hex address."""
+    address = address.lower().removeprefix("0x")
+    digest = keccak256(address.encode()).hex()
+    return "0x" + "".join(char.upper() if int(nibble, 16) >= 8 else char for char, nibble in zip(address, digest))
+
+
+def eth_address(point: tuple[int, int], checksum: bool = False) -> str:
+    """Address of a public point, lowercase like Tatum returns it or EIP-55 checksummed."""
+    address = "0x" + keccak256(serialize_point(point, compressed=False)[1:])[-20:].hex()
+    return to_checksum_address(address) if checksum else address
+
+
+def mnemonic_to_seed(mnemonic: str, passphrase: str = "") -> bytes:
+    """BIP39 seed of a mnemonic. The words are not checked against the wordlist."""
+    words = " ".join(mnemonic.split())
+    return hashlib.pbkdf2_hmac("sha512", words.encode(), f"mnemonic{passphrase}".encode(), 2048)
+
+
+def _parse_path(path: str) -> list[int]:
+    indexes = []
+    for part in path.split("/"):
+        if part in ("m", "M", ""):
+            continue
+        hardened = part[-1] in "'hH"
+        index = int(part[:-1] if hardened else part)
+        if not 0 <= index < HARDENED:
+            raise ValueError(f"Invalid derivation index {part!r}.")
+        indexes.append(index + HARDENED if hardened else index)
+    return indexes
+
+
+# EXTENDED KEYS
+# ------------------------------------------------------------------------------
+class ExtendedPublicKey:
+    """A BIP32 extended public key.
+
+    Args:
+        point (tuple[int, int]): The public point.
+        chain_code (bytes): The 32 byte chain code.
+        depth (int, optional): Derivation depth. Defaults to 0.
+        parent_fingerprint (bytes, optional): First 4 bytes of the parent's key hash.
+        child_number (int, optional): Index this key was derived at. Defaults to 0.
+        version (bytes, optional): Serialization prefix. Defaults to the mainnet xpub one.
+    """
+
+    __slots__ = ("point", "chain_code", "depth", "parent_fingerprint", "child_number", "version", "_compressed")
+
+    def __init__(
+        self,
+        point: tuple[int, int],
+        chain_code: bytes,
+        depth: int = 0,
+        parent_fingerprint: bytes = b"\0\0\0\0",
+        child_number: int = 0,
+        version: bytes = XPUB_VERSION,
+    ):
+        self.point = point
+        self.chain_code = chain_code
+        self.depth = depth
+        self.parent_fingerprint = parent_fingerprint
+        self.child_number = child_number
+        self.version = version
+        self._compressed = serialize_point(point)
+
+    @classmethod
+    def from_xpub(cls, xpub: str) -> "ExtendedPublicKey":
+        data = b58check_decode(xpub)
+        if len(data) != 78 or data[:4] not in (XPUB_VERSION, TPUB_VERSION):
+            raise ValueError("Not an extended public key.")
+        return cls(
+            deserialize_point(data[45:]),
+            data[13:45],
+            depth=data[4],
+            parent_fingerprint=data[5:9],
+            child_number=int.from_bytes(data[9:13], "big"),
+            version=data[:4],
+        )
+
+    def to_xpub(self) -> str:
+        return b58check_encode(
+            self.version
+            + bytes([self.depth])
+            + self.parent_fingerprint
+            + self.child_number.to_bytes(4, "big")
+            + self.chain_code
+            + self._compressed
+        )
+
+    @property
+    def fingerprint(self) -> bytes:
+        return _hash160(self._compressed)[:4]
+
+    def _tweak(self, index: int) -> tuple[int, bytes]:
+        if index >= HARDENED:
+            raise ValueError("Hardened children cannot be derived from a public key.")
+        digest = hmac.new(self.chain_code, self._compressed + index.to_bytes(4, "big"), hashlib.sha512).digest()
+        tweak = int.from_bytes(digest[:32], "big")
+        if tweak >= N:
+            raise ValueError(f"Index {index} gives an invalid key; use the next index.")
+        return tweak, digest[32:]
+
+    def _child_point(self, index: int) -> tuple[tuple[int, int, int], bytes]:
+        tweak, chain_code = self._tweak(index)
+        return _add_affine(_multiply_generator(tweak), self.point), chain_code
+
+    def child(self, index: int) -> "ExtendedPublicKey":
+        point, chain_code = self._child_point(index)
+        return ExtendedPublicKey(
+            _to_affine(point), chain_code, self.depth + 1, self.fingerprint, index, self.version
+        )
+
+    def derive(self, path: str) -> "ExtendedPublicKey":
+        """Derive a non-hardened path relative to this key, e.g. "0/5"."""
+        key = self
+        for index in _parse_path(path):
+            key = key.child(index)
+        return key
+
+    def child_points(self, start: int, count: int) -> list[tuple[int, int]]:
+        """Public points of the children `start` to `start + count - 1`."""
+        return _batch_to_affine([self._child_point(index)[0] for index in range(start, start + count)])
+
+    @property
+    def address(self) -> str:
+        return eth_address(self.point, checksum=True)
+
+
+class ExtendedPrivateKey:
+    """A BIP32 extended private key.
+
+    Args:
+        key (int): The private scalar.
+        chain_code (bytes): The 32 byte chain code.
+        depth (int, optional): Derivation depth. Defaults to 0.
+        parent_fingerprint (bytes, optional): First 4 bytes of the parent's key hash.
+        child_number (int, optional): Index this key was derived at. Defaults to 0.
+    """
+
+    __slots__ = ("key", "chain_code", "depth", "parent_fingerprint", "child_number", "_public")
+
+    def __init__(
+        self,
+        key: int,
+        chain_code: bytes,
+        depth: int = 0,
+        parent_fingerprint: bytes = b"\0\0\0\0",
+        child_number: int = 0,
+    ):
+        if not 0 < key < N:
+            raise ValueError("Invalid private key.")
+        self.key = key
+        self.chain_code = chain_code
+        self.depth = depth
+        self.parent_fingerprint = parent_fingerprint
+        self.child_number = child_number
+        self._public: Optional[ExtendedPublicKey] = None
+
+    @classmethod
+    def from_seed(cls, seed: bytes) -> "ExtendedPrivateKey":
+        digest = hmac.new(b"Bitcoin seed", seed, hashlib.sha512).digest()
+        return cls(int.from_bytes(digest[:32], "big"), digest[32:])
+
+    @classmethod
+    def from_mnemonic(cls, mnemonic: str, passphrase: str = "") -> "ExtendedPrivateKey":
+        return cls.from_seed(mnemonic_to_seed(mnemonic, passphrase))
+
+    def public_key(self) -> ExtendedPublicKey:
+        if self._public is None:
+            self._public = ExtendedPublicKey(
+                public_point(self.key), self.chain_code, self.depth, self.parent_fingerprint, self.child_number
+            )
+        return self._public
+
+    def to_xprv(self) -> str:
+        return b58check_encode(
+            XPRV_VERSION
+            + bytes([self.depth])
+            + self.parent_fingerprint
+            + self.child_number.to_bytes(4, "big")
+            + self.chain_code
+            + b"\0"
+            + self.key.to_bytes(32, "big")
+        )
+
+    def child(self, index: int) -> "ExtendedPrivateKey":
+        public = self.public_key()
+        if index >= HARDENED:
+            data = b"\0" + self.key.to_bytes(32, "big") + index.to_bytes(4, "big")
+        else:
+            data = serialize_point(public.point) + index.to_bytes(4, "big")
+        digest = hmac.new(self.chain_code, data, hashlib.sha512).digest()
+        tweak = int.from_bytes(digest[:32], "big")
+        key = (tweak + self.key) % N
+        if tweak >= N or not key:
+            raise ValueError(f"Index {index} gives an invalid key; use the next index.")
+        return ExtendedPrivateKey(key, digest[32:], self.depth + 1, public.fingerprint, index)
+
+    def derive(self, path: str) -> "ExtendedPrivateKey":
+        """Derive a path such as "m/44'/60'/0'/0" relative to this key."""
+        key = self
+        for index in _parse_path(path):
+            key = key.child(index)
+        return key
+
+
+@lru_cache(maxsize=256)
+def parse_xpub(xpub: str) -> ExtendedPublicKey:
+    """Parse an xpub, caching the result for repeated derivations from the same wallet."""
+    return ExtendedPublicKey.from_xpub(xpub)
+
+
+def derive_address(xpub: str, index: int, checksum: bool = False) -> str:
+    """Address of the child `index` of an xpub, as Tatum's `{chain}/address/{xpub}/{index}` returns it."""
+    point, _ = parse_xpub(xpub)._child_point(index)
+    return eth_address(_to_affine(point), checksum)
+
+
+def derive_addresses(xpub: str, start: int, count: int, checksum: bool = False) -> list[str]:
+    """Addresses of the children `start` to `start + count - 1` of an xpub."""
+    return [eth_address(point, checksum) for point in parse_xpub(xpub).child_points(start, count)]
+
+
+class EVMAddressDerivation:
+    """Offline deposit address derivation for the EVM wallet clients.
+
+    The derivation needs no I/O, so the asyncio clients expose the same synchronous methods.
+    """
+
+    # BIP44 path of the wallet xpub; set by each chain's client.
+    derivation_path: str = ETHEREUM_PATH
+
+    def derive_address(self, xpub: str, index: int, checksum: bool = False) -> str:
+        """Derive the address of `index` from a wallet xpub locally, without calling Tatum.
+
+        Args:
+            xpub (str): The `xpub` of a wallet generated by Tatum.
+            index (int): The address index, below 2**31.
+            checksum (bool, optional): Return the EIP-55 mixed-case form. Defaults to False,
+                the lowercase form Tatum returns.
+
+        Returns:
+            str: The address.
+        """
+        return derive_address(xpub, index, checksum)
+
+    def derive_addresses(self, xpub: str, start: int = 0, count: int = 1, checksum: bool = False) -> dict[int, str]:
+        """Derive a range of addresses from a wallet xpub locally.
+
+        Args:
+            xpub (str): The `xpub` of a wallet generated by Tatum.
+            start (int, optional): The first index. Defaults to 0.
+            count (int, optional): How many consecutive indexes to derive. Defaults to 1.
+            checksum (bool, optional): Return EIP-55 mixed-case addresses. Defaults to False.
+
+        Returns:
+            dict[int, str]: The addresses by index.
+        """
+        return dict(zip(range(start, start + count), derive_addresses(xpub, start, count, checksum)))
+
+    def derive_private_key(self, mnemonic: str, index: int) -> str:
+        """Derive the private key of `index` from a wallet mnemonic locally, without calling Tatum.
+
+        Args:
+            mnemonic (str): The `mnemonic` of a wallet generated by Tatum.
+            index (int): The address index, below 2**31.
+
+        Returns:
+            str: The hex encoded private key, as the `key` Tatum's `{chain}/wallet/priv` returns.
+        """
+        key = ExtendedPrivateKey.from_mnemonic(mnemonic).derive(self.derivation_path).child(index)
+        return "0x" + key.key.to_bytes(32, "big").hex()
@@ -1,47 +1,52 @@
 from django_tatum.apps.tatum.tatum_client import creds
-from django_tatum.apps.tatum.utils.requestHandler import RequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import AsyncBaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.base import BaseRequestHandler
+from django_tatum.apps.tatum.tatum_client.wallet_generation.crypto_wallets.hd import POLYGON_PATH
+from django_tatum.apps.tatum.tatum_client.wallet_generation.crypto_wallets.hd import EVMAddressDerivation
 
 
-class PolygonMatic:
-    def __init__(self) -> None:
-        self.requestUrl = f"{creds.TATUM_BASE_URL}polygon/wallet"
-
-        # create an instance of the RequestHandler class
-        self.Handler = RequestHandler(
-            self.requestUrl,
-            {
-                "Content-Type": "application/json",
-                "x-api-key": creds.TATUM_API_KEY,
-            },
-        )
-
+class PolygonMatic(EVMAddressDerivation, BaseRequestHandler):
     # TODO: Create a class with functions for generating all the crypto wallets
+    derivation_path = POLYGON_PATH
+
     def generate_polygon_wallet(self):
         """
         Generates a new Polygon wallet.
         """
         print(f"TATUM_API_KEY: {creds.TATUM_API_KEY}")
         # create a new wallet
-        response = self.Handler.get()
+        response = self.setup_request_handler("polygon/wallet").get()
         # return the wallet address and private key
         # #TODO: return ONLY the wallet address; encrypt the private key in Tatum Key Manager System
         return response.json()
 
     def generate_private_key(self, payload: dict):
-        priv_url = f"{self.requestUrl}/priv"
+        validate = ["index", "mnemonic"]
+        for val in validate:
+            if val not in payload.keys():
+                raise Exception(f"{val} is a required field")
+        response = self.setup_request_handler("polygon/wallet/priv").post(data=payload)
+        return response.json()
+
+
+class AsyncPolygonMatic(EVMAddressDerivation, AsyncBaseRequestHandler):
+    """Asyncio counterpart of `PolygonMatic`."""
+
+    derivation_path = POLYGON_PATH
+
+    async def generate_polygon_wallet(self):
+        """
+        Generates a new Polygon wallet.
+        """
+        response = await self.setup_request_handler("polygon/wallet").get()
+        return response.json()
 
+    async def generate_private_key(self, payload: dict):
         validate = ["index", "mnemonic"]
         for val in validate:
             if val not in payload.keys():
                 raise Exception(f"{val} is a required field")
-        private_key_handler = RequestHandler(
-            priv_url,
-            {
-                "Content-Type": "application/json",
-                "x-api-key": creds.TATUM_API_KEY,
-            },
-        )
-        response = private_key_handler.post(data=payload)
+        response = await self.setup_request_handler("polygon/wallet/priv").post(data=payload)
         return response.json()
 
 
@@ -1,5 +1,6 @@
 # from tatum.tatum_client import creds
 from django_tatum.apps.tatum.tatum_client import creds
+from django_tatum.apps.tatum.utils.asyncRequestHandler import AsyncRequestHandler
 from django_tatum.apps.tatum.utils.requestHandler import RequestHandler
 
 requestUrl = f"{creds.TATUM_BASE_URL}solana/wallet"
@@ -26,6 +27,21 @@ def generate_solana_wallet():
     return response.json()
 
 
+async def generate_solana_wallet_async():
+    """
+    Asyncio counterpart of `generate_solana_wallet`.
+    """
+    handler = AsyncRequestHandler(
+        requestUrl,
+        {
+            "Content-Type": "application/json",
+            "x-api-key": creds.TATUM_API_KEY,
+        },
+    )
+    response = await handler.get()
+    return response.json()
+
+
 if __name__ == "__main__":
     sol_wallet = generate_solana_wallet()
     print(sol_wallet)
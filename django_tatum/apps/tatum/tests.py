@@ -1,3 +1,1767 @@
+import asyncio
+import io
+import gzip
+import json
+import mmap
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from unittest import skipUnless
+
+import requests
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import SimpleTestCase
 from django.test import TestCase
+from django.test import override_settings
+from django.urls import include
+from django.urls import re_path
+from django.urls import reverse
+from django.utils.timezone import now
+from urllib3.exceptions import NewConnectionError
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client import creds
+from django_tatum.apps.tatum.tatum_client.exceptions import TatumAPIException
+from django_tatum.apps.tatum.tatum_client.smart_contracts.fees import FeeEstimator
+from django_tatum.apps.tatum.tatum_client.smart_contracts.fees import FeeRefresher
+from django_tatum.apps.tatum.tatum_client.smart_contracts.nonce import FileNonceStore
+from django_tatum.apps.tatum.tatum_client.smart_contracts.nonce import NonceManager
+from django_tatum.apps.tatum.tatum_client.storage.ipfs import IPFSStorage
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.deposit import AsyncDepositTail
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.deposit import DepositTail
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.deposit import FileCursorStore
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.account import TatumVirtualAccounts
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.oreder_book import SIDES
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.oreder_book import LocalOrderBook
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.oreder_book import OrderBookMirror
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.customer.customer import TatumCustomer
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.batcher import AsyncPaymentBatcher
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.batcher import PaymentBatcher
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.transaction import TatumTransactions
+from django_tatum.apps.tatum.tatum_client.wallet_generation.crypto_wallets import hd
+from django_tatum.apps.tatum.tatum_client.wallet_generation.crypto_wallets.ethereum import EthereumWallet
+from django_tatum.apps.tatum.tatum_client.wallet_generation.crypto_wallets.matic import PolygonMatic
+from django_tatum.apps.tatum.utils.bulk import arun_chunked
+from django_tatum.apps.tatum.utils.bulk import is_rejection
+from django_tatum.apps.tatum.utils.bulk import run_chunked
+from django_tatum.apps.tatum.utils.cache import MISSING
+from django_tatum.apps.tatum.utils.cache import LRUCache
+from django_tatum.apps.tatum.utils import codec as codecs
+from django_tatum.apps.tatum.utils.codec import OrjsonCodec
+from django_tatum.apps.tatum.utils.codec import StdlibCodec
+from django_tatum.apps.tatum.utils.codec import available_codecs
+from django_tatum.apps.tatum.utils.codec import get_codec
+from django_tatum.apps.tatum.utils.codec import make_codec
+from django_tatum.apps.tatum.utils.codec import set_codec
+from django_tatum.apps.tatum.utils.content_cache import ContentCache
+from django_tatum.apps.tatum.utils.export import NDJSONSink
+from django_tatum.apps.tatum.utils.multipart import MultipartFile
+from django_tatum.apps.tatum.utils.scheduler import RequestScheduler
+from django_tatum.apps.tatum.utils.scheduler import TokenBucket
+from django_tatum.apps.tatum.utils.requestHandler import RequestHandler
+from django_tatum.apps.tatum.utils.scheduler import parse_retry_after
+from django_tatum.apps.tatum.utils.singleflight import SingleFlight
+from django_tatum.apps.tatum.utils.singleflight import endpoint_pattern
+
+from . import urls
+from .deposits import DatabaseCursorStore
+from .models import Customer
+from .models import LedgerTransaction
+from .models import PooledAccount
+from .models import SyncCursor
+from .models import VirtualAccount
+from .models import Withdrawal
+from .pool import AccountPool
+from .sync import TRANSACTIONS_CURSOR
+from .sync import LedgerSync
+from .withdrawals import WithdrawalQueue
+from .webhooks import WebhookLog
+from .webhooks import WebhookQueue
+from .webhooks import get_webhook_queue
+from .webhooks import set_webhook_queue
+from .webhooks import sign_payload
+from .webhooks import webhook_received
+from .withdrawals import enqueue_withdrawal
+
+urlpatterns = [re_path(r"^tatum/", include(urls))]
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.content = json.dumps(payload).encode()
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class EchoSession:
+    """Stand-in for the pooled session that echoes back what each call sent.
+
+    A short random sleep widens the window in which calls sharing a client interleave.
+    """
+
+    def request(self, method, url, headers=None, **kwargs):
+        time.sleep(random.uniform(0, 0.002))
+        return FakeResponse({"method": method, "url": url, "headers": dict(headers), "params": kwargs.get("params")})
+
+
+class SharedClientConcurrencyTest(SimpleTestCase):
+    """One client instance shared by many threads must never mix up URLs or headers between calls."""
+
+    THREADS = 16
+    CALLS = 2000
+
+    def setUp(self):
+        patchers = [
+            mock.patch("django_tatum.apps.tatum.utils.requestHandler.get_session", return_value=EchoSession()),
+            mock.patch(
+                "django_tatum.apps.tatum.utils.requestHandler.get_scheduler",
+                return_value=RequestScheduler(rate=0, max_retries=0),
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_virtual_accounts_client_is_reentrant(self):
+        client = TatumVirtualAccounts()
+        base = creds.TATUM_BASE_URL
+
+        def call(i):
+            kind = i % 3
+            if kind == 0:
+                echo = client.get_account_by_id(f"account-{i}")
+                return echo, f"{base}ledger/account/account-{i}", True
+            if kind == 1:
+                echo = client.get_account_balance(f"account-{i}")
+                return echo, f"{base}ledger/account/account-{i}/balance", True
+            echo = client.list_all_customer_accounts(f"customer-{i}", page_size=i % 50 + 1)
+            self.assertEqual(echo["params"]["pageSize"], i % 50 + 1)
+            return echo, f"{base}ledger/account/customer/customer-{i}", False
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            results = list(executor.map(call, range(self.CALLS)))
+
+        for echo, expected_url, has_content_type in results:
+            self.assertEqual(echo["url"], expected_url)
+            self.assertEqual("Content-Type" in echo["headers"], has_content_type)
+            self.assertEqual(echo["headers"]["x-api-key"], creds.TATUM_API_KEY)
+        self.assertIn("Content-Type", client.default_headers)
+
+    def test_transactions_client_is_reentrant(self):
+        client = TatumTransactions()
+        barrier = threading.Barrier(self.THREADS)
+
+        def call(worker):
+            barrier.wait()
+            for i in range(self.CALLS // self.THREADS):
+                reference = f"ref-{worker}-{i}"
+                echo = client.find_transaction_by_reference(reference)
+                self.assertEqual(echo["url"], f"{creds.TATUM_BASE_URL}ledger/transaction/reference/{reference}")
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            for future in [executor.submit(call, worker) for worker in range(self.THREADS)]:
+                future.result()
+
+
+class OfflineDerivationTest(SimpleTestCase):
+    """Local xpub derivation must reproduce the published BIP32, BIP39 and EIP-55 vectors."""
+
+    BIP32_SEED = "000102030405060708090a0b0c0d0e0f"
+    BIP32_CHAIN = {
+        "m": (
+            "xpub661MyMwAqRbcFtXgS5sYJABqqG9YLmC4Q1Rdap9gSE8NqtwybGhePY2gZ29ESFjqJoCu1Rupje8YtGqsefD265TMg7usUDFdp6W1EGMcet8"
+        ),
+        "m/0'": (
+            "xpub68Gmy5EdvgibQVfPdqkBBCHxA5htiqg55crXYuXoQRKfDBFA1WEjWgP6LHhwBZeNK1VTsfTFUHCdrfp1bgwQ9xv5ski8PX9rL2dZXvgGDnw"
+        ),
+        "m/0'/1": (
+            "xpub6ASuArnXKPbfEwhqN6e3mwBcDTgzisQN1wXN9BJcM47sSikHjJf3UFHKkNAWbWMiGj7Wf5uMash7SyYq527Hqck2AxYysAA7xmALppuCkwQ"
+        ),
+        "m/0'/1/2'/2/1000000000": (
+            "xpub6H1LXWLaKsWFhvm6RVpEL9P4KfRZSW7abD2ttkWP3SSQvnyA8FSVqNTEcYFgJS2UaFcxupHiYkro49S8yGasTvXEYBVPamhGW6cFJodrTHy"
+        ),
+    }
+    MNEMONIC = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+    # Wallets of MNEMONIC on the paths Tatum derives them on, m/44'/60'/0'/0 for Ethereum and
+    # m/44'/966'/0'/0 for Polygon: the xpub, then the (address, private key) of some indexes.
+    ETHEREUM_WALLET = (
+        "xpub6EF8jXqFeFEW5bwMU7RpQtHkzE4KJxcqJtvkCjJumzW8CPpacXkb92ek4WzLQXjL93HycJwTPUAcuNxCqFPKKU5m5Z2Vq4nCyh5CyPeBFFr",
+        {
+            0: (
+                "0x9858EfFD232B4033E47d90003D41EC34EcaEda94",
+                "0x1ab42cc412b618bdea3a599e3c9bae199ebf030895b039e9db1e30dafb12b727",
+            ),
+            1: (
+                "0x6Fac4D18c912343BF86fa7049364Dd4E424Ab9C0",
+                "0x9a983cb3d832fbde5ab49d692b7a8bf5b5d232479c99333d0fc8e1d21f1b55b6",
+            ),
+            2: (
+                "0xb6716976A3ebe8D39aCEB04372f22Ff8e6802D7A",
+                "0x5b824bd1104617939cd07c117ddc4301eb5beeca0904f964158963d69ab9d831",
+            ),
+            1000: (
+                "0xaC2Dbb7Dc8Fa82F47021e01255fBD767a2Ec4EaD",
+                "0x89752c8195f1d91a8804fe960f2831731920a1a88678cd89d4816d5a6f0db8fa",
+            ),
+        },
+    )
+    POLYGON_WALLET = (
+        "xpub6EWJgN2zPyyJhaDTY6tcuUuhQrvRdAUeZQX3ERTNsaMMBYV3LRLdAW9ZmvxG9io6PVBn4s2WA8cLT8UsWG64fMjCuqyvQ1k7VXcaJE4B135",
+        {
+            0: (
+                "0x841b1de89b7a8014d01B0fc73e7a21479a94899A",
+                "0x738e5815ef54dd2291f8dddb2c426590aa812f9884be354f619f2223c294a959",
+            ),
+            1: (
+                "0x0Fd98da9c3141642307721Dc666220d944DcBC15",
+                "0xa541d72b954e4c903186868526cea307ec939f5e7ee5d7f711b9743d652a8442",
+            ),
+            2: (
+                "0x7c34390148E879eEf52F6be9b1a451F0FCEBcBCC",
+                "0x7faa96225851ec348c70f4400fa29e2b40312d80ed74fa9c068ee0386948e19a",
+            ),
+            1000: (
+                "0x3d4dE1407d67cb82e3a6Da1d9fb7Ff2293b2dC95",
+                "0x2a0a84d1e63b04a4d38ce3ed0c274bb776dee724ca3eec7b5878e338c478a0ba",
+            ),
+        },
+    )
+
+    def test_keccak256(self):
+        self.assertEqual(hd.keccak256(b"").hex(), "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470")
+        self.assertEqual(hd.keccak256(b"abc").hex(), "4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45")
+
+    def test_eip55_checksum(self):
+        for address in (
+            "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed",
+            "0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359",
+            "0xdbF03B407c01E7cD3CBea99509d93f8DDDC8C6FB",
+            "0xD1220A0cf47c7B9Be7A2E6BA89F429762e7b9aDb",
+        ):
+            self.assertEqual(hd.to_checksum_address(address.lower()), address)
+
+    def test_bip32_vector(self):
+        master = hd.ExtendedPrivateKey.from_seed(bytes.fromhex(self.BIP32_SEED))
+        for path, xpub in self.BIP32_CHAIN.items():
+            self.assertEqual(master.derive(path).public_key().to_xpub(), xpub)
+        # Non-hardened steps derived from the parent xpub alone.
+        parent = hd.ExtendedPublicKey.from_xpub(self.BIP32_CHAIN["m/0'"])
+        self.assertEqual(parent.derive("1").to_xpub(), self.BIP32_CHAIN["m/0'/1"])
+        with self.assertRaises(ValueError):
+            hd.ExtendedPublicKey.from_xpub(self.BIP32_CHAIN["m"]).child(hd.HARDENED)
+
+    def assertWallet(self, wallet, path, expected):
+        xpub, keys = expected
+        self.assertEqual(hd.ExtendedPrivateKey.from_mnemonic(self.MNEMONIC).derive(path).public_key().to_xpub(), xpub)
+        for index, (address, private_key) in keys.items():
+            self.assertEqual(wallet.derive_address(xpub, index, checksum=True), address)
+            self.assertEqual(wallet.derive_address(xpub, index), address.lower())
+            self.assertEqual(wallet.derive_private_key(self.MNEMONIC, index), private_key)
+        batch = wallet.derive_addresses(xpub, 0, 3, checksum=True)
+        self.assertEqual(batch, {index: keys[index][0] for index in range(3)})
+        self.assertEqual(wallet.derive_addresses(xpub, 999, 2)[1000], keys[1000][0].lower())
+
+    def test_ethereum_wallet(self):
+        self.assertWallet(EthereumWallet(), hd.ETHEREUM_PATH, self.ETHEREUM_WALLET)
+
+    def test_polygon_wallet(self):
+        self.assertWallet(PolygonMatic(), hd.POLYGON_PATH, self.POLYGON_WALLET)
+
+    def test_batched_range_matches_single_derivations(self):
+        wallet = EthereumWallet()
+        xpub = self.ETHEREUM_WALLET[0]
+        batch = wallet.derive_addresses(xpub, 5, 20)
+        self.assertEqual(list(batch), list(range(5, 25)))
+        self.assertEqual(batch, {index: wallet.derive_address(xpub, index) for index in range(5, 25)})
+        self.assertEqual(wallet.derive_addresses(xpub, 7, 0), {})
+
+
+class RoutingSession:
+    """Stand-in for the pooled session answering by method and path, and recording each call."""
+
+    def __init__(self, routes=None):
+        self.routes = routes or {}
+        self.calls = []
+
+    def request(self, method, url, headers=None, **kwargs):
+        path = url[len(creds.TATUM_BASE_URL) :]
+        self.calls.append((method, path))
+        status_code, payload = self.routes.get((method, path), (200, {"path": path, "call": len(self.calls)}))
+        return FakeResponse(payload, status_code)
+
+
+class LookupCacheTest(SimpleTestCase):
+    """Lookups must be served from the cache until they expire or a mutation touches them."""
+
+    def setUp(self):
+        self.session = RoutingSession({("POST", "ledger/account/block/a1"): (200, {"id": "b1"})})
+        patchers = [
+            mock.patch("django_tatum.apps.tatum.utils.requestHandler.get_session", return_value=self.session),
+            mock.patch(
+                "django_tatum.apps.tatum.utils.requestHandler.get_scheduler",
+                return_value=RequestScheduler(rate=0, max_retries=0),
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache = LRUCache(maxsize=100)
+        self.accounts = TatumVirtualAccounts(cache=self.cache)
+
+    def sent(self, path):
+        return self.session.calls.count(("GET", path))
+
+    def assertRefetched(self, mutate, path="ledger/account/a1/balance"):
+        self.accounts.get_account_balance("a1")
+        before = self.sent(path)
+        self.accounts.get_account_balance("a1")
+        self.assertEqual(self.sent(path), before)
+        mutate()
+        self.accounts.get_account_balance("a1")
+        self.assertEqual(self.sent(path), before + 1)
+
+    def test_entries_expire_after_their_ttl(self):
+        cache = LRUCache(maxsize=2)
+        with mock.patch("django_tatum.apps.tatum.utils.cache.time.monotonic", return_value=100.0):
+            cache.set("short", 1, ttl=5)
+            cache.set("forever", 2)
+        with mock.patch("django_tatum.apps.tatum.utils.cache.time.monotonic", return_value=105.0):
+            self.assertIs(cache.get("short"), MISSING)
+            self.assertEqual(cache.get("forever"), 2)
+        cache.set("a", 3)
+        cache.set("b", 4)
+        self.assertIs(cache.get("forever"), MISSING)
+        self.assertEqual(cache.stats.as_dict(), {"hits": 1, "misses": 2, "invalidations": 0})
+
+    def test_lookups_are_counted_as_hits_and_misses(self):
+        first = self.accounts.get_account_by_id("a1")
+        self.assertEqual(self.accounts.get_account_by_id("a1"), first)
+        self.assertEqual(self.sent("ledger/account/a1"), 1)
+        self.assertEqual(self.cache.stats.as_dict(), {"hits": 1, "misses": 1, "invalidations": 0})
+
+    def test_error_responses_are_not_cached(self):
+        self.session.routes[("GET", "ledger/account/gone")] = (404, {"statusCode": 404})
+        self.accounts.get_account_by_id("gone")
+        self.accounts.get_account_by_id("gone")
+        self.assertEqual(self.sent("ledger/account/gone"), 2)
+
+    def test_cached_values_cannot_be_changed_by_callers(self):
+        self.accounts.get_account_by_id("a1")["path"] = "edited"
+        self.assertEqual(self.accounts.get_account_by_id("a1")["path"], "ledger/account/a1")
+        self.assertEqual(self.sent("ledger/account/a1"), 1)
+
+    def test_account_mutations_invalidate(self):
+        with mock.patch("builtins.print"):
+            self.assertRefetched(lambda: self.accounts.update_virtual_account("a1", account_code="code"))
+        self.assertRefetched(lambda: self.accounts.freeze_account("a1"))
+        self.assertRefetched(lambda: self.accounts.block_amount_in_account("a1", "1", [1]))
+        payment = {"senderAccountId": "a2", "recipientAccountId": "a1", "amount": "1"}
+        self.assertRefetched(lambda: TatumTransactions(cache=self.cache).send_payment(payment))
+
+    def test_unblock_invalidates_the_blocked_account_without_a_lookup(self):
+        self.accounts.block_amount_in_account("a1", "1", [1])
+        self.session.routes[("DELETE", "ledger/account/block/b1")] = (204, {})
+        self.assertRefetched(lambda: self.accounts.unblock_amount_in_an_account("b1"))
+        self.assertFalse(any("detail" in path for _, path in self.session.calls))
+        self.assertRefetched(
+            lambda: self.accounts.unblock_amount_and_perform_transaction("b2", "a3", "1", account_id="a1")
+        )
+        self.assertRefetched(lambda: self.accounts.unblock_amount_and_perform_transaction("b3", "a1", "1"))
+
+    def test_customer_update_invalidates(self):
+        customers = TatumCustomer(cache=self.cache)
+        customers.get_customer_details("c1")
+        customers.get_customer_details("c1")
+        customers.update_customer("c1", "user-1")
+        customers.get_customer_details("c1")
+        self.assertEqual(self.sent("ledger/customer/c1"), 2)
+
+
+class GatedSession:
+    """Stand-in for the pooled session that holds every request until `release` is set."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.calls += 1
+        self.release.wait()
+        return FakeResponse({"accountBalance": "1.5", "url": url})
+
+
+class CoalescingTest(SimpleTestCase):
+    """Concurrent identical GETs to the configured endpoints must share one request, not its result objects."""
+
+    CALLERS = 8
+
+    def setUp(self):
+        self.session = GatedSession()
+        self.single_flight = SingleFlight()
+        patcher = mock.patch(
+            "django_tatum.apps.tatum.utils.requestHandler.get_single_flight", return_value=self.single_flight
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def handler(self, path):
+        return RequestHandler(
+            f"{creds.TATUM_BASE_URL}{path}",
+            {"x-api-key": creds.TATUM_API_KEY},
+            session=self.session,
+            scheduler=RequestScheduler(rate=0, max_retries=0),
+        )
+
+    def test_default_endpoints_are_the_account_lookups(self):
+        base = creds.TATUM_BASE_URL
+        self.assertEqual(endpoint_pattern(f"{base}ledger/account/a1"), "ledger/account/*")
+        self.assertEqual(endpoint_pattern(f"{base}ledger/account/a1/balance"), "ledger/account/*/balance")
+        self.assertIsNone(endpoint_pattern(f"{base}ledger/account/customer/c1"))
+        self.assertIsNone(endpoint_pattern(f"{base}ledger/transaction/reference/r1"))
+
+    def test_identical_gets_share_one_request(self):
+        handler = self.handler("ledger/account/a1/balance")
+        with ThreadPoolExecutor(max_workers=self.CALLERS) as executor:
+            futures = [executor.submit(lambda: handler.get().json()) for _ in range(self.CALLERS)]
+            deadline = time.monotonic() + 5
+            while self.single_flight.stats()["coalesced"] < self.CALLERS - 1 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            self.session.release.set()
+            results = [future.result() for future in futures]
+        self.assertEqual(self.session.calls, 1)
+        stats = self.single_flight.stats()
+        self.assertEqual((stats["requests"], stats["coalesced"], stats["in_flight"]), (1, self.CALLERS - 1, 0))
+        self.assertEqual(stats["by_endpoint"], {"ledger/account/*/balance": {"requests": 1, "coalesced": self.CALLERS - 1}})
+        # Each caller gets its own copy of the decoded body.
+        results[0]["accountBalance"] = "0"
+        self.assertTrue(all(result["accountBalance"] == "1.5" for result in results[1:]))
+
+    def test_other_endpoints_are_sent_as_is(self):
+        self.session.release.set()
+        handler = self.handler("ledger/account/customer/c1")
+        handler.get()
+        handler.get()
+        self.assertEqual(self.session.calls, 2)
+        self.assertEqual(self.single_flight.stats()["requests"], 0)
+
+
+class ScriptedResponses:
+    """Send callable returning (or raising) a scripted outcome per call."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def response(status_code, retry_after=None):
+    scripted = FakeResponse({}, status_code)
+    if retry_after is not None:
+        scripted.headers["Retry-After"] = retry_after
+    return scripted
+
+
+class RequestSchedulerTest(SimpleTestCase):
+    """Requests must be paced at the configured rate, honour Retry-After and only be resent when it is safe."""
+
+    def test_token_bucket_paces_after_the_burst(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        waits = [bucket.reserve() for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1, delta=0.01)
+        self.assertAlmostEqual(waits[3], 0.2, delta=0.01)
+
+    def test_requests_are_paced(self):
+        scheduler = RequestScheduler(rate=100, burst=1, max_retries=0)
+        started = time.monotonic()
+        for _ in range(11):
+            scheduler.send("GET", lambda: response(200))
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+        self.assertGreater(scheduler.stats()["throttled_seconds"], 0)
+
+    def test_retry_after_pauses_every_caller(self):
+        scheduler = RequestScheduler(rate=1000, burst=10, max_retries=2)
+        send = ScriptedResponses(response(429, "0.05"), response(200))
+        started = time.monotonic()
+        self.assertEqual(scheduler.send("POST", send).status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual((send.calls, scheduler.stats()["rate_limited"], scheduler.stats()["retries"]), (2, 1, 1))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_non_idempotent_requests_are_not_resent(self):
+        scheduler = RequestScheduler(rate=0, max_retries=3, backoff_base=0)
+        send = ScriptedResponses(response(503), response(200))
+        self.assertEqual(scheduler.send("POST", send).status_code, 503)
+        self.assertEqual(send.calls, 1)
+        send = ScriptedResponses(requests.ReadTimeout(), response(200))
+        with self.assertRaises(requests.ReadTimeout):
+            scheduler.send("POST", send, retry_exceptions=(requests.Timeout,))
+        self.assertEqual(send.calls, 1)
+        send = ScriptedResponses(response(503), requests.ReadTimeout(), response(200))
+        self.assertEqual(scheduler.send("GET", send, retry_exceptions=(requests.Timeout,)).status_code, 200)
+        self.assertEqual(send.calls, 3)
+
+
+class FlakyBatchEndpoint:
+    """Stand-in for a batch endpoint: rejects chunks holding a "bad" item, and fails the first sends of each chunk."""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def __call__(self, chunk):
+        with self._lock:
+            self.sent.append(list(chunk))
+            failure = self.failures.pop(0) if self.failures else None
+        if failure is not None:
+            raise failure
+        if any(item.startswith("bad") for item in chunk):
+            raise TatumAPIException(400, {"message": "Invalid item."})
+        return [item.upper() for item in chunk]
+
+    async def send_async(self, chunk):
+        return self(chunk)
+
+
+class BulkRunTest(SimpleTestCase):
+    """Chunked batch calls must isolate rejected items and only resend chunks that are safe to resend."""
+
+    ITEMS = ["a", "b", "bad-c", "d", "e", "f", "g", "bad-h", "i"]
+
+    def setUp(self):
+        patcher = mock.patch(
+            "django_tatum.apps.tatum.utils.bulk.get_scheduler", return_value=RequestScheduler(rate=0, backoff_base=0)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertIsolated(self, results):
+        self.assertEqual([result["index"] for result in results], list(range(len(self.ITEMS))))
+        for item, result in zip(self.ITEMS, results):
+            if item.startswith("bad"):
+                self.assertFalse(result["ok"])
+                self.assertTrue(is_rejection(result["error"]))
+            else:
+                self.assertEqual(result["result"], item.upper())
+
+    def test_rejected_chunk_is_bisected(self):
+        endpoint = FlakyBatchEndpoint()
+        self.assertIsolated(run_chunked(self.ITEMS, endpoint, 4, max_workers=3))
+        # Every sent chunk was either applied whole or rejected whole.
+        self.assertIn(["bad-c"], endpoint.sent)
+        self.assertIn(["bad-h"], endpoint.sent)
+        self.assertNotIn(["a"], endpoint.sent)
+
+    def test_rejected_chunk_is_bisected_async(self):
+        endpoint = FlakyBatchEndpoint()
+        self.assertIsolated(asyncio.run(arun_chunked(self.ITEMS, endpoint.send_async, 4, max_workers=3)))
+        self.assertIn(["bad-c"], endpoint.sent)
+
+    def test_transient_failures_are_retried(self):
+        endpoint = FlakyBatchEndpoint([TatumAPIException(503), requests.ReadTimeout()])
+        results = run_chunked(self.ITEMS[:2], endpoint, 2, max_attempts=3)
+        self.assertEqual([result["result"] for result in results], ["A", "B"])
+        self.assertEqual(len(endpoint.sent), 3)
+
+        endpoint = FlakyBatchEndpoint([TatumAPIException(503)] * 3)
+        results = asyncio.run(arun_chunked(self.ITEMS[:2], endpoint.send_async, 2, max_attempts=3))
+        self.assertEqual([result["error"].status_code for result in results], [503, 503])
+        self.assertEqual(len(endpoint.sent), 3)
+
+    def test_writes_are_only_resent_when_not_received(self):
+        refused = requests.ConnectionError(mock.Mock(reason=NewConnectionError(None, "refused")))
+        for failure in (TatumAPIException(429), refused, requests.ConnectTimeout()):
+            endpoint = FlakyBatchEndpoint([failure])
+            results = run_chunked(self.ITEMS[:2], endpoint, 2, idempotent=False)
+            self.assertTrue(all(result["ok"] for result in results), failure)
+            self.assertEqual(len(endpoint.sent), 2)
+        for failure in (TatumAPIException(503), requests.ReadTimeout(), requests.ConnectionError("Connection aborted.")):
+            endpoint = FlakyBatchEndpoint([failure])
+            results = run_chunked(self.ITEMS[:2], endpoint, 2, idempotent=False)
+            self.assertEqual([result["error"] for result in results], [failure, failure])
+            self.assertEqual(len(endpoint.sent), 1)
+
+
+class ParallelListingTest(SimpleTestCase):
+    """An error answer to the account count must raise, not surface as a missing key."""
+
+    def test_count_error_raises(self):
+        session = mock.Mock()
+        session.request.return_value = FakeResponse({"statusCode": 401, "message": "Unauthorized"}, 401)
+        with mock.patch("django_tatum.apps.tatum.utils.requestHandler.get_session", return_value=session), mock.patch(
+            "django_tatum.apps.tatum.utils.requestHandler.get_scheduler", return_value=RequestScheduler(rate=0, max_retries=0)
+        ):
+            with self.assertRaises(TatumAPIException) as raised:
+                TatumVirtualAccounts().iter_virtual_accounts_parallel({"currency": "BTC"})
+        self.assertEqual(raised.exception.status_code, 401)
+        self.assertTrue(session.request.call_args.args[1].endswith("ledger/account/count"))
+
+
+class FakePaymentClient:
+    """Stand-in for the transactions client: refuses a whole batch holding an invalid payment, like Tatum."""
+
+    def __init__(self):
+        self.batches = []
+        self.singles = []
+
+    def _fetch_json(self, method, url_prefix, data=None):
+        self.batches.append([transaction["recipientAccountId"] for transaction in data["transaction"]])
+        if any(transaction["amount"] == "invalid" for transaction in data["transaction"]):
+            raise TatumAPIException(400, {"message": "Invalid amount."})
+        return [{"reference": f"batch-{transaction['recipientAccountId']}"} for transaction in data["transaction"]]
+
+    def send_payment(self, data):
+        self.singles.append(data["recipientAccountId"])
+        if data["amount"] == "invalid":
+            return {"statusCode": 400, "message": "Invalid amount."}
+        return {"reference": f"single-{data['recipientAccountId']}"}
+
+    def _invalidate_accounts(self, *account_ids):
+        pass
+
+
+class AsyncFakePaymentClient(FakePaymentClient):
+    async def _fetch_json(self, method, url_prefix, data=None):
+        return super()._fetch_json(method, url_prefix, data)
+
+    async def send_payment(self, data):
+        return super().send_payment(data)
+
+
+def payment(recipient, amount="1"):
+    return {"senderAccountId": "sender", "recipientAccountId": recipient, "amount": amount}
+
+
+class PaymentBatcherTest(SimpleTestCase):
+    """Concurrent payments must go out in batches, and a rejected batch must not fail its valid payments."""
+
+    def test_full_batch_is_sent_at_once(self):
+        client = FakePaymentClient()
+        with PaymentBatcher(client, max_batch_size=3, max_wait=60) as batcher:
+            futures = [batcher.submit(payment(f"r{index}")) for index in range(3)]
+            results = [future.result(timeout=5) for future in futures]
+        self.assertEqual(results, [{"reference": "batch-r0"}, {"reference": "batch-r1"}, {"reference": "batch-r2"}])
+        self.assertEqual(client.batches, [["r0", "r1", "r2"]])
+
+    def test_batch_is_sent_when_its_window_elapses(self):
+        client = FakePaymentClient()
+        with PaymentBatcher(client, max_batch_size=100, max_wait=0.05) as batcher:
+            started = time.monotonic()
+            futures = [batcher.submit(payment(f"r{index}")) for index in range(2)]
+            self.assertEqual(futures[1].result(timeout=5), {"reference": "batch-r1"})
+            self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual(client.batches, [["r0", "r1"]])
+
+    def test_rejected_batch_is_resent_payment_by_payment(self):
+        client = FakePaymentClient()
+        with PaymentBatcher(client, max_batch_size=3, max_wait=60) as batcher:
+            futures = [batcher.submit(payment("r0")), batcher.submit(payment("r1", "invalid")), batcher.submit(payment("r2"))]
+            results = [future.result(timeout=5) for future in futures]
+        self.assertEqual(results[0], {"reference": "single-r0"})
+        self.assertEqual(results[1]["statusCode"], 400)
+        self.assertEqual(results[2], {"reference": "single-r2"})
+        self.assertEqual(client.singles, ["r0", "r1", "r2"])
+        self.assertEqual(batcher.stats.as_dict(), {"batches": 0, "batched_payments": 0, "single_payments": 3, "fallbacks": 1})
+
+    def test_async_batcher(self):
+        client = AsyncFakePaymentClient()
+
+        async def main():
+            async with AsyncPaymentBatcher(client, max_batch_size=3, max_wait=0.05) as batcher:
+                full = await asyncio.gather(*(batcher.send_payment(payment(f"r{index}")) for index in range(3)))
+                rejected = await asyncio.gather(
+                    batcher.send_payment(payment("r3")), batcher.send_payment(payment("r4", "invalid"))
+                )
+            return full, rejected
+
+        full, rejected = asyncio.run(main())
+        self.assertEqual([result["reference"] for result in full], ["batch-r0", "batch-r1", "batch-r2"])
+        self.assertEqual(rejected[0], {"reference": "single-r3"})
+        self.assertEqual(rejected[1]["statusCode"], 400)
+        self.assertEqual(client.batches, [["r0", "r1", "r2"], ["r3", "r4"]])
+
+
+class FakeTransactionCount:
+    """Stand-in for Tatum's transaction count endpoint, set by the test."""
+
+    def __init__(self, count=0):
+        self.count = count
+        self.calls = 0
+
+    def __call__(self, chain, address):
+        self.calls += 1
+        return self.count
+
+
+class NonceManagerTest(SimpleTestCase):
+    """Nonces must be handed out once each, reused only when Tatum never used them, and follow the chain."""
+
+    ADDRESS = "0x9858EfFD232B4033E47d90003D41EC34EcaEda94"
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.chain = FakeTransactionCount(7)
+        self.manager = NonceManager(FileNonceStore(directory.name), self.chain, resync_interval=0)
+
+    def allocate(self, count=1):
+        return [self.manager.allocate("ETH", self.ADDRESS) for _ in range(count)]
+
+    def test_allocation_starts_at_the_chain_count(self):
+        self.assertEqual(self.allocate(3), [7, 8, 9])
+        self.assertEqual(self.chain.calls, 1)
+
+    def test_released_nonces_are_reused_first(self):
+        self.allocate(4)
+        self.manager.release("ETH", self.ADDRESS, 8)
+        self.manager.release("ETH", self.ADDRESS, 7)
+        self.assertEqual(self.allocate(3), [7, 8, 11])
+
+    def test_release_at_the_top_collapses_the_range(self):
+        self.allocate(4)
+        self.manager.release("ETH", self.ADDRESS, 8)
+        self.manager.release("ETH", self.ADDRESS, 9)
+        self.manager.release("ETH", self.ADDRESS, 10)
+        with self.manager.store.locked("ETH", self.ADDRESS) as state:
+            self.assertEqual((state["next"], state["released"]), (8, []))
+        self.assertEqual(self.allocate(2), [8, 9])
+
+    def test_nonce_error_resyncs_without_release(self):
+        self.allocate(2)
+        self.chain.count = 12
+        with self.assertRaises(TatumAPIException):
+            with self.manager.reserve("ETH", self.ADDRESS):
+                raise TatumAPIException(400, {"message": "nonce too low"})
+        self.assertEqual(self.allocate(), [12])
+
+    def test_only_rejected_transactions_release_their_nonce(self):
+        with self.assertRaises(TatumAPIException):
+            with self.manager.reserve("ETH", self.ADDRESS) as nonce:
+                raise TatumAPIException(400, {"message": "Insufficient funds."})
+        self.assertEqual(self.allocate(), [nonce])
+        for error in (requests.ReadTimeout(), TatumAPIException(502)):
+            with self.assertRaises(type(error)):
+                with self.manager.reserve("ETH", self.ADDRESS) as nonce:
+                    raise error
+            self.assertEqual(self.allocate(), [nonce + 1])
+
+    def test_concurrent_allocations_are_distinct(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            nonces = list(executor.map(lambda _: self.manager.allocate("ETH", self.ADDRESS), range(200)))
+        self.assertEqual(sorted(nonces), list(range(7, 207)))
+
+
+class FakeWithdrawalEndpoint:
+    """Stand-in for Tatum's withdrawal endpoint and the ledger it writes to.
+
+    Each queued failure is raised by one send; a failure queued as `(error, True)` is raised
+    after the withdrawal was recorded, like a send whose response was lost.
+    """
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.sent = []
+        self.ledger = {}
+
+    def send(self, payload):
+        failure, applied = self.failures.pop(0) if self.failures else (None, False)
+        if failure is not None and not applied:
+            raise failure
+        reference = f"ref-{len(self.ledger)}"
+        self.ledger[payload["paymentId"]] = {"reference": reference}
+        if failure is not None:
+            raise failure
+        self.sent.append(payload)
+        return {"id": f"withdrawal-{len(self.sent)}", "reference": reference}
+
+    def iter_transactions_within_ledger(self, query, page_size=50):
+        found = self.ledger.get(query["paymentId"])
+        return iter([found] if found else [])
+
+
+class FakeFeeQuotes:
+    """Stand-in for Tatum's fee endpoint, quoting scripted prices in turn and counting the calls."""
+
+    def __init__(self, *prices):
+        self.prices = list(prices) or [(10, 20, 30)]
+        self.calls = 0
+
+    def get_blockchain_fees(self, chain):
+        slow, medium, fast = self.prices[min(self.calls, len(self.prices) - 1)]
+        self.calls += 1
+        return {"slow": slow, "medium": medium, "fast": fast, "block": None, "quoted_at": time.time()}
+
+
+class FeeEstimatorTest(SimpleTestCase):
+    """Callers must share one quote per chain and TTL, and each tier must follow its own speed."""
+
+    def estimator(self, *prices, **kwargs):
+        self.quotes = FakeFeeQuotes(*prices)
+        kwargs.setdefault("tiers", {"slow": 0, "medium": 50, "fast": 100})
+        return FeeEstimator(self.quotes, **kwargs)
+
+    def test_concurrent_misses_share_one_refresh(self):
+        estimator = self.estimator(ttl=60)
+        fetch = self.quotes.get_blockchain_fees
+        self.quotes.get_blockchain_fees = lambda chain: time.sleep(0.05) or fetch(chain)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            fees = list(executor.map(lambda _: estimator.fee("btc"), range(8)))
+        self.assertEqual(fees, [Decimal("20")] * 8)
+        self.assertEqual(self.quotes.calls, 1)
+
+    def test_quote_is_fetched_again_once_expired(self):
+        estimator = self.estimator((10, 20, 30), (11, 21, 31), ttl=15)
+        with mock.patch("django_tatum.apps.tatum.tatum_client.smart_contracts.fees.time.monotonic", return_value=100.0):
+            estimator.quote("BTC")
+        with mock.patch("django_tatum.apps.tatum.tatum_client.smart_contracts.fees.time.monotonic", return_value=114.0):
+            self.assertEqual(estimator.quote("BTC")["medium"], 20)
+        with mock.patch("django_tatum.apps.tatum.tatum_client.smart_contracts.fees.time.monotonic", return_value=115.0):
+            self.assertEqual(estimator.quote("BTC")["medium"], 21)
+        self.assertEqual(self.quotes.calls, 2)
+
+    def test_window_keeps_the_latest_quotes(self):
+        estimator = self.estimator(*[(price, price, price) for price in (100, 1, 2, 3)], ttl=60, window=3)
+        for _ in range(4):
+            estimator.refresh("BTC")
+        self.assertEqual(estimator.fee("BTC", "fast"), Decimal("3"))
+        self.assertEqual(estimator.fee("BTC", "slow"), Decimal("1"))
+        self.assertEqual(self.quotes.calls, 4)
+
+    def test_each_tier_takes_its_own_speed(self):
+        estimator = self.estimator((1, 50, 900), (2, 60, 800), (3, 70, 700), ttl=60, window=3)
+        for _ in range(3):
+            estimator.refresh("BTC")
+        self.assertEqual(estimator.fee("BTC", "slow"), Decimal("1"))
+        self.assertEqual(estimator.fee("BTC", "medium"), Decimal("60"))
+        self.assertEqual(estimator.fee("BTC", "fast"), Decimal("900"))
+        with self.assertRaises(ValueError):
+            estimator.fee("BTC", "urgent")
+
+    def test_gas_fee_is_in_gwei(self):
+        estimator = self.estimator((1e9, 25.5e9, 40e9), ttl=60)
+        self.assertEqual(estimator.gas_fee("eth", 21000), {"gasLimit": "21000", "gasPrice": "25.5"})
+        self.assertEqual(estimator.gas_fee("ETH", 60000, "slow"), {"gasLimit": "60000", "gasPrice": "1"})
+        with self.assertRaises(ValueError):
+            estimator.gas_fee("BTC", 21000)
+
+    def test_refresher_drops_idle_chains(self):
+        estimator = self.estimator(ttl=60)
+        estimator.quote("BTC")
+        refresher = FeeRefresher(estimator, interval=0.01, idle_after=0.1)
+        refresher.start()
+        self.addCleanup(refresher.stop)
+        time.sleep(0.3)
+        refreshed = self.quotes.calls
+        self.assertGreater(refreshed, 2)
+        time.sleep(0.1)
+        self.assertEqual(self.quotes.calls, refreshed)
+        self.assertEqual(estimator.recent_chains(0.1), [])
+
+
+class WithdrawalQueueTest(TestCase):
+    """Queued withdrawals must be sent once each, merged where possible and never repeated after a lost response."""
+
+    def withdrawal(self, index, sender="sender", amount="0.1"):
+        return {"senderAccountId": sender, "address": f"bc1q{index}", "amount": amount, "paymentId": f"payment-{index}"}
+
+    def queue(self, endpoint, batch_size=10):
+        self.quotes = FakeFeeQuotes()
+        fees = FeeEstimator(self.quotes, ttl=60, tiers={"slow": 50, "medium": 50, "fast": 50})
+        return WithdrawalQueue(send=endpoint.send, transactions=endpoint, batch_size=batch_size, fees=fees)
+
+    def test_enqueue_is_idempotent(self):
+        first, created = enqueue_withdrawal(self.withdrawal(1, amount=Decimal("0.10")), "BTC")
+        again, created_again = enqueue_withdrawal(self.withdrawal(1, amount="0.1"), "BTC")
+        self.assertEqual((created, created_again), (True, False))
+        self.assertEqual(first.pk, again.pk)
+        self.assertEqual(Withdrawal.objects.count(), 1)
+        self.assertEqual(Withdrawal.objects.get().payload["amount"], "0.10")
+
+    def test_reused_payment_id_for_another_amount_is_refused(self):
+        enqueue_withdrawal(self.withdrawal(1), "BTC")
+        with self.assertRaises(ValueError):
+            enqueue_withdrawal(self.withdrawal(1, amount="0.2"), "BTC")
+
+    def test_utxo_withdrawals_of_a_sender_are_merged(self):
+        for index in range(4):
+            enqueue_withdrawal(self.withdrawal(index), "BTC")
+        enqueue_withdrawal(self.withdrawal(4, sender="other"), "BTC")
+        enqueue_withdrawal({**self.withdrawal(5), "address": "0xabc"}, "ETH")
+        endpoint = FakeWithdrawalEndpoint()
+        self.assertEqual(self.queue(endpoint, batch_size=3).drain(), {Withdrawal.Status.SENT: 6})
+        self.assertEqual(
+            [payload["address"] for payload in endpoint.sent], ["bc1q0,bc1q1,bc1q2", "bc1q3", "bc1q4", "0xabc"]
+        )
+        self.assertEqual(endpoint.sent[0]["amount"], "0.3")
+        self.assertEqual(endpoint.sent[0]["multipleAmounts"], ["0.1", "0.1", "0.1"])
+
+    def test_missing_fees_share_one_estimate(self):
+        for index in range(3):
+            enqueue_withdrawal(self.withdrawal(index), "BTC")
+        enqueue_withdrawal({**self.withdrawal(3, sender="other"), "fee": "0.0005"}, "BTC")
+        enqueue_withdrawal({**self.withdrawal(4), "address": "0xabc"}, "ETH")
+        endpoint = FakeWithdrawalEndpoint()
+        self.queue(endpoint, batch_size=2).drain()
+        # 20 sat/byte for 11 + 2 * 68 + 31 bytes per output, and 20 wei of gas for an ether transfer.
+        self.assertEqual(
+            [payload["fee"] for payload in endpoint.sent], ["0.000048", "0.0000418", "0.0005", "0.00000000000042"]
+        )
+        # One quote per chain.
+        self.assertEqual(self.quotes.calls, 2)
+
+    def test_batch_fee_covers_recipients_without_one(self):
+        enqueue_withdrawal({**self.withdrawal(0), "fee": "0.00001"}, "BTC")
+        enqueue_withdrawal(self.withdrawal(1), "BTC")
+        endpoint = FakeWithdrawalEndpoint()
+        self.queue(endpoint).drain()
+        self.assertEqual(endpoint.sent[0]["fee"], "0.000048")
+
+    def test_failed_ledger_check_leaves_the_group_to_its_lease(self):
+        enqueue_withdrawal(self.withdrawal(1), "BTC")
+        enqueue_withdrawal(self.withdrawal(2, sender="other"), "BTC")
+        Withdrawal.objects.filter(payment_id="payment-1").update(attempts=1, sent_payment_id="payment-1")
+        endpoint = FakeWithdrawalEndpoint()
+        queue = self.queue(endpoint)
+        with mock.patch.object(endpoint, "iter_transactions_within_ledger", side_effect=requests.ConnectionError()):
+            with self.assertLogs("apps.tatum.withdrawals", "WARNING"):
+                stats = queue.drain()
+        self.assertEqual(stats, {Withdrawal.Status.SENDING: 1, Withdrawal.Status.SENT: 1})
+        self.assertEqual(Withdrawal.objects.get(payment_id="payment-1").status, Withdrawal.Status.SENDING)
+        self.assertEqual([payload["paymentId"] for payload in endpoint.sent], ["payment-2"])
+
+    def test_lost_response_is_settled_from_the_ledger(self):
+        enqueue_withdrawal(self.withdrawal(1), "BTC")
+        endpoint = FakeWithdrawalEndpoint([(requests.ReadTimeout(), True)])
+        with self.assertLogs("apps.tatum.withdrawals", "WARNING"):
+            stats = self.queue(endpoint).drain()
+        self.assertEqual(stats, {Withdrawal.Status.PENDING: 1, Withdrawal.Status.SENT: 1})
+        self.assertEqual(endpoint.sent, [])
+        withdrawal = Withdrawal.objects.get()
+        self.assertEqual((withdrawal.status, withdrawal.reference, withdrawal.attempts), (Withdrawal.Status.SENT, "ref-0", 2))
+
+    def test_rejected_batch_falls_back_to_single_sends(self):
+        for index in range(3):
+            enqueue_withdrawal(self.withdrawal(index), "BTC")
+        endpoint = FakeWithdrawalEndpoint([(TatumAPIException(400, {"message": "Invalid address."}), False)])
+        with self.assertLogs("apps.tatum.withdrawals", "WARNING"):
+            stats = self.queue(endpoint).drain()
+        self.assertEqual(stats, {Withdrawal.Status.PENDING: 3, Withdrawal.Status.SENT: 3})
+        self.assertEqual([payload["paymentId"] for payload in endpoint.sent], ["payment-0", "payment-1", "payment-2"])
+        self.assertFalse(Withdrawal.objects.exclude(status=Withdrawal.Status.SENT).exists())
+
+
+class FakeLedger:
+    """Stand-in for the customer, account and transaction clients, over in-memory records."""
+
+    def __init__(self):
+        self.customers = {}
+        self.accounts = {}
+        self.transactions = []
+        self.windows = []
+
+    def iter_customers(self):
+        return iter(list(self.customers.values()))
+
+    def get_customer_details(self, id):
+        return self.customers.get(id, {"statusCode": 404, "message": "Customer not found."})
+
+    def iter_virtual_accounts_parallel(self, max_workers=8):
+        return iter(list(self.accounts.values()))
+
+    def get_account_by_id(self, account_id):
+        return self.accounts.get(account_id, {"statusCode": 404, "message": "Account not found."})
+
+    def iter_transactions_within_ledger(self, window):
+        self.windows.append(window)
+        return iter([record for record in self.transactions if window["from"] <= record["created"] < window["to"]])
+
+
+class LedgerSyncTest(TestCase):
+    """The mirror must be upserted in place and never hold a ledger transaction twice."""
+
+    def setUp(self):
+        self.ledger = FakeLedger()
+        self.sync = LedgerSync(self.ledger, self.ledger, self.ledger, batch_size=2, overlap_seconds=60)
+        self.ledger.customers["c1"] = {"id": "c1", "externalId": "user-1", "accountingCurrency": "EUR"}
+
+    def account(self, id, balance="1", customer="c1"):
+        self.ledger.accounts[id] = {
+            "id": id,
+            "customerId": customer,
+            "currency": "BTC",
+            "balance": {"accountBalance": balance, "availableBalance": balance},
+        }
+
+    def transaction(self, reference, account, created):
+        self.ledger.transactions.append(
+            {"reference": reference, "accountId": account, "amount": "0.5", "currency": "BTC", "created": created}
+        )
+
+    def test_full_sync_upserts_in_place(self):
+        for index in range(3):
+            self.account(f"a{index}")
+        self.assertEqual(self.sync.run(full=True), {"customers": 1, "accounts": 3, "touched_accounts": 0})
+        self.account("a1", balance="7.5")
+        self.ledger.customers["c1"]["externalId"] = "user-one"
+        self.sync.run(full=True)
+        self.assertEqual(VirtualAccount.objects.count(), 3)
+        self.assertEqual(VirtualAccount.objects.get(tatum_id="a1").account_balance, Decimal("7.5"))
+        self.assertEqual(Customer.objects.get().external_id, "user-one")
+
+    def test_transaction_sync_is_idempotent_over_the_overlap(self):
+        now_ms = int(time.time() * 1000)
+        self.transaction("t1", "a1", now_ms - 5000)
+        self.transaction("t2", "a2", now_ms - 4000)
+        self.assertEqual(self.sync.sync_transactions(), {"a1", "a2"})
+        position = SyncCursor.objects.get(name=TRANSACTIONS_CURSOR).position
+        # Committed late, inside the overlap of the next run.
+        self.transaction("t3", "a3", position - 1000)
+        self.assertIn("a3", self.sync.sync_transactions())
+        self.assertEqual(self.ledger.windows[-1]["from"], position - 60000)
+        self.assertEqual(sorted(LedgerTransaction.objects.values_list("reference", flat=True)), ["t1", "t2", "t3"])
+        self.sync.sync_transactions()
+        self.assertEqual(LedgerTransaction.objects.count(), 3)
+
+    def test_new_accounts_are_mirrored_with_their_customer(self):
+        self.account("a1")
+        self.account("a2", customer="c2")
+        with self.assertLogs("apps.tatum.sync", "WARNING") as logs:
+            self.assertEqual(self.sync.sync_new_accounts(["a1", "a2", "gone"]), 2)
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(VirtualAccount.objects.get(tatum_id="a1").customer.external_id, "user-1")
+        # c2 is unknown to Tatum: kept as a placeholder for the next full sync.
+        self.assertEqual(VirtualAccount.objects.get(tatum_id="a2").customer.external_id, "")
+        self.assertEqual(self.sync.sync_new_accounts(["a1", "a2"]), 0)
+
+
+class ContentCacheTest(SimpleTestCase):
+    """Objects must be sharded, written atomically, evicted least recently used first and mapped when large."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.cache = ContentCache(self.root, max_bytes=10, mmap_threshold=8)
+
+    def test_objects_are_sharded_by_key_hash(self):
+        path = self.cache.put("QmHash", b"data")
+        digest = path.name
+        self.assertEqual(len(digest), 64)
+        self.assertEqual(path.relative_to(self.root).parts, (digest[:2], digest[2:4], digest))
+        self.assertEqual(self.cache.read("QmHash"), b"data")
+        self.assertIn("QmHash", self.cache)
+
+    def test_failed_put_keeps_nothing(self):
+        self.cache.put("QmHash", b"old")
+
+        def chunks():
+            yield b"new"
+            raise requests.ConnectionError()
+
+        with self.assertRaises(requests.ConnectionError):
+            self.cache.put("QmHash", chunks())
+        self.assertEqual(self.cache.read("QmHash"), b"old")
+        self.assertEqual(os.listdir(self.cache._tmp), [])
+        with self.assertRaises(requests.ConnectionError):
+            self.cache.put("QmOther", chunks())
+        self.assertNotIn("QmOther", self.cache)
+
+    def test_least_recently_used_is_evicted_past_max_bytes(self):
+        self.cache.put("a", b"aaaa")
+        self.cache.put("b", b"bbbb")
+        self.assertIsNotNone(self.cache.get("a"))
+        self.cache.put("c", b"cccc")
+        self.assertNotIn("b", self.cache)
+        self.assertIn("a", self.cache)
+        self.assertEqual((self.cache.size, self.cache.stats["evictions"]), (8, 1))
+        self.assertIsNone(self.cache.read("b"))
+        self.assertEqual(self.cache.stats["misses"], 1)
+
+    def test_recency_is_rebuilt_from_mtimes(self):
+        now = time.time()
+        for age, key in enumerate(("new", "old")):
+            path = self.cache.put(key, b"xxxx")
+            os.utime(path, (now - age * 60, now - age * 60))
+        restarted = ContentCache(self.root, max_bytes=10)
+        restarted.put("c", b"cccc")
+        self.assertNotIn("old", restarted)
+        self.assertIn("new", restarted)
+
+    def test_large_objects_are_memory_mapped(self):
+        cache = ContentCache(self.root, max_bytes=100, mmap_threshold=8)
+        cache.put("small", b"1234567")
+        cache.put("large", b"12345678")
+        self.assertEqual(cache.read("small"), b"1234567")
+        mapped = cache.read("large")
+        self.addCleanup(mapped.close)
+        self.assertIsInstance(mapped, mmap.mmap)
+        self.assertEqual(mapped[:], b"12345678")
+        self.assertEqual(cache.read("large", use_mmap=False), b"12345678")
+
+
+class FakeDeposits:
+    """Stand-in for the transaction client, listing the deposits of a window newest first."""
+
+    def __init__(self):
+        self.records = []
+        self.windows = []
+
+    def deposit(self, reference, created):
+        self.records.append({"reference": reference, "created": created, "operationType": "DEPOSIT"})
+
+    def iter_transactions_within_ledger(self, window, page_size):
+        self.windows.append(window)
+        matching = [record for record in self.records if record["created"] >= window["from"]]
+        return iter(sorted(matching, key=lambda record: record["created"], reverse=True))
+
+
+class AsyncFakeDeposits(FakeDeposits):
+    async def _aiter(self, records):
+        for record in records:
+            yield record
+
+    def iter_transactions_within_ledger(self, window, page_size):
+        return self._aiter(list(super().iter_transactions_within_ledger(window, page_size)))
+
+
+class DepositTailTest(SimpleTestCase):
+    """Each deposit must be delivered once, oldest first, and again only if it was not consumed."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = FileCursorStore(directory.name)
+        self.ledger = FakeDeposits()
+
+    def tail(self, **kwargs):
+        return DepositTail(transactions=self.ledger, store=self.store, overlap_seconds=10, **kwargs)
+
+    def references(self, tail):
+        return [record["reference"] for record in tail.poll()]
+
+    def test_new_cursor_starts_at_the_current_time(self):
+        now_ms = int(time.time() * 1000)
+        self.ledger.deposit("old", now_ms - 60000)
+        tail = self.tail()
+        self.assertEqual(self.references(tail), [])
+        self.assertGreaterEqual(self.store.load("deposits")["position"], now_ms)
+        self.ledger.deposit("new", int(time.time() * 1000) + 1000)
+        self.assertEqual(self.references(tail), ["new"])
+        self.assertEqual(self.references(self.tail(name="replay", start=0)), ["old", "new"])
+
+    def test_overlap_is_deduplicated(self):
+        tail = self.tail(start=0)
+        self.ledger.deposit("d1", 100000)
+        self.ledger.deposit("d2", 105000)
+        self.assertEqual(self.references(tail), ["d1", "d2"])
+        # Committed late, inside the overlap of the next poll.
+        self.ledger.deposit("late", 101000)
+        self.ledger.deposit("d3", 106000)
+        self.assertEqual(self.references(tail), ["late", "d3"])
+        self.assertEqual(self.ledger.windows[-1]["from"], 95000)
+        self.assertEqual(self.references(tail), [])
+        self.assertEqual(set(self.store.load("deposits")["recent"]), {"d1", "d2", "late", "d3"})
+        # References older than the overlap are forgotten once the mark moves past them.
+        self.ledger.deposit("d4", 200000)
+        self.assertEqual(self.references(tail), ["d4"])
+        self.assertEqual(self.store.load("deposits"), {"position": 200000, "recent": {"d4": 200000}})
+
+    def test_unconsumed_deposit_is_delivered_again_after_a_crash(self):
+        for index in range(3):
+            self.ledger.deposit(f"d{index}", 100000 + index)
+        poll = self.tail(start=0).poll()
+        self.assertEqual([next(poll)["reference"], next(poll)["reference"]], ["d0", "d1"])
+        # The consumer dies while handling d1.
+        poll.close()
+        self.assertEqual(self.references(self.tail()), ["d1", "d2"])
+
+
+class AsyncDepositTailTest(TestCase):
+    """The asyncio tail must keep its cursor in the database without blocking calls in the event loop."""
+
+    def test_database_cursor_is_used_through_the_async_orm(self):
+        ledger = AsyncFakeDeposits()
+        ledger.deposit("d1", 100000)
+        ledger.deposit("d2", 100500)
+        tail = AsyncDepositTail(transactions=ledger, store=DatabaseCursorStore(), overlap_seconds=1, start=0)
+
+        async def consume():
+            return [record["reference"] async for record in tail.poll()]
+
+        self.assertEqual(async_to_sync(consume)(), ["d1", "d2"])
+        cursor = SyncCursor.objects.get(name="deposits:deposits")
+        self.assertEqual((cursor.position, cursor.recent), (100500, {"d1": 100000, "d2": 100500}))
+        ledger.deposit("d3", 100800)
+        self.assertEqual(async_to_sync(consume)(), ["d3"])
+
+
+class StalledSink(NDJSONSink):
+    """Sink whose writer thread only starts writing once `resume` is set."""
+
+    def __init__(self, *args, **kwargs):
+        self.resume = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        self.resume.wait()
+        return super()._open()
+
+
+class NDJSONSinkTest(SimpleTestCase):
+    """Records must be written in order on close, and dropped rather than waited on when asked."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def lines(self, path, opener=open):
+        with opener(path, "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_close_writes_out_the_buffer(self):
+        path = os.path.join(self.directory, "accounts.ndjson")
+        with NDJSONSink(path) as sink:
+            sink.write({"id": "a1", "balance": Decimal("1.5")})
+            sink.write_many([{"id": "a2"}, {"id": "a3"}])
+            sink.write_many({"id": "a4"})
+        self.assertEqual(self.lines(path), [{"id": "a1", "balance": "1.5"}, {"id": "a2"}, {"id": "a3"}, {"id": "a4"}])
+
+    def test_gzip_output(self):
+        path = os.path.join(self.directory, "accounts.ndjson.gz")
+        with NDJSONSink(path, compress=True) as sink:
+            sink.write_many([{"id": index} for index in range(100)])
+        self.assertEqual(self.lines(path, gzip.open), [{"id": index} for index in range(100)])
+
+    def test_non_blocking_writes_are_dropped_when_full(self):
+        path = os.path.join(self.directory, "accounts.ndjson")
+        sink = StalledSink(path, max_buffer=2)
+        self.assertTrue(sink.write({"id": 1}, block=False))
+        self.assertTrue(sink.write({"id": 2}, block=False))
+        with self.assertLogs("django_tatum.apps.tatum.utils.export", "WARNING"):
+            self.assertEqual(sink.write_many([{"id": 3}, {"id": 4}], block=False), 2)
+        self.assertEqual(sink.dropped, 2)
+        sink.resume.set()
+        sink.close()
+        self.assertEqual(self.lines(path), [{"id": 1}, {"id": 2}])
+
+    def test_non_blocking_write_is_not_held_up_by_a_blocked_writer(self):
+        sink = StalledSink(os.path.join(self.directory, "accounts.ndjson"), max_buffer=1)
+        sink.write({"id": 1})
+        blocked = threading.Thread(target=sink.write, args=({"id": 2},))
+        blocked.start()
+        started = time.monotonic()
+        self.assertFalse(sink.write({"id": 3}, block=False))
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertTrue(blocked.is_alive())
+        sink.resume.set()
+        blocked.join()
+        sink.close()
+
+    def test_writes_are_refused_once_closed(self):
+        sink = NDJSONSink(os.path.join(self.directory, "accounts.ndjson"))
+        sink.close()
+        with self.assertRaises(ValueError):
+            sink.write({"id": 1})
+        sink.close()
+
+
+@override_settings(ROOT_URLCONF=__name__, TATUM_WEBHOOK_SECRET="webhook-secret")
+class WebhookReceiverTest(TestCase):
+    """Only signed notifications must be accepted, and each one applied once however often Tatum sends it."""
+
+    def setUp(self):
+        previous = get_webhook_queue()
+        self.addCleanup(set_webhook_queue, previous)
+        self.queue = WebhookQueue(refresh_balances=False)
+        set_webhook_queue(self.queue)
+        self.received = []
+        receiver = lambda sender, event, **kwargs: self.received.append(event)  # noqa: E731
+        webhook_received.connect(receiver, weak=False)
+        self.addCleanup(webhook_received.disconnect, receiver)
+
+    def post(self, body, signature=None):
+        headers = {} if signature is None else {"HTTP_X_PAYLOAD_HASH": signature}
+        return self.client.post(reverse("tatum:webhook"), body, content_type="application/json", **headers)
+
+    def event(self, reference):
+        return json.dumps({"accountId": "a1", "amount": "0.5", "reference": reference}).encode()
+
+    def test_signed_event_is_queued_and_processed(self):
+        body = self.event("r1")
+        self.assertEqual(self.post(body, sign_payload(body)).status_code, 200)
+        self.queue.join()
+        self.assertEqual([event["reference"] for event in self.received], ["r1"])
+        self.assertEqual(self.queue.stats["processed"], 1)
+
+    def test_unsigned_or_forged_events_are_refused(self):
+        body = self.event("r1")
+        self.assertEqual(self.post(body).status_code, 401)
+        self.assertEqual(self.post(body, sign_payload(body, "another-secret")).status_code, 401)
+        self.assertEqual(self.post(self.event("r2"), sign_payload(body)).status_code, 401)
+        self.assertEqual(self.queue.stats["received"], 0)
+
+    def test_redelivered_event_is_processed_once(self):
+        body = self.event("r1")
+        for _ in range(3):
+            self.assertEqual(self.post(body, sign_payload(body)).status_code, 200)
+            self.queue.join()
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual((self.queue.stats["received"], self.queue.stats["duplicates"]), (3, 2))
+
+    def test_recorded_events_are_replayed_in_process(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        log = WebhookLog(os.path.join(directory.name, "webhooks.jsonl"))
+        for reference in ("r1", "r2", "r1"):
+            log.append(json.loads(self.event(reference)))
+        out = io.StringIO()
+        call_command("tatum_replay_webhooks", str(log.path), "--no-refresh", stdout=out)
+        self.assertEqual([event["reference"] for event in self.received], ["r1", "r2"])
+        self.assertIn("processed: 2", out.getvalue())
+        self.assertIn("duplicates: 1", out.getvalue())
+
+
+class FakeProvisioning:
+    """Stand-in for the account and address clients, creating numbered accounts and addresses."""
+
+    def __init__(self):
+        self.created = 0
+        self.assigned = []
+
+    def create_accounts_in_bulk(self, accounts):
+        results = []
+        for account in accounts:
+            self.created += 1
+            results.append({"ok": True, "result": {"id": f"acc-{self.created}", **account}, "error": None})
+        return results
+
+    def create_deposit_addresses(self, account_ids, raise_on_error=True):
+        self.assigned += account_ids
+        return {id: {"address": f"0x{id}", "derivationKey": index} for index, id in enumerate(account_ids)}
+
+
+class AccountPoolTest(TestCase):
+    """Pooled accounts must be handed out once each, topped up below the low-water mark and recovered when stranded."""
+
+    def setUp(self):
+        self.tatum = FakeProvisioning()
+        self.pool = AccountPool({"ETH": {"xpub": "xpub-eth", "low_water": 2, "target": 5}}, self.tatum, self.tatum)
+
+    def stock(self, count, address=True):
+        for _ in range(count):
+            self.tatum.created += 1
+            PooledAccount.objects.create(
+                currency="ETH", account_tatum_id=f"acc-{self.tatum.created}", address=f"0x{self.tatum.created}" if address else ""
+            )
+
+    def test_each_account_is_claimed_once(self):
+        self.stock(3)
+        claimed = [self.pool.claim("ETH", f"user-{index}", provision=False) for index in range(3)]
+        self.assertEqual(len({entry.pk for entry in claimed}), 3)
+        self.assertEqual(
+            sorted(PooledAccount.objects.values_list("claimed_by", flat=True)), ["user-0", "user-1", "user-2"]
+        )
+        self.assertIsNone(self.pool.claim("ETH", provision=False))
+        self.assertTrue(self.pool.low.is_set())
+        with self.assertRaises(ValueError):
+            self.pool.claim("BTC")
+
+    def test_empty_pool_provisions_on_demand(self):
+        with self.assertLogs("apps.tatum.pool", "WARNING"):
+            entry = self.pool.claim("ETH", "user-1")
+        self.assertEqual((entry.account_tatum_id, entry.address, entry.claimed_by), ("acc-1", "0xacc-1", "user-1"))
+        self.assertEqual(entry.xpub, "xpub-eth")
+        self.assertEqual(self.pool.available("ETH"), 0)
+
+    def test_refill_only_below_the_low_water_mark(self):
+        self.stock(2)
+        self.assertEqual(self.pool.refill("ETH"), 0)
+        self.assertEqual(self.tatum.created, 2)
+        self.pool.claim("ETH")
+        self.assertEqual(self.pool.refill("ETH"), 4)
+        self.assertEqual(self.pool.available("ETH"), 5)
+
+    def test_stranded_accounts_are_recovered(self):
+        self.stock(2, address=False)
+        stale = now() - timedelta(seconds=conf.TATUM_POOL_RECOVER_AFTER + 1)
+        PooledAccount.objects.filter(account_tatum_id="acc-1").update(created_at=stale)
+        self.stock(2)
+        # acc-2 may still be being given an address by another refill.
+        self.assertEqual(self.pool.refill("ETH"), 1)
+        self.assertEqual(self.tatum.assigned, ["acc-1"])
+        self.assertEqual(PooledAccount.objects.get(account_tatum_id="acc-1").address, "0xacc-1")
+        self.assertEqual(PooledAccount.objects.get(account_tatum_id="acc-2").address, "")
+
+
+def trade(trade_id, type, price, amount="1", fill="0", created=0, pair="VC_DEMO/VC_EUR"):
+    return {"id": trade_id, "type": type, "price": price, "amount": amount, "fill": fill, "created": created, "pair": pair}
+
+
+class LocalOrderBookTest(SimpleTestCase):
+    """The local book must aggregate trades into price levels and keep each side best first."""
+
+    def test_apply_updates_and_removes_trades(self):
+        book = LocalOrderBook("VC_DEMO/VC_EUR")
+        book.apply(trade("b1", "BUY", "10", amount="3"))
+        book.apply(trade("b2", "FUTURE_BUY", "10", amount="2"))
+        self.assertEqual((len(book), "b1" in book), (2, True))
+        self.assertEqual(book.best_bid(), (Decimal("10"), Decimal("5"), 2))
+        # A partial fill shrinks the level in place.
+        book.apply(trade("b1", "BUY", "10", amount="3", fill="1"))
+        self.assertEqual(book.best_bid(), (Decimal("10"), Decimal("4"), 2))
+        # A new price moves the trade to another level.
+        book.apply(trade("b1", "BUY", "11", amount="3", fill="1"))
+        self.assertEqual(book.depth()["bids"], [(Decimal("11"), Decimal("2"), 1), (Decimal("10"), Decimal("2"), 1)])
+        # A filled trade leaves the book.
+        book.apply(trade("b1", "BUY", "11", amount="3", fill="3"))
+        self.assertNotIn("b1", book)
+        self.assertTrue(book.remove("b2"))
+        self.assertFalse(book.remove("b2"))
+        self.assertEqual((len(book), book.best_bid(), book.depth()), (0, None, {"bids": [], "asks": []}))
+
+    def test_best_bid_and_ask(self):
+        book = LocalOrderBook("VC_DEMO/VC_EUR")
+        self.assertIsNone(book.spread())
+        for index, price in enumerate(["9", "10", "8"]):
+            book.apply(trade(f"b{index}", "BUY", price))
+        for index, price in enumerate(["12", "11", "13"]):
+            book.apply(trade(f"a{index}", "SELL", price))
+        self.assertEqual((book.best_bid().price, book.best_ask().price, book.spread()), (Decimal("10"), Decimal("11"), 1))
+        book.remove("b1")
+        book.remove("a1")
+        self.assertEqual((book.best_bid().price, book.best_ask().price, book.spread()), (Decimal("9"), Decimal("12"), 3))
+
+    def test_depth_is_best_first(self):
+        book = LocalOrderBook("VC_DEMO/VC_EUR")
+        generator = random.Random(7)
+        prices = {}
+        for index in range(500):
+            prices[f"t{index}"] = Decimal(generator.randrange(1, 200))
+            book.apply(trade(f"t{index}", "SELL" if index % 2 else "BUY", str(prices[f"t{index}"])))
+        # Emptied levels stay in the heap until they reach its top or it is rebuilt.
+        for index in generator.sample(range(500), 400):
+            book.remove(f"t{index}")
+
+        def expected(type, descending):
+            levels = {}
+            for trade_id, price in prices.items():
+                if trade_id in book and int(trade_id[1:]) % 2 == (type == "SELL"):
+                    quantity, orders = levels.get(price, (0, 0))
+                    levels[price] = (quantity + 1, orders + 1)
+            return [(price, *levels[price]) for price in sorted(levels, reverse=descending)][:10]
+
+        depth = book.depth(10)
+        self.assertEqual(depth["bids"], expected("BUY", True))
+        self.assertEqual(depth["asks"], expected("SELL", False))
+
+    def test_reconcile_removes_closed_trades_above_the_page(self):
+        book = LocalOrderBook("VC_DEMO/VC_EUR")
+        for trade_id, price in [("a1", "1"), ("a2", "2"), ("a3", "3"), ("a3b", "3"), ("a4", "4")]:
+            book.apply(trade(trade_id, "SELL", price))
+        page = [trade("a1", "SELL", "1", amount="1", fill="0.5"), trade("a3", "SELL", "3")]
+        # a2 is priced better than the last trade of the page but missing from it; a3b ties it.
+        self.assertEqual(book.reconcile("SELL", page), 1)
+        self.assertEqual(sorted(book._orders), ["a1", "a3", "a3b", "a4"])
+        self.assertEqual(book.best_ask(), (Decimal("1"), Decimal("0.5"), 1))
+        self.assertEqual(book.reconcile("SELL", []), 0)
+        self.assertEqual(len(book), 4)
+
+    def test_complete_reconcile_removes_every_missing_trade(self):
+        book = LocalOrderBook("VC_DEMO/VC_EUR")
+        for trade_id, price in [("b1", "4"), ("b2", "3"), ("b3", "2")]:
+            book.apply(trade(trade_id, "BUY", price))
+        book.apply(trade("a1", "SELL", "5"))
+        self.assertEqual(book.reconcile("BUY", [trade("b2", "BUY", "3")], complete=True), 2)
+        self.assertEqual(sorted(book._orders), ["a1", "b2"])
+        self.assertEqual(book.reconcile("BUY", [], complete=True), 1)
+        self.assertEqual(sorted(book._orders), ["a1"])
+
+
+class FakeOrderBook:
+    """Stand-in for the order book client, listing scripted open and closed trades."""
+
+    SORTS = {
+        "CREATED_DESC": lambda trade: -trade["created"],
+        "PRICE_DESC": lambda trade: -Decimal(trade["price"]),
+        "PRICE_ASC": lambda trade: Decimal(trade["price"]),
+    }
+
+    def __init__(self):
+        self.open = {}
+        self.closed = []
+        self.listings = []
+
+    def add(self, *args, **kwargs):
+        record = trade(*args, **kwargs)
+        self.open[record["id"]] = record
+
+    def close(self, trade_id):
+        self.closed.append(self.open.pop(trade_id))
+
+    def iter_active_trades(self, side, pair, sort="CREATED_DESC", page_size=50):
+        self.listings.append((side, sort))
+        trades = [record for record in self.open.values() if SIDES[record["type"]] == side and record["pair"] == pair]
+        return iter(sorted(trades, key=self.SORTS[sort]))
+
+    def iter_history(self, pair, sort="CREATED_DESC", page_size=50):
+        return iter(sorted(self.closed, key=self.SORTS[sort]))
+
+    def store_trade(self, data):
+        self.add(data["id"], data["type"], data["price"], data["amount"], created=data["created"])
+        return {"id": data["id"]}
+
+    def get_trade(self, trade_id):
+        if trade_id not in self.open:
+            raise TatumAPIException(404, {"message": "Trade not found."})
+        return self.open[trade_id]
+
+    def cancel_trade(self, trade_id):
+        self.open.pop(trade_id)
+
+
+class OrderBookMirrorTest(SimpleTestCase):
+    """Polling must follow new, closed and crossed trades from the newest pages alone."""
+
+    PAIR = "VC_DEMO/VC_EUR"
+
+    def setUp(self):
+        self.client = FakeOrderBook()
+        self.client.add("b1", "BUY", "10", created=10)
+        self.client.add("b2", "BUY", "9", created=20)
+        self.client.add("a1", "SELL", "11", created=30)
+        self.client.add("h1", "SELL", "20", created=50)
+        self.client.close("h1")
+
+    def mirror(self, **kwargs):
+        mirror = OrderBookMirror(client=self.client, reload_every=0, **kwargs)
+        mirror.load(self.PAIR)
+        return mirror
+
+    def test_poll_follows_new_and_closed_trades(self):
+        mirror = self.mirror()
+        book = mirror.book(self.PAIR)
+        self.assertEqual(sorted(book._orders), ["a1", "b1", "b2"])
+        self.client.add("a2", "SELL", "12", created=60)
+        self.client.add("a3", "SELL", "13", created=70)
+        self.client.close("a3")
+        self.assertIs(mirror.poll(self.PAIR), book)
+        self.assertEqual(sorted(book._orders), ["a1", "a2", "b1", "b2"])
+        # Nothing changed: no best-priced pages are read.
+        del self.client.listings[:]
+        mirror.poll(self.PAIR)
+        self.assertEqual(self.client.listings, [("BUY", "CREATED_DESC"), ("SELL", "CREATED_DESC")])
+
+    def test_crossing_trade_reconciles_the_top_of_the_book(self):
+        mirror = self.mirror()
+        # A sell at 10 fills b1, created before the newest closed trade seen at load time.
+        self.client.add("a2", "SELL", "10", amount="2", fill="1", created=60)
+        self.client.close("b1")
+        book = mirror.poll(self.PAIR)
+        self.assertEqual(sorted(book._orders), ["a1", "a2", "b2"])
+        self.assertEqual((book.best_bid().price, book.best_ask()), (Decimal("9"), (Decimal("10"), Decimal("1"), 1)))
+
+    def test_partial_top_page_only_reconciles_above_its_last_price(self):
+        for index in range(3):
+            self.client.add(f"b{index + 3}", "BUY", str(5 - index), created=index)
+        mirror = self.mirror(page_size=2)
+        self.client.close("b1")
+        self.client.cancel_trade("b5")
+        self.client.add("a2", "SELL", "12", created=60)
+        book = mirror.poll(self.PAIR)
+        # b1 sat above the page of the two best bids; b5 lay below it and waits for a reload.
+        self.assertEqual(sorted(book._orders), ["a1", "a2", "b2", "b3", "b4", "b5"])
+
+    def test_periodic_reload_drops_trades_cancelled_elsewhere(self):
+        mirror = OrderBookMirror(client=self.client, reload_every=2)
+        book = mirror.poll(self.PAIR)
+        self.client.cancel_trade("b2")
+        self.assertIs(mirror.poll(self.PAIR), book)
+        self.assertIn("b2", book)
+        reloaded = mirror.poll(self.PAIR)
+        self.assertIsNot(reloaded, book)
+        self.assertNotIn("b2", reloaded)
+
+    def test_place_and_cancel_update_the_local_book(self):
+        mirror = self.mirror()
+        mirror.place({"id": "b3", "type": "BUY", "price": "10.5", "amount": "1", "pair": self.PAIR, "created": 60})
+        self.assertEqual(mirror.book(self.PAIR).best_bid().price, Decimal("10.5"))
+        # Filled on arrival: Tatum no longer returns it as open.
+        self.client.get_trade = mock.Mock(side_effect=TatumAPIException(404, {}))
+        filled = {"id": "a2", "type": "SELL", "price": "10", "amount": "1", "pair": self.PAIR, "created": 61}
+        self.assertEqual(mirror.place(filled), {"id": "a2"})
+        self.assertNotIn("a2", mirror.book(self.PAIR))
+        mirror.cancel("b3")
+        self.assertEqual(mirror.book(self.PAIR).best_bid().price, Decimal("10"))
+
+
+class OneShotStream(io.BytesIO):
+    """A file object that can only be read once, like a pipe or a socket."""
+
+    def seekable(self):
+        return False
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation("seek")
+
+
+class UploadSession:
+    """Stand-in for the pooled session that reads each request body and answers from a script."""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.bodies = []
+        self.lengths = []
+
+    def request(self, method, url, headers=None, data=None, **kwargs):
+        self.lengths.append(len(data) if hasattr(data, "__len__") else None)
+        self.bodies.append(b"".join(data))
+        status = self.statuses.pop(0)
+        return response(status, "0") if status == 429 else FakeResponse({"ipfsHash": "Qm1"})
+
+
+class MultipartFileTest(SimpleTestCase):
+    """A multipart body must declare its exact length, frame its part and read the same bytes each time."""
+
+    def assertFramed(self, body, content, filename="file", part_type="application/octet-stream"):
+        sent = b"".join(body)
+        self.assertEqual(len(body), len(sent))
+        self.assertEqual(body.content_type, f"multipart/form-data; boundary={body.boundary}")
+        head = (
+            f"--{body.boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f"Content-Type: {part_type}\r\n\r\n"
+        ).encode()
+        self.assertEqual(sent, head + content + f"\r\n--{body.boundary}--\r\n".encode())
+        self.assertEqual(b"".join(body), sent)
+
+    def test_bytes_and_paths(self):
+        self.assertFramed(MultipartFile(b"hello"), b"hello")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "data.json")
+        content = os.urandom(10000)
+        with open(path, "wb") as f:
+            f.write(content)
+        self.assertFramed(MultipartFile(path, chunk_size=1000), content, "data.json", "application/json")
+
+    def test_seekable_file_is_read_from_its_position(self):
+        content = os.urandom(5000)
+        f = io.BytesIO(b"skipped" + content)
+        f.seek(7)
+        body = MultipartFile(f, filename='a "quoted" name.bin', chunk_size=512)
+        self.assertTrue(body.sized)
+        self.assertFramed(body, content, 'a \\"quoted\\" name.bin')
+
+    def test_non_seekable_stream_is_buffered_once(self):
+        content = os.urandom(3000)
+        body = MultipartFile(OneShotStream(content), chunk_size=256)
+        self.assertFalse(body.sized)
+        with self.assertRaises(TypeError):
+            len(body)
+        body.buffer()
+        self.addCleanup(body.close)
+        self.assertTrue(body.sized)
+        self.assertFramed(body, content)
+
+
+class IPFSUploadTest(SimpleTestCase):
+    """An upload rate-limited with a 429 must be resent in full, whatever its source."""
+
+    def upload(self, source):
+        session = UploadSession(429, 200)
+        with mock.patch("django_tatum.apps.tatum.utils.requestHandler.get_session", return_value=session), mock.patch(
+            "django_tatum.apps.tatum.utils.requestHandler.get_scheduler",
+            return_value=RequestScheduler(rate=0, max_retries=2, backoff_base=0),
+        ):
+            self.assertEqual(IPFSStorage().store_data(source, filename="upload.bin"), {"ipfsHash": "Qm1"})
+        return session
+
+    def test_seekable_upload_is_resent(self):
+        content = os.urandom(4000)
+        session = self.upload(io.BytesIO(content))
+        self.assertEqual(len(session.bodies), 2)
+        self.assertEqual(session.bodies[0], session.bodies[1])
+        self.assertIn(content, session.bodies[1])
+        self.assertEqual(session.lengths, [len(session.bodies[0])] * 2)
+
+    def test_non_seekable_upload_is_resent(self):
+        content = os.urandom(4000)
+        session = self.upload(OneShotStream(content))
+        self.assertEqual(session.bodies[0], session.bodies[1])
+        self.assertIn(content, session.bodies[1])
+        self.assertEqual(session.lengths, [len(session.bodies[0])] * 2)
+
+
+class CodecTest(SimpleTestCase):
+    """Every codec must encode the same bytes, decode them back, and be picked as TATUM_JSON_CODEC says."""
+
+    PAYLOAD = {"amount": Decimal("0.1000000000000000055"), "memo": b"\x00\xff", "flags": [1, True, None], "note": "é"}
+    ENCODED = '{"amount":"0.1000000000000000055","memo":"AP8=","flags":[1,true,null],"note":"é"}'.encode()
+    DECODED = {"amount": "0.1000000000000000055", "memo": "AP8=", "flags": [1, True, None], "note": "é"}
+
+    def assertRoundTrip(self, codec):
+        self.assertEqual(codec.dumps(self.PAYLOAD), self.ENCODED)
+        self.assertEqual(codec.loads(self.ENCODED), self.DECODED)
+        self.assertEqual(codec.loads(self.ENCODED.decode()), self.DECODED)
+        self.assertEqual(codec.loads(codec.dumps(self.DECODED)), self.DECODED)
+        for malformed in (b"{", b"", b"[1,]"):
+            with self.assertRaises(ValueError):
+                codec.loads(malformed)
+        with self.assertRaises(TypeError):
+            codec.dumps({"at": object()})
+
+    def test_stdlib_round_trip(self):
+        self.assertRoundTrip(StdlibCodec())
+
+    @skipUnless(codecs.orjson, "orjson is not installed")
+    def test_orjson_round_trip(self):
+        self.assertRoundTrip(make_codec("orjson"))
+
+    @skipUnless(codecs.msgspec, "msgspec is not installed")
+    def test_msgspec_round_trip(self):
+        self.assertRoundTrip(make_codec("msgspec"))
+
+    def test_auto_picks_the_fastest_installed_codec(self):
+        with mock.patch.object(codecs, "orjson", None), mock.patch.object(codecs, "msgspec", None):
+            self.assertEqual(available_codecs(), ["json"])
+            self.assertEqual(make_codec("auto").name, "json")
+            with self.assertRaises(ImportError):
+                OrjsonCodec()
+            with self.assertRaises(ImportError):
+                make_codec("msgspec")
+        with mock.patch.object(codecs, "orjson", None), mock.patch.object(codecs, "msgspec", mock.Mock()):
+            self.assertEqual(make_codec("Auto").name, "msgspec")
+        with mock.patch.object(codecs, "orjson", mock.Mock()):
+            self.assertEqual(make_codec().name, "orjson")
+        with self.assertRaises(ValueError):
+            make_codec("yaml")
 
-# Create your tests here.
+    def test_shared_codec_follows_the_setting(self):
+        set_codec(None)
+        self.addCleanup(set_codec, None)
+        with mock.patch.object(conf, "TATUM_JSON_CODEC", "json"):
+            codec = get_codec()
+            self.assertEqual(codec.name, "json")
+            self.assertIs(get_codec(), codec)
+        replacement = StdlibCodec()
+        set_codec(replacement)
+        self.assertIs(get_codec(), replacement)
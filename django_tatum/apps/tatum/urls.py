@@ -0,0 +1,10 @@
+"""Tatum URL Configuration"""
+from django.urls import path
+
+from . import views
+
+app_name = "tatum"
+
+urlpatterns = [
+    path("webhook/", views.tatum_webhook, name="webhook"),
+]
@@ -0,0 +1,172 @@
+"""Asyncio counterpart of `RequestHandler`.
+
+Requires the optional `aiohttp` dependency (`pip install django-tatum[async]`).
+All handlers running on the same event loop share one `aiohttp.ClientSession`,
+so one worker can keep hundreds of requests in flight over a single pool.
+"""
+import asyncio
+import weakref
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.utils.codec import JSONCodec
+from django_tatum.apps.tatum.utils.codec import get_codec
+from django_tatum.apps.tatum.utils.scheduler import RequestScheduler
+from django_tatum.apps.tatum.utils.scheduler import get_scheduler
+from django_tatum.apps.tatum.utils.singleflight import endpoint_pattern
+from django_tatum.apps.tatum.utils.singleflight import get_single_flight
+from django_tatum.apps.tatum.utils.singleflight import memoize_json
+from django_tatum.apps.tatum.utils.singleflight import request_key
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class AsyncResponse:
+    """A fully read HTTP response, exposing the subset of `requests.Response` the clients use."""
+
+    def __init__(self, status_code: int, headers, content: bytes, url: str, codec: JSONCodec = None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.codec = codec or get_codec()
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return self.codec.loads(self.content)
+
+
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise ImportError("aiohttp is required for the async Tatum client. Install it with `pip install django-tatum[async]`.")
+
+
+def get_async_session() -> "aiohttp.ClientSession":
+    """Return the shared aiohttp session of the running event loop, creating it on first use."""
+    _require_aiohttp()
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=conf.TATUM_ASYNC_POOL_LIMIT,
+            limit_per_host=conf.TATUM_ASYNC_POOL_MAXSIZE,
+            keepalive_timeout=conf.TATUM_ASYNC_KEEPALIVE_TIMEOUT,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=conf.TATUM_HTTP_TIMEOUT),
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def close_async_session():
+    """Close the shared aiohttp session of the running event loop, if any."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+def _clean_params(params):
+    """aiohttp only accepts str/int/float query values; mirror how Tatum expects booleans."""
+    if not params:
+        return None
+    cleaned = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        cleaned[key] = str(value).lower() if isinstance(value, bool) else value
+    return cleaned
+
+
+class AsyncRequestHandler:
+    def __init__(
+        self,
+        url,
+        headers,
+        session: "aiohttp.ClientSession" = None,
+        scheduler: RequestScheduler = None,
+        coalesce: bool = True,
+        codec: JSONCodec = None,
+    ):
+        self.url = url
+        self.headers = headers
+        self._session = session
+        self._scheduler = scheduler
+        self.coalesce = coalesce
+        self._codec = codec
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """The session used to send requests; the loop's shared session unless one was given."""
+        return self._session or get_async_session()
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """The scheduler pacing and retrying requests; the shared one unless one was given."""
+        return self._scheduler or get_scheduler()
+
+    @property
+    def codec(self) -> JSONCodec:
+        """The codec encoding request bodies and decoding responses; the shared one unless one was given."""
+        return self._codec or get_codec()
+
+    async def _send(self, method, json=None, **kwargs) -> AsyncResponse:
+        codec = self.codec
+        headers = self.headers
+        if json is not None:
+            kwargs["data"] = codec.dumps(json)
+            headers = {"Content-Type": "application/json", **headers}
+        async with self.session.request(method, self.url, headers=headers, **kwargs) as response:
+            content = await response.read()
+            return AsyncResponse(response.status, response.headers, content, str(response.url), codec)
+
+    async def _scheduled_send(self, method, **kwargs) -> AsyncResponse:
+        return await self.scheduler.send_async(
+            method,
+            lambda: self._send(method, **kwargs),
+            retry_exceptions=(aiohttp.ClientConnectionError, asyncio.TimeoutError),
+        )
+
+    async def _request(self, method, params=None, json=None, **kwargs) -> AsyncResponse:
+        _require_aiohttp()
+        kwargs.update(params=_clean_params(params), json=json)
+        pattern = endpoint_pattern(self.url) if self.coalesce and method == "GET" else None
+        if pattern is None:
+            return await self._scheduled_send(method, **kwargs)
+
+        async def send():
+            return memoize_json(await self._scheduled_send(method, **kwargs))
+
+        return await get_single_flight().do_async(
+            request_key(method, self.url, kwargs["params"], self.headers),
+            send,
+            label=pattern,
+        )
+
+    async def get(self, **kwargs) -> AsyncResponse:
+        return await self._request("GET", **kwargs)
+
+    async def post(self, data=None, **kwargs) -> AsyncResponse:
+        return await self._request("POST", json=data, **kwargs)
+
+    async def put(self, data=None, **kwargs) -> AsyncResponse:
+        return await self._request("PUT", json=data, **kwargs)
+
+    async def delete(self, **kwargs) -> AsyncResponse:
+        return await self._request("DELETE", **kwargs)
+
+    async def patch(self, data, **kwargs) -> AsyncResponse:
+        return await self._request("PATCH", json=data, **kwargs)
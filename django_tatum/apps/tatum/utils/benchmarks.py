@@ -0,0 +1,91 @@
+"""Benchmark of the JSON codecs on large account listings.
+
+Run with::
+
+    python -m django_tatum.apps.tatum.utils.benchmarks --accounts 100000 --repeat 5
+
+Each installed codec decodes and encodes a synthetic `/v3/ledger/account` listing shaped
+like Tatum's responses. The best time of `--repeat` runs is reported, together with the
+speed-up over the standard library.
+"""
+import argparse
+import time
+from typing import Callable
+
+from django_tatum.apps.tatum.utils.codec import available_codecs
+from django_tatum.apps.tatum.utils.codec import make_codec
+
+
+def sample_accounts(count: int) -> list[dict]:
+    """Build `count` virtual accounts shaped like the Tatum ledger account listing."""
+    currencies = ("BTC", "ETH", "MATIC", "SOL", "USDT_MATIC")
+    return [
+        {
+            "id": f"{i:024x}",
+            "balance": {
+                "accountBalance": f"{i % 9973}.{i % 1000:03d}",
+                "availableBalance": f"{i % 9967}.{i % 1000:03d}",
+            },
+            "currency": currencies[i % len(currencies)],
+            "frozen": i % 17 == 0,
+            "active": i % 23 != 0,
+            "customerId": f"{i // 3:024x}",
+            "accountNumber": f"ACC{i:010d}",
+            "accountCode": "AC_1_no_xpub",
+            "accountingCurrency": "USD",
+            "xpub": (
+                "xpub6EsCk1uU6cJzqvP9CdsTiJwT2rF748YkPnhv5Qo8q44DG7nn2vbyt48YRsNSUYS44jFCW9gwvD9kLQu9"
+                "AuqXpTpM1c5hgg9PsuBLdeNncid"
+            ),
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    """Return the fastest of `repeat` timed runs of `fn`, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(accounts: int = 100_000, repeat: int = 5) -> dict[str, dict[str, float]]:
+    """Time decoding and encoding of an `accounts` long listing with every installed codec.
+
+    Returns:
+        dict[str, dict[str, float]]: Seconds per decode and per encode, keyed by codec name.
+    """
+    listing = sample_accounts(accounts)
+    payload = make_codec("json").dumps(listing)
+    results = {}
+    for name in available_codecs():
+        codec = make_codec(name)
+        results[name] = {
+            "decode": best_of(repeat, lambda: codec.loads(payload)),
+            "encode": best_of(repeat, lambda: codec.dumps(listing)),
+        }
+    return results
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=100_000, help="Accounts in the synthetic listing.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement; the best is kept.")
+    args = parser.parse_args(argv)
+
+    results = run(args.accounts, args.repeat)
+    baseline = results["json"]
+    print(f"{args.accounts} accounts, best of {args.repeat} runs")
+    print(f"{'codec':<10}{'decode (ms)':>14}{'encode (ms)':>14}{'decode x':>11}{'encode x':>11}")
+    for name, timing in results.items():
+        print(
+            f"{name:<10}{timing['decode'] * 1000:>14.1f}{timing['encode'] * 1000:>14.1f}"
+            f"{baseline['decode'] / timing['decode']:>11.1f}{baseline['encode'] / timing['encode']:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
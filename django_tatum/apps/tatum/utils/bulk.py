@@ -0,0 +1,204 @@
+"""Chunked, concurrent execution of Tatum batch endpoints.
+
+A large list of items is split into chunks no larger than the endpoint's batch limit and
+the chunks are sent with bounded parallelism. Each chunk's outcome is recorded against
+the items it contained, so the results line up with the input whatever the order in
+which chunks complete.
+
+Failed chunks are handled one by one:
+
+- Transient failures (connection errors, timeouts and 5xx responses) are retried with
+  backoff, up to `max_attempts` sends per chunk. Chunks sent to an endpoint that creates
+  something (`idempotent=False`) are only retried when Tatum cannot have received them:
+  a 429, or an error establishing the connection. After a read timeout or a 5xx the
+  chunk may have been applied, and sending it again would create it twice.
+- A 4xx rejection is deterministic and Tatum applies batches atomically, so nothing was
+  created. The chunk is split in halves and each half is sent again. Repeating this
+  isolates the rejected items, and the valid items of the chunk still go through.
+"""
+import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Sequence
+from typing import TypedDict
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from django_tatum.apps.tatum.tatum_client.exceptions import TatumAPIException
+from django_tatum.apps.tatum.utils.scheduler import get_scheduler
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class BulkItemResult(TypedDict):
+    """Outcome of one input item of a bulk call."""
+
+    index: int
+    ok: bool
+    result: Any
+    error: Exception
+
+
+def chunked(items: Sequence, chunk_size: int) -> list[tuple[int, list]]:
+    """Split `items` into (start index, chunk) pairs of at most `chunk_size` items."""
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1.")
+    return [(start, list(items[start : start + chunk_size])) for start in range(0, len(items), chunk_size)]
+
+
+def split_results(keys: Sequence, results: list[BulkItemResult]) -> tuple[dict, dict]:
+    """Split the results of a bulk call into the values and the errors by key."""
+    values, errors = {}, {}
+    for key, result in zip(keys, results):
+        if result["ok"]:
+            values[key] = result["result"]
+        else:
+            errors[key] = result["error"]
+    return values, errors
+
+
+def is_connect_error(error: Exception) -> bool:
+    """Whether a request failed before it reached Tatum."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError):
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+    return aiohttp is not None and isinstance(error, aiohttp.ClientConnectorError)
+
+
+def is_transient(error: Exception, idempotent: bool = True) -> bool:
+    """Whether a failed chunk may succeed when sent again.
+
+    For a chunk that is not `idempotent`, only the failures after which Tatum cannot have
+    applied it count.
+    """
+    if isinstance(error, TatumAPIException):
+        return error.status_code == 429 or (idempotent and error.status_code >= 500)
+    if not idempotent:
+        return is_connect_error(error)
+    transport_errors = (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError)
+    if aiohttp is not None:
+        transport_errors += (aiohttp.ClientConnectionError,)
+    return isinstance(error, transport_errors)
+
+
+def is_rejection(error: Exception) -> bool:
+    """Whether Tatum refused a chunk without applying any of it."""
+    return isinstance(error, TatumAPIException) and 400 <= error.status_code < 500 and error.status_code != 429
+
+
+def _check_chunk_result(chunk: list, response: Any) -> list:
+    if not isinstance(response, list) or len(response) != len(chunk):
+        raise TatumAPIException(200, response, "Tatum returned an unexpected response for a batch request.")
+    return response
+
+
+class _BulkRun:
+    """Bookkeeping shared by the sync and async runners."""
+
+    def __init__(self, size: int, max_attempts: int, idempotent: bool):
+        self.max_attempts = max(max_attempts, 1)
+        self.idempotent = idempotent
+        self.results: list[BulkItemResult] = [None] * size
+
+    def succeed(self, start: int, chunk: list, response: Any):
+        for offset, result in enumerate(_check_chunk_result(chunk, response)):
+            self.results[start + offset] = {"index": start + offset, "ok": True, "result": result, "error": None}
+
+    def fail(self, start: int, chunk: list, error: Exception):
+        for offset in range(len(chunk)):
+            self.results[start + offset] = {"index": start + offset, "ok": False, "result": None, "error": error}
+
+    def next_attempts(self, start: int, chunk: list, attempt: int, error: Exception) -> list[tuple[int, list, int]]:
+        """The chunks to send after a failure; an empty list records the failure."""
+        if is_transient(error, self.idempotent) and attempt + 1 < self.max_attempts:
+            return [(start, chunk, attempt + 1)]
+        if is_rejection(error) and len(chunk) > 1:
+            middle = len(chunk) // 2
+            return [(start, chunk[:middle], 0), (start + middle, chunk[middle:], 0)]
+        self.fail(start, chunk, error)
+        return []
+
+
+def run_chunked(
+    items: Sequence,
+    send_chunk: Callable[[list], list],
+    chunk_size: int,
+    max_workers: int = 4,
+    max_attempts: int = 3,
+    idempotent: bool = True,
+) -> list[BulkItemResult]:
+    """Send `items` to a batch endpoint in concurrent chunks.
+
+    Args:
+        items (Sequence): The items to send.
+        send_chunk (Callable[[list], list]): Sends one chunk and returns one result per item,
+            in order. Raises TatumAPIException when Tatum answers with an error.
+        chunk_size (int): Largest chunk the endpoint accepts.
+        max_workers (int, optional): Chunks sent concurrently. Defaults to 4.
+        max_attempts (int, optional): Sends per chunk for transient failures. Defaults to 3.
+        idempotent (bool, optional): Whether sending a chunk twice is harmless. Pass False
+            for endpoints that create something. Defaults to True.
+
+    Returns:
+        list[BulkItemResult]: One result per input item, in input order.
+    """
+    run = _BulkRun(len(items), max_attempts, idempotent)
+    scheduler = get_scheduler()
+
+    def send(chunk: list, attempt: int):
+        if attempt:
+            time.sleep(scheduler.backoff(attempt - 1))
+        return send_chunk(chunk)
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        running = {
+            executor.submit(send, chunk, 0): (start, chunk, 0) for start, chunk in chunked(items, chunk_size)
+        }
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, chunk, attempt = running.pop(future)
+                try:
+                    run.succeed(start, chunk, future.result())
+                except Exception as error:
+                    for retry in run.next_attempts(start, chunk, attempt, error):
+                        running[executor.submit(send, *retry[1:])] = retry
+    return run.results
+
+
+async def arun_chunked(
+    items: Sequence,
+    send_chunk: Callable[[list], Awaitable[list]],
+    chunk_size: int,
+    max_workers: int = 4,
+    max_attempts: int = 3,
+    idempotent: bool = True,
+) -> list[BulkItemResult]:
+    """Asynchronous counterpart of `run_chunked`."""
+    run = _BulkRun(len(items), max_attempts, idempotent)
+    scheduler = get_scheduler()
+    semaphore = asyncio.Semaphore(max(max_workers, 1))
+
+    async def process(start: int, chunk: list, attempt: int):
+        if attempt:
+            await asyncio.sleep(scheduler.backoff(attempt - 1))
+        try:
+            async with semaphore:
+                response = await send_chunk(chunk)
+            run.succeed(start, chunk, response)
+        except Exception as error:
+            await asyncio.gather(*(process(*retry) for retry in run.next_attempts(start, chunk, attempt, error)))
+
+    await asyncio.gather(*(process(start, chunk, 0) for start, chunk in chunked(items, chunk_size)))
+    return run.results
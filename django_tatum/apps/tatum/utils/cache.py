@@ -0,0 +1,227 @@
+"""Pluggable cache for Tatum lookups.
+
+Two backends are provided: an in-process, thread-safe LRU cache with per-entry TTLs and
+an adapter over a Django cache backend (e.g. Redis or Memcached) for caches shared
+between processes. Callers always get their own copy of a cached value: the LRU cache
+copies values in and out, and Django cache backends serialize them.
+"""
+import copy
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+
+from django_tatum.apps.tatum.tatum_client import conf
+
+# Returned by `BaseCache.get` when a key is not cached, since None is a valid cached value.
+MISSING = object()
+
+
+def cache_key(kind: str, identifier: str) -> str:
+    """Build the cache key of a Tatum entity, e.g. `cache_key("account", account_id)`."""
+    return f"tatum:{kind}:{identifier}"
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_invalidation(self, count: int = 1):
+        with self._lock:
+            self.invalidations += count
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+class BaseCache(ABC):
+    """Interface of the cache backends.
+
+    A `ttl` of None caches the value until it is invalidated or evicted.
+    """
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def _get(self, key: str) -> Any:
+        """Return the cached value, or `MISSING`, without counting the lookup."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float = None):
+        """Cache `value` under `key` for `ttl` seconds."""
+
+    @abstractmethod
+    def _delete(self, keys: tuple[str, ...]):
+        """Drop the given keys."""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry."""
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or `MISSING`."""
+        value = self._get(key)
+        self.stats.record(value is not MISSING)
+        return value
+
+    def delete(self, *keys: str):
+        """Invalidate the given keys."""
+        if keys:
+            self._delete(keys)
+            self.stats.record_invalidation(len(keys))
+
+    def get_or_set(self, key: str, fetch: Callable[[], Any], ttl: float = None) -> Any:
+        value = self.get(key)
+        if value is MISSING:
+            value = fetch()
+            self.set(key, value, ttl)
+        return value
+
+
+class NullCache(BaseCache):
+    """Cache backend that never stores anything."""
+
+    def _get(self, key):
+        return MISSING
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def _delete(self, keys):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache(BaseCache):
+    """In-process LRU cache with a TTL per entry.
+
+    Values are deep-copied when stored and when returned, so a caller editing a value it
+    got back never changes the cached entry.
+
+    Args:
+        maxsize (int, optional): Number of entries kept before the least recently used one
+            is evicted. Defaults to TATUM_CACHE_MAXSIZE.
+    """
+
+    def __init__(self, maxsize: int = None):
+        super().__init__()
+        self.maxsize = maxsize or conf.TATUM_CACHE_MAXSIZE
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key, value, ttl=None):
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DjangoCache(BaseCache):
+    """Adapter over a cache configured in `settings.CACHES`.
+
+    Args:
+        alias (str, optional): The cache alias. Defaults to TATUM_CACHE_DJANGO_ALIAS.
+    """
+
+    def __init__(self, alias: str = None):
+        super().__init__()
+        self.alias = alias or conf.TATUM_CACHE_DJANGO_ALIAS
+
+    @property
+    def backend(self):
+        from django.core.cache import caches
+
+        return caches[self.alias]
+
+    def _get(self, key):
+        return self.backend.get(key, MISSING)
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, timeout=ttl)
+
+    def _delete(self, keys):
+        self.backend.delete_many(list(keys))
+
+    def clear(self):
+        self.backend.clear()
+
+
+_default_cache_lock = threading.Lock()
+_default_cache: BaseCache = None
+
+_BACKENDS: dict[str, Callable[[], BaseCache]] = {
+    "locmem": LRUCache,
+    "django": DjangoCache,
+    "none": NullCache,
+}
+
+
+def get_default_cache() -> BaseCache:
+    """Return the process-wide cache selected by TATUM_CACHE_BACKEND."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                try:
+                    backend = _BACKENDS[conf.TATUM_CACHE_BACKEND.lower()]
+                except KeyError:
+                    raise ValueError(f"Unknown TATUM_CACHE_BACKEND '{conf.TATUM_CACHE_BACKEND}'") from None
+                _default_cache = backend()
+    return _default_cache
+
+
+def set_default_cache(cache: BaseCache):
+    """Replace the process-wide cache."""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
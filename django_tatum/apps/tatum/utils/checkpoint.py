@@ -0,0 +1,61 @@
+"""Resumable progress for long bulk runs.
+
+`JSONLCheckpoint` appends one line per completed item to a JSON lines file. A run that
+is interrupted can be started again with the same file: the items already recorded are
+loaded back and skipped.
+"""
+import threading
+from pathlib import Path
+from typing import Any
+from typing import Union
+
+from django_tatum.apps.tatum.utils.codec import get_codec
+
+
+class JSONLCheckpoint:
+    """Append-only key/value checkpoint stored as JSON lines.
+
+    Args:
+        path (Union[str, Path]): The checkpoint file; created on the first record.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._terminated = False
+
+    def load(self) -> dict[str, Any]:
+        """Return the recorded values by key. A truncated last line, left by a crash, is ignored."""
+        if not self.path.exists():
+            return {}
+        codec = get_codec()
+        done = {}
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = codec.loads(line)
+                except ValueError:
+                    continue
+                done[entry["key"]] = entry["value"]
+        return done
+
+    def record_many(self, entries: dict[str, Any]):
+        """Append `entries` and flush them to the file."""
+        codec = get_codec()
+        lines = b"".join(codec.dumps({"key": key, "value": value}) + b"\n" for key, value in entries.items())
+        with self._lock, open(self.path, "ab") as f:
+            if not self._terminated:
+                # Start on a fresh line if an interrupted run left a partial one behind.
+                if f.tell() and self._last_byte() != b"\n":
+                    lines = b"\n" + lines
+                self._terminated = True
+            f.write(lines)
+            f.flush()
+
+    def _last_byte(self) -> bytes:
+        with open(self.path, "rb") as f:
+            f.seek(-1, 2)
+            return f.read(1)
+
+    def record(self, key: str, value: Any):
+        self.record_many({key: value})
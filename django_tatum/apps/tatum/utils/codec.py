@@ -0,0 +1,157 @@
+"""JSON codecs used to encode request bodies and decode Tatum responses.
+
+orjson and msgspec are optional (`pip install django-tatum[fast-json]`). By default the
+fastest installed codec is used and the standard library `json` module is the fallback.
+Every codec encodes to compact UTF-8 bytes and raises `ValueError` on malformed input.
+They also encode the same extra types alike: a `Decimal` as its string, so amounts keep
+their exact digits, and `bytes` as base64, which is what msgspec does natively.
+"""
+import base64
+import json
+import threading
+from abc import ABC
+from abc import abstractmethod
+from decimal import Decimal
+from typing import Any
+from typing import Union
+
+from django_tatum.apps.tatum.tatum_client import conf
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+def _encode_extra(obj: Any) -> str:
+    """Encode the types JSON has no literal for, as msgspec does."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JSONCodec(ABC):
+    """Interface of the JSON codecs."""
+
+    name: str = None
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """Encode `obj` to compact UTF-8 JSON."""
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON, raising ValueError on malformed input."""
+
+
+class StdlibCodec(JSONCodec):
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(
+            obj, separators=(",", ":"), ensure_ascii=False, allow_nan=False, default=_encode_extra
+        ).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed. Install it with `pip install django-tatum[fast-json]`.")
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=_encode_extra)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("msgspec is not installed. Install it with `pip install django-tatum[fast-json]`.")
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj)
+
+    def loads(self, data):
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+CODECS: dict[str, type[JSONCodec]] = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": StdlibCodec,
+}
+
+
+def available_codecs() -> list[str]:
+    """Names of the codecs usable in this environment, fastest first."""
+    installed = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    return [name for name in CODECS if installed[name]]
+
+
+def make_codec(name: str = "auto") -> JSONCodec:
+    """Build the codec called `name`, or the fastest installed one for "auto"."""
+    name = name.lower()
+    if name == "auto":
+        name = available_codecs()[0]
+    try:
+        return CODECS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown JSON codec '{name}'. Expected one of: auto, {', '.join(CODECS)}.") from None
+
+
+_codec_lock = threading.Lock()
+_codec: JSONCodec = None
+
+
+def get_codec() -> JSONCodec:
+    """Return the process-wide codec selected by TATUM_JSON_CODEC."""
+    global _codec
+    if _codec is None:
+        with _codec_lock:
+            if _codec is None:
+                _codec = make_codec(conf.TATUM_JSON_CODEC)
+    return _codec
+
+
+def set_codec(codec: JSONCodec):
+    """Replace the process-wide codec."""
+    global _codec
+    with _codec_lock:
+        _codec = codec
+
+
+def decode_with(response, codec: JSONCodec):
+    """Make `response.json()` decode the body with `codec`.
+
+    Keyword arguments passed to `json()` are only understood by the standard library, so
+    such calls keep using it.
+    """
+
+    def decode(**kwargs):
+        if kwargs:
+            return json.loads(response.content, **kwargs)
+        return codec.loads(response.content)
+
+    response.json = decode
+    return response
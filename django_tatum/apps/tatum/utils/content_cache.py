@@ -0,0 +1,190 @@
+"""On-disk, content-addressed cache for immutable objects such as IPFS files.
+
+Content fetched by CID never changes, so it can be kept on disk indefinitely and only
+evicted for space. `ContentCache` stores each object as one file:
+
+- Files are sharded in two directory levels taken from a hash of the key, so no directory
+  grows past a few thousand entries.
+- Writes go to a temporary file that is renamed into place, so readers, including other
+  processes, never see a partial object.
+- Reads refresh the file's mtime, and the least recently used objects are evicted once the
+  total size exceeds `max_bytes`. The recency index is rebuilt from the mtimes on start.
+- Large objects can be read as read-only memory maps instead of being copied in memory.
+"""
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable
+from typing import Optional
+from typing import Union
+
+from django_tatum.apps.tatum.tatum_client import conf
+
+
+class ContentCache:
+    """Size-bounded LRU cache of immutable blobs on disk.
+
+    Args:
+        root (Union[str, Path]): Directory holding the cache; created if needed.
+        max_bytes (int, optional): Total size kept before evicting. Defaults to
+            TATUM_IPFS_CACHE_MAX_BYTES.
+        mmap_threshold (int, optional): Size from which `read` returns a memory map.
+            Defaults to TATUM_IPFS_CACHE_MMAP_THRESHOLD.
+    """
+
+    def __init__(self, root: Union[str, Path], max_bytes: int = None, mmap_threshold: int = None):
+        self.root = Path(root)
+        self.max_bytes = conf.TATUM_IPFS_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.mmap_threshold = conf.TATUM_IPFS_CACHE_MMAP_THRESHOLD if mmap_threshold is None else mmap_threshold
+        self._tmp = self.root / "tmp"
+        self._tmp.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index: Optional[OrderedDict[Path, int]] = None
+        self._size = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def path(self, key: str) -> Path:
+        """Where the object of `key` is stored."""
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        entries = []
+        for path in self.root.glob("??/??/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        entries.sort(key=lambda entry: entry[0])
+        self._index = OrderedDict((path, size) for _, path, size in entries)
+        self._size = sum(self._index.values())
+
+    def get(self, key: str) -> Optional[Path]:
+        """The path of a cached object, marking it as recently used, or None on a miss."""
+        path = self.path(key)
+        with self._lock:
+            self._load_index()
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Evicted by another process since the index was built.
+                self._size -= self._index.pop(path, 0)
+                self.stats["misses"] += 1
+                return None
+            if path not in self._index:
+                size = path.stat().st_size
+                self._index[path] = size
+                self._size += size
+            self._index.move_to_end(path)
+            self.stats["hits"] += 1
+        return path
+
+    def __contains__(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def put(self, key: str, chunks: Union[bytes, Iterable[bytes]]) -> Path:
+        """Store an object from its content or an iterable of chunks, atomically.
+
+        Nothing is stored if iterating `chunks` fails.
+
+        Returns:
+            Path: Where the object is stored.
+        """
+        if isinstance(chunks, bytes):
+            chunks = (chunks,)
+        fd, partial = tempfile.mkstemp(dir=self._tmp)
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            path = self.path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(partial, path)
+        except BaseException:
+            os.unlink(partial)
+            raise
+        with self._lock:
+            self._load_index()
+            self._size += size - self._index.pop(path, 0)
+            self._index[path] = size
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._index) > 1:
+            path, size = self._index.popitem(last=False)
+            self._size -= size
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self.stats["evictions"] += 1
+
+    def read(self, key: str, use_mmap: bool = None) -> Union[bytes, mmap.mmap, None]:
+        """The content of a cached object, or None on a miss.
+
+        Args:
+            key (str): The object key.
+            use_mmap (bool, optional): Return a read-only memory map instead of bytes.
+                Defaults to doing so for objects of at least `mmap_threshold` bytes.
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if use_mmap is None:
+                    use_mmap = size >= self.mmap_threshold
+                if use_mmap and size:
+                    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str):
+        path = self.path(key)
+        with self._lock:
+            if self._index is not None:
+                self._size -= self._index.pop(path, 0)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @property
+    def size(self) -> int:
+        """Total bytes stored, as far as this process knows."""
+        with self._lock:
+            self._load_index()
+            return self._size
+
+
+_default_content_cache: Optional[ContentCache] = None
+_default_content_cache_lock = threading.Lock()
+
+
+def get_content_cache() -> Optional[ContentCache]:
+    """Return the process-wide IPFS cache in TATUM_IPFS_CACHE_DIR, or None when it is disabled."""
+    global _default_content_cache
+    if _default_content_cache is None and conf.TATUM_IPFS_CACHE_DIR:
+        with _default_content_cache_lock:
+            if _default_content_cache is None:
+                _default_content_cache = ContentCache(conf.TATUM_IPFS_CACHE_DIR)
+    return _default_content_cache
+
+
+def set_content_cache(cache: Optional[ContentCache]):
+    """Replace the process-wide IPFS cache."""
+    global _default_content_cache
+    with _default_content_cache_lock:
+        _default_content_cache = cache
@@ -0,0 +1,143 @@
+"""Opt-in persistence of Tatum responses.
+
+`NDJSONSink` hands records to a background thread that appends them to a newline
+delimited JSON file (optionally gzip-compressed), so callers never wait on disk I/O
+unless the bounded buffer is full. Callers that must never block, such as coroutines on
+an event loop, write with `block=False` and have records dropped when it is full.
+"""
+import gzip
+import json
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Any
+from typing import Iterable
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()
+
+
+class NDJSONSink:
+    """Stream records to an NDJSON file from a background writer thread.
+
+    Args:
+        path (Union[str, Path]): File the records are appended to.
+        compress (bool, optional): Write a gzip stream instead of plain text. Defaults to False.
+        max_buffer (int, optional): Maximum number of records waiting to be written; `write`
+            blocks once it is reached, or drops the record when called with `block=False`.
+            Defaults to 10000.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        compress: bool = False,
+        max_buffer: int = 10000,
+    ):
+        self.path = Path(path)
+        self.compress = compress
+        self._queue: queue.Queue = queue.Queue(maxsize=max_buffer)
+        self._error: Exception = None
+        self._closed = False
+        # Writers admitted before `close` and still queuing; close waits for them so its
+        # marker is never queued ahead of a record. The lock is never held while queuing.
+        self._writers = 0
+        self._idle = threading.Condition()
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name=f"ndjson-sink:{self.path.name}", daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        if self.compress:
+            return gzip.open(self.path, "at", encoding="utf-8")
+        return open(self.path, "a", encoding="utf-8")
+
+    def _run(self):
+        try:
+            with self._open() as f:
+                while True:
+                    record = self._queue.get()
+                    if record is _CLOSE:
+                        return
+                    f.write(json.dumps(record, separators=(",", ":"), default=str))
+                    f.write("\n")
+                    if self._queue.empty():
+                        f.flush()
+        except Exception as e:  # surfaced to the caller on the next write or on close
+            self._error = e
+            # Keep draining so producers blocked on a full buffer are released.
+            while self._queue.get() is not _CLOSE:
+                pass
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+        if self._closed:
+            raise ValueError("Cannot write to a closed sink.")
+
+    def write(self, record: Any, block: bool = True) -> bool:
+        """Queue a single record for writing.
+
+        Args:
+            record (Any): The record.
+            block (bool, optional): Wait for room in the buffer when it is full. When False,
+                the record is dropped instead and counted in `dropped`. Defaults to True.
+
+        Returns:
+            bool: Whether the record was queued.
+
+        Raises:
+            ValueError: If the sink is closed or closing.
+        """
+        with self._idle:
+            self._check()
+            self._writers += 1
+        try:
+            self._queue.put(record, block=block)
+        except queue.Full:
+            with self._idle:
+                self.dropped += 1
+            return False
+        finally:
+            with self._idle:
+                self._writers -= 1
+                if not self._writers:
+                    self._idle.notify_all()
+        return True
+
+    def write_many(self, records: Union[Iterable[Any], Any], block: bool = True) -> int:
+        """Queue every record of a listing response; a single object is written as one record.
+
+        Returns:
+            int: The number of records dropped because the buffer was full and `block` was False.
+        """
+        if not isinstance(records, (list, tuple)):
+            records = [records]
+        dropped = sum(not self.write(record, block) for record in records)
+        if dropped:
+            logger.warning("Export buffer of %s is full, dropped %s records", self.path, dropped)
+        return dropped
+
+    def close(self):
+        """Write out the buffered records and stop the writer thread.
+
+        Writes are refused from the moment it is called.
+        """
+        with self._idle:
+            if self._closed:
+                return
+            self._closed = True
+            self._idle.wait_for(lambda: not self._writers)
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
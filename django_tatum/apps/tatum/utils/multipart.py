@@ -0,0 +1,129 @@
+"""Streamed `multipart/form-data` request bodies.
+
+`MultipartFile` wraps a path or a binary file object as a one-field multipart body that
+`requests` sends chunk by chunk. Its length is known up front, so the request carries a
+Content-Length instead of being chunk-encoded, and iterating it again starts over from the
+beginning of the file, so a request rejected with a 429 can be resent. A non-seekable
+stream can only be read once, so `buffer` first spools it into a temporary file, kept in
+memory up to `SPOOL_MAX_MEMORY` bytes.
+"""
+import mimetypes
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import BinaryIO
+from typing import Iterator
+from typing import Union
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+Source = Union[str, bytes, os.PathLike, BinaryIO]
+
+
+class MultipartFile:
+    """A single file field encoded as a streamed multipart/form-data body.
+
+    Args:
+        source (Union[str, bytes, os.PathLike, BinaryIO]): A path, raw content, or a binary
+            file object. File objects must be seekable, or buffered, to be sent more than once.
+        field (str, optional): The form field name. Defaults to "file".
+        filename (str, optional): File name sent with the part. Defaults to the path's name.
+        content_type (str, optional): Type of the part. Guessed from the file name by default.
+        chunk_size (int, optional): Bytes read from the file at a time. Defaults to 1 MiB.
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        field: str = "file",
+        filename: str = None,
+        content_type: str = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self._path = None
+        self._content = None
+        self._file = None
+        self._spool = None
+        if isinstance(source, bytes):
+            self._content = source
+        elif isinstance(source, (str, os.PathLike)):
+            self._path = Path(source)
+        else:
+            self._file = source
+        if filename is None:
+            name = self._path.name if self._path is not None else getattr(source, "name", None)
+            filename = os.path.basename(name) if isinstance(name, str) else "file"
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.boundary = uuid.uuid4().hex
+        part_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        escaped = filename.replace("\\", "\\\\").replace('"', '\\"')
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{escaped}"\r\n'
+            f"Content-Type: {part_type}\r\n\r\n"
+        ).encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        seekable = self._file is not None and getattr(self._file, "seekable", lambda: False)()
+        self._start = self._file.tell() if seekable else None
+
+    @property
+    def content_type(self) -> str:
+        """The Content-Type header of the request."""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def sized(self) -> bool:
+        """Whether the length is known; a non-seekable file object must be buffered first."""
+        return self._file is None or self._start is not None
+
+    def buffer(self):
+        """Spool a non-seekable file object into a temporary file, so the body is sized and can be resent."""
+        if self.sized:
+            return
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        shutil.copyfileobj(self._file, self._spool, self.chunk_size)
+        self._file = self._spool
+        self._start = 0
+
+    def close(self):
+        """Release the temporary file of a buffered body."""
+        if self._spool is not None:
+            self._spool.close()
+
+    def _size(self) -> int:
+        if self._content is not None:
+            return len(self._content)
+        if self._path is not None:
+            return self._path.stat().st_size
+        if self._start is None:
+            raise TypeError("The size of a non-seekable file object is unknown.")
+        end = self._file.seek(0, os.SEEK_END)
+        self._file.seek(self._start)
+        return end - self._start
+
+    def __len__(self) -> int:
+        return len(self._head) + self._size() + len(self._tail)
+
+    def _chunks(self, f: BinaryIO) -> Iterator[bytes]:
+        while True:
+            chunk = f.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._head
+        if self._content is not None:
+            yield self._content
+        elif self._path is not None:
+            with open(self._path, "rb") as f:
+                yield from self._chunks(f)
+        else:
+            if self._start is not None:
+                self._file.seek(self._start)
+            yield from self._chunks(self._file)
+        yield self._tail
@@ -0,0 +1,179 @@
+"""Lazy pagination helpers for the Tatum list endpoints.
+
+The serial iterators hold only one page in memory at a time and the prefetching ones
+a bounded window of pages, so walking a ledger with hundreds of thousands of records
+keeps a flat memory profile.
+"""
+import asyncio
+import math
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+from typing import Iterator
+
+# Largest page size accepted by the Tatum ledger list endpoints.
+MAX_PAGE_SIZE: int = 50
+
+
+def iter_pages(
+    fetch_page: Callable[[int], list],
+    page_size: int = MAX_PAGE_SIZE,
+    start_page: int = 0,
+) -> Iterator[list]:
+    """Yield pages until Tatum returns a short (or empty) page.
+
+    Args:
+        fetch_page (Callable[[int], list]): Fetches the page with the given zero-based index.
+        page_size (int, optional): Number of records the endpoint is asked for per page.
+        start_page (int, optional): Index of the first page to fetch. Defaults to 0.
+    """
+    page_number = start_page
+    while True:
+        page = fetch_page(page_number)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        page_number += 1
+
+
+def iter_records(
+    fetch_page: Callable[[int], list],
+    page_size: int = MAX_PAGE_SIZE,
+    start_page: int = 0,
+) -> Iterator[Any]:
+    """Yield the records of every page one at a time."""
+    for page in iter_pages(fetch_page, page_size, start_page):
+        yield from page
+
+
+async def aiter_records(
+    fetch_page: Callable[[int], Awaitable[list]],
+    page_size: int = MAX_PAGE_SIZE,
+    start_page: int = 0,
+) -> AsyncIterator[Any]:
+    """Asynchronous counterpart of `iter_records`."""
+    page_number = start_page
+    while True:
+        page = await fetch_page(page_number)
+        for record in page:
+            yield record
+        if len(page) < page_size:
+            return
+        page_number += 1
+
+
+def prefetch_records(
+    fetch_page: Callable[[int], list],
+    total: int,
+    page_size: int = MAX_PAGE_SIZE,
+    max_workers: int = 8,
+    ordered: bool = True,
+) -> Iterator[Any]:
+    """Fetch the pages of a listing concurrently and yield their records.
+
+    The page offsets are planned up front from `total`. At most `max_workers` pages are
+    in flight and at most twice that many are buffered, so memory stays bounded. If the
+    last planned page comes back full (the listing grew during the scan) the remaining
+    pages are fetched serially.
+
+    Args:
+        fetch_page (Callable[[int], list]): Fetches the page with the given zero-based index.
+        total (int): Number of records the listing is expected to hold.
+        page_size (int, optional): Number of records the endpoint is asked for per page.
+        max_workers (int, optional): Maximum number of pages fetched concurrently. Defaults to 8.
+        ordered (bool, optional): Yield the records in listing order (True) or page by page as
+            the requests complete (False). Defaults to True.
+    """
+    page_count = math.ceil(total / page_size) if total > 0 else 0
+    window = max(max_workers, 1) * 2
+    planned = iter(range(page_count))
+    last_page_full = False
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        pending = deque()
+        try:
+            for page_number in planned:
+                pending.append((page_number, executor.submit(fetch_page, page_number)))
+                if len(pending) >= window:
+                    break
+            while pending:
+                if ordered:
+                    page_number, future = pending.popleft()
+                else:
+                    wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+                    index = next(i for i, (_, future) in enumerate(pending) if future.done())
+                    page_number, future = pending[index]
+                    del pending[index]
+                page = future.result()
+                if page_number == page_count - 1:
+                    last_page_full = len(page) >= page_size
+                next_page = next(planned, None)
+                if next_page is not None:
+                    pending.append((next_page, executor.submit(fetch_page, next_page)))
+                yield from page
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    if last_page_full:
+        yield from iter_records(fetch_page, page_size, start_page=page_count)
+
+
+async def aprefetch_records(
+    fetch_page: Callable[[int], Awaitable[list]],
+    total: int,
+    page_size: int = MAX_PAGE_SIZE,
+    max_workers: int = 8,
+    ordered: bool = True,
+) -> AsyncIterator[Any]:
+    """Asynchronous counterpart of `prefetch_records`."""
+    page_count = math.ceil(total / page_size) if total > 0 else 0
+    window = max(max_workers, 1) * 2
+    semaphore = asyncio.Semaphore(max(max_workers, 1))
+    planned = iter(range(page_count))
+    last_page_full = False
+
+    async def fetch(page_number):
+        async with semaphore:
+            return page_number, await fetch_page(page_number)
+
+    pending = deque()
+    try:
+        for page_number in planned:
+            pending.append(asyncio.ensure_future(fetch(page_number)))
+            if len(pending) >= window:
+                break
+        while pending:
+            if ordered:
+                task = pending.popleft()
+            else:
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                task = next(task for task in pending if task.done())
+                pending.remove(task)
+            page_number, page = await task
+            if page_number == page_count - 1:
+                last_page_full = len(page) >= page_size
+            next_page = next(planned, None)
+            if next_page is not None:
+                pending.append(asyncio.ensure_future(fetch(next_page)))
+            for record in page:
+                yield record
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if last_page_full:
+        async for record in aiter_records(fetch_page, page_size, start_page=page_count):
+            yield record
+
+
+def check_page_size(page_size: int) -> int:
+    if not 0 < page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}.")
+    return page_size
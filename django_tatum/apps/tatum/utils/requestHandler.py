@@ -1,47 +1,97 @@
 import requests
 
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.utils.codec import JSONCodec
+from django_tatum.apps.tatum.utils.codec import decode_with
+from django_tatum.apps.tatum.utils.codec import get_codec
+from django_tatum.apps.tatum.utils.scheduler import RequestScheduler
+from django_tatum.apps.tatum.utils.scheduler import get_scheduler
+from django_tatum.apps.tatum.utils.session import get_session
+from django_tatum.apps.tatum.utils.singleflight import endpoint_pattern
+from django_tatum.apps.tatum.utils.singleflight import get_single_flight
+from django_tatum.apps.tatum.utils.singleflight import memoize_json
+from django_tatum.apps.tatum.utils.singleflight import request_key
+
 
 class RequestHandler:
-    def __init__(self, url, headers):
+    def __init__(
+        self,
+        url,
+        headers,
+        session: requests.Session = None,
+        scheduler: RequestScheduler = None,
+        coalesce: bool = True,
+        codec: JSONCodec = None,
+    ):
         self.url = url
         self.headers = headers
+        self._session = session
+        self._scheduler = scheduler
+        self.coalesce = coalesce
+        self._codec = codec
 
-    def get(self, *args, **kwargs):
-        return requests.get(
-            self.url,
-            headers=self.headers,
-            *args,
-            **kwargs,
+    @property
+    def session(self) -> requests.Session:
+        """The session used to send requests; the shared pooled session unless one was given."""
+        return self._session or get_session()
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """The scheduler pacing and retrying requests; the shared one unless one was given."""
+        return self._scheduler or get_scheduler()
+
+    @property
+    def codec(self) -> JSONCodec:
+        """The codec encoding request bodies and decoding responses; the shared one unless one was given."""
+        return self._codec or get_codec()
+
+    def _send(self, method, *args, json=None, **kwargs):
+        kwargs.setdefault("timeout", conf.TATUM_HTTP_TIMEOUT)
+        session = self.session
+        codec = self.codec
+        headers = self.headers
+        if json is not None:
+            kwargs["data"] = codec.dumps(json)
+            headers = {"Content-Type": "application/json", **headers}
+        response = self.scheduler.send(
+            method,
+            lambda: session.request(method, self.url, *args, headers=headers, **kwargs),
+            retry_exceptions=(requests.ConnectionError, requests.Timeout),
+        )
+        return decode_with(response, codec)
+
+    def _request(self, method, *args, **kwargs):
+        pattern = endpoint_pattern(self.url) if self.coalesce and method == "GET" and not args else None
+        if pattern is None:
+            return self._send(method, *args, **kwargs)
+        # Identical GETs already in flight are joined instead of being sent again.
+        return get_single_flight().do(
+            request_key(method, self.url, kwargs.get("params"), self.headers),
+            lambda: memoize_json(self._send(method, **kwargs)),
+            label=pattern,
         )
 
+    def send(self, method, *args, **kwargs):
+        """Send a request as is: a `data` body goes out untouched and nothing is coalesced.
+
+        Meant for streamed uploads and downloads (`data=<iterable>`, `stream=True`).
+        """
+        return self._send(method, *args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        return self._request("GET", *args, **kwargs)
+
     def post(self, data=None, *args, **kwargs):
-        return requests.post(self.url, headers=self.headers, json=data, *args, **kwargs)
+        return self._request("POST", *args, json=data, **kwargs)
 
     def put(self, data=None, *args, **kwargs):
-        return requests.put(
-            self.url,
-            headers=self.headers,
-            json=data,
-            *args,
-            **kwargs,
-        )
+        return self._request("PUT", *args, json=data, **kwargs)
 
     def delete(self, *args, **kwargs):
-        return requests.delete(
-            self.url,
-            headers=self.headers,
-            *args,
-            **kwargs,
-        )
+        return self._request("DELETE", *args, **kwargs)
 
     def patch(self, data, *args, **kwargs):
-        return requests.patch(
-            self.url,
-            headers=self.headers,
-            json=data,
-            *args,
-            **kwargs,
-        )
+        return self._request("PATCH", *args, json=data, **kwargs)
 
     # TODO: Set up the following private handlers:
     # 1. _200_response_handler: to handle 200 response status codes
@@ -0,0 +1,243 @@
+"""Rate-limit aware scheduling of the requests sent to Tatum.
+
+Every request is paced through a process-wide token bucket, so the throughput stays
+pinned at the allowed rate instead of bouncing off 429 responses. 429 responses are
+retried after their `Retry-After` delay, during which the whole bucket is paused.
+5xx responses and connection errors are retried with exponential backoff and full
+jitter, but only for idempotent verbs.
+"""
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+from django_tatum.apps.tatum.tatum_client import conf
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Callers reserve a token and are told how long to wait for it, so waiting callers
+    are released one by one at exactly the configured rate.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, cost: float = 1) -> float:
+        """Reserve `cost` tokens and return the number of seconds to wait before using them."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= cost
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float):
+        """Hold back every caller for `seconds`, e.g. after a 429 response."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = now
+
+
+def parse_retry_after(value: str) -> float:
+    """Parse a `Retry-After` header given either in seconds or as an HTTP date.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RequestScheduler:
+    """Paces, retries and measures the requests sent to Tatum."""
+
+    def __init__(
+        self,
+        rate: float = None,
+        burst: int = None,
+        max_retries: int = None,
+        backoff_base: float = None,
+        backoff_max: float = None,
+    ):
+        self.bucket = TokenBucket(
+            conf.TATUM_RATE_LIMIT if rate is None else rate,
+            conf.TATUM_RATE_BURST if burst is None else burst,
+        )
+        self.max_retries = conf.TATUM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = conf.TATUM_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = conf.TATUM_BACKOFF_MAX if backoff_max is None else backoff_max
+        self._lock = threading.Lock()
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._throttled_seconds = 0.0
+        self._requests = 0
+        self._retries = 0
+        self._rate_limited = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _enter_queue(self):
+        with self._lock:
+            self._queue_depth += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+
+    def _leave_queue(self, waited: float):
+        with self._lock:
+            self._queue_depth -= 1
+            self._throttled_seconds += waited
+            self._requests += 1
+
+    def _retry_delay(self, method: str, attempt: int, response=None, error: Exception = None) -> float:
+        """Seconds to wait before retrying, or None when the outcome must be returned as is."""
+        if attempt >= self.max_retries:
+            return None
+        if error is not None:
+            return self.backoff(attempt) if method in IDEMPOTENT_METHODS else None
+        if response.status_code == 429:
+            # Tatum rejects throttled requests before processing them, so any verb is safe to resend.
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            delay = self.backoff(attempt) if delay is None else delay
+            with self._lock:
+                self._rate_limited += 1
+            self.bucket.pause(delay)
+            return 0.0
+        if response.status_code in RETRY_STATUS_CODES and method in IDEMPOTENT_METHODS:
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            return self.backoff(attempt) if delay is None else delay
+        return None
+
+    def _count_retry(self):
+        with self._lock:
+            self._retries += 1
+
+    def send(self, method: str, send: Callable, retry_exceptions: tuple = ()):
+        """Send a request through the token bucket, retrying it when appropriate.
+
+        Args:
+            method (str): The HTTP verb, used to decide whether retrying is safe.
+            send (Callable): Performs the request and returns the response.
+            retry_exceptions (tuple, optional): Transport errors that may be retried.
+
+        Returns:
+            The last response received.
+        """
+        method = method.upper()
+        attempt = 0
+        while True:
+            self._enter_queue()
+            wait = self.bucket.reserve()
+            try:
+                if wait:
+                    time.sleep(wait)
+            finally:
+                self._leave_queue(wait)
+            try:
+                response = send()
+            except retry_exceptions as error:
+                delay = self._retry_delay(method, attempt, error=error)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(method, attempt, response=response)
+                if delay is None:
+                    return response
+            self._count_retry()
+            time.sleep(delay)
+            attempt += 1
+
+    async def send_async(self, method: str, send: Callable, retry_exceptions: tuple = ()):
+        """Coroutine counterpart of `send`; `send` must return an awaitable."""
+        method = method.upper()
+        attempt = 0
+        while True:
+            self._enter_queue()
+            wait = self.bucket.reserve()
+            try:
+                if wait:
+                    await asyncio.sleep(wait)
+            finally:
+                self._leave_queue(wait)
+            try:
+                response = await send()
+            except retry_exceptions as error:
+                delay = self._retry_delay(method, attempt, error=error)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(method, attempt, response=response)
+                if delay is None:
+                    return response
+            self._count_retry()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict[str, float]:
+        """Scheduler metrics.
+
+        Returns:
+            dict[str, float]: Current and maximum number of requests waiting for a token,
+                total seconds spent throttled, and the number of requests, retries and
+                429 responses seen so far.
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._queue_depth,
+                "max_queue_depth": self._max_queue_depth,
+                "throttled_seconds": self._throttled_seconds,
+                "requests": self._requests,
+                "retries": self._retries,
+                "rate_limited": self._rate_limited,
+            }
+
+
+_scheduler_lock = threading.Lock()
+_scheduler: RequestScheduler = None
+
+
+def get_scheduler() -> RequestScheduler:
+    """Return the process-wide scheduler shared by every request handler."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler()
+    return _scheduler
+
+
+def set_scheduler(scheduler: RequestScheduler):
+    """Replace the process-wide scheduler, e.g. to apply a different plan's rate limit."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
@@ -0,0 +1,171 @@
+"""Process-wide pooled HTTP session shared by every Tatum client.
+
+A single `requests.Session` is created lazily per process and reused by all the
+`RequestHandler` instances, so TCP + TLS handshakes are only paid once per pooled
+connection instead of once per call.
+"""
+import os
+import socket
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.connectionpool import HTTPSConnectionPool
+
+from django_tatum.apps.tatum.tatum_client import conf
+
+
+class PoolStats:
+    """Thread-safe counters for a single host connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: int = 0
+        self.new_connections: int = 0
+        self.waits: int = 0
+
+    def record_request(self, waited: bool):
+        with self._lock:
+            self.requests += 1
+            if waited:
+                self.waits += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": max(self.requests - self.new_connections, 0),
+                "new_connections": self.new_connections,
+                "waits": self.waits,
+            }
+
+
+_stats_lock = threading.Lock()
+_stats: dict[str, PoolStats] = {}
+
+
+def _stats_for(scheme: str, host: str, port) -> PoolStats:
+    key = f"{scheme}://{host}:{port}" if port else f"{scheme}://{host}"
+    with _stats_lock:
+        if key not in _stats:
+            _stats[key] = PoolStats()
+        return _stats[key]
+
+
+class _TrackedPoolMixin:
+    """Counts connection reuse, new connections and pool waits."""
+
+    def _get_conn(self, timeout=None):
+        pool = self.pool
+        waited = bool(self.block and pool is not None and pool.empty())
+        self.stats.record_request(waited)
+        return super()._get_conn(timeout=timeout)
+
+    def _new_conn(self):
+        self.stats.record_new_connection()
+        return super()._new_conn()
+
+
+class TrackedHTTPConnectionPool(_TrackedPoolMixin, HTTPConnectionPool):
+    def __init__(self, host, port=None, *args, **kwargs):
+        super().__init__(host, port, *args, **kwargs)
+        self.stats = _stats_for(self.scheme, host, port)
+
+
+class TrackedHTTPSConnectionPool(_TrackedPoolMixin, HTTPSConnectionPool):
+    def __init__(self, host, port=None, *args, **kwargs):
+        super().__init__(host, port, *args, **kwargs)
+        self.stats = _stats_for(self.scheme, host, port)
+
+
+class KeepAliveHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keep-alive enabled and per-host pool statistics."""
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault(
+            "socket_options",
+            HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)],
+        )
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TrackedHTTPConnectionPool,
+            "https": TrackedHTTPSConnectionPool,
+        }
+
+
+def build_session(
+    pool_connections: int = None,
+    pool_maxsize: int = None,
+    pool_block: bool = None,
+) -> requests.Session:
+    """Build a new keep-alive session with a mounted pooled adapter.
+
+    Args:
+        pool_connections (int, optional): Number of host pools to keep. Defaults to TATUM_HTTP_POOL_CONNECTIONS.
+        pool_maxsize (int, optional): Kept-alive connections per host. Defaults to TATUM_HTTP_POOL_MAXSIZE.
+        pool_block (bool, optional): Wait for a free connection when the pool is exhausted.
+            Defaults to TATUM_HTTP_POOL_BLOCK.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    adapter = KeepAliveHTTPAdapter(
+        pool_connections=pool_connections or conf.TATUM_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or conf.TATUM_HTTP_POOL_MAXSIZE,
+        pool_block=conf.TATUM_HTTP_POOL_BLOCK if pool_block is None else pool_block,
+    )
+    session = requests.Session()
+    session.headers["Connection"] = "keep-alive"
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session_lock = threading.Lock()
+_session: requests.Session = None
+_session_pid: int = None
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide shared session, creating it on first use.
+
+    A new session is built after a fork so that child processes never share
+    sockets with their parent.
+    """
+    global _session, _session_pid
+    session = _session
+    if session is not None and _session_pid == os.getpid():
+        return session
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = build_session()
+            _session_pid = os.getpid()
+        return _session
+
+
+def reset_session():
+    """Close the shared session; the next `get_session` call builds a fresh one."""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+        _session_pid = None
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """Connection pool statistics keyed by `scheme://host:port`.
+
+    Returns:
+        dict[str, dict[str, int]]: For every host, the number of requests, how many reused
+            a kept-alive connection (hits), how many opened a new connection and how many
+            had to wait for a free connection.
+    """
+    with _stats_lock:
+        return {key: stats.as_dict() for key, stats in _stats.items()}
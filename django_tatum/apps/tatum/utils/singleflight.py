@@ -0,0 +1,191 @@
+"""Coalescing of identical concurrent GET requests.
+
+When several threads (or coroutines on one event loop) issue the same GET while an
+identical one is already in flight, they wait for that request instead of sending
+their own, and all of them receive the same response object. The parsed JSON body of
+a shared response is decoded once; each `json()` call returns its own copy of it, so a
+caller editing its result does not change what the others see.
+
+Which endpoints are coalesced is controlled by TATUM_COALESCE_ENDPOINTS, a list of
+glob patterns matched against the request path relative to the Tatum base URL, one path
+segment at a time: `ledger/account/*` matches an account but not its balance.
+"""
+import asyncio
+import copy
+import threading
+import weakref
+from fnmatch import fnmatchcase
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+from typing import Mapping
+from typing import Sequence
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client import creds
+
+_UNSET = object()
+
+
+def request_key(method: str, url: str, params: Mapping = None, headers: Mapping = None) -> Hashable:
+    """Identity of a request; requests with equal keys are interchangeable."""
+    if isinstance(params, Mapping):
+        params = tuple(sorted((str(k), str(v)) for k, v in params.items() if v is not None))
+    return (method.upper(), url, params or None, tuple(sorted((headers or {}).items())))
+
+
+def _matches(segments: list[str], pattern: str) -> bool:
+    parts = pattern.strip("/").split("/")
+    return len(parts) == len(segments) and all(map(fnmatchcase, segments, parts))
+
+
+def endpoint_pattern(url: str, patterns: Sequence[str] = None) -> str:
+    """Return the first pattern of TATUM_COALESCE_ENDPOINTS matching `url`, or None."""
+    patterns = conf.TATUM_COALESCE_ENDPOINTS if patterns is None else patterns
+    path = url[len(creds.TATUM_BASE_URL) :] if url.startswith(creds.TATUM_BASE_URL) else url
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    return next((pattern for pattern in patterns if _matches(segments, pattern)), None)
+
+
+def memoize_json(response):
+    """Make `response.json()` decode the body once and return a copy of it on every call."""
+    if getattr(response, "_tatum_json_memoized", False):
+        return response
+    decode = response.json
+    lock = threading.Lock()
+    parsed = [_UNSET]
+
+    def json(**kwargs):
+        if kwargs:
+            return decode(**kwargs)
+        if parsed[0] is _UNSET:
+            with lock:
+                if parsed[0] is _UNSET:
+                    parsed[0] = decode()
+        return copy.deepcopy(parsed[0])
+
+    response.json = json
+    response._tatum_json_memoized = True
+    return response
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome with concurrent callers.
+
+    Synchronous callers are coalesced across threads; asynchronous callers are coalesced
+    per event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _count(self, label: str, coalesced: bool):
+        counters = self._stats.setdefault(label, {"requests": 0, "coalesced": 0})
+        counters["coalesced" if coalesced else "requests"] += 1
+
+    def do(self, key: Hashable, fn: Callable[[], Any], label: str = "*") -> Any:
+        """Call `fn`, or wait for the identical call already in flight and return its result.
+
+        Args:
+            key (Hashable): Identity of the call, see `request_key`.
+            fn (Callable[[], Any]): Performs the call.
+            label (str, optional): Name the call is counted under in `stats`.
+
+        Raises:
+            Exception: Whatever `fn` raised, re-raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._count(label, coalesced=not leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]], label: str = "*") -> Any:
+        """Coroutine counterpart of `do`.
+
+        The call runs in its own task, so a cancelled caller does not cancel the request
+        for the callers still waiting on it.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            leader = task is None
+            if leader:
+                task = tasks[key] = loop.create_task(fn())
+                task.add_done_callback(lambda _: tasks.pop(key, None))
+            self._count(label, coalesced=not leader)
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + sum(len(tasks) for tasks in self._tasks.values())
+
+    def stats(self) -> dict[str, Any]:
+        """Coalescing metrics.
+
+        Returns:
+            dict[str, Any]: The number of requests actually sent and of calls served by
+                another caller's request, in total and per endpoint pattern, and the number
+                of requests currently in flight.
+        """
+        with self._lock:
+            by_endpoint = {label: dict(counters) for label, counters in self._stats.items()}
+        return {
+            "requests": sum(counters["requests"] for counters in by_endpoint.values()),
+            "coalesced": sum(counters["coalesced"] for counters in by_endpoint.values()),
+            "in_flight": self.in_flight(),
+            "by_endpoint": by_endpoint,
+        }
+
+
+_single_flight_lock = threading.Lock()
+_single_flight: SingleFlight = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide coalescer shared by every request handler."""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
+
+
+def set_single_flight(single_flight: SingleFlight):
+    """Replace the process-wide coalescer."""
+    global _single_flight
+    with _single_flight_lock:
+        _single_flight = single_flight
@@ -1,3 +1,38 @@
-from django.shortcuts import render
+"""Tatum webhook endpoint."""
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
-# Create your views here.
+from django_tatum.apps.tatum.utils.codec import get_codec
+
+from .webhooks import SIGNATURE_HEADER
+from .webhooks import event_key
+from .webhooks import get_webhook_queue
+from .webhooks import verify_signature
+from .webhooks import webhook_log
+
+
+@csrf_exempt
+@require_POST
+def tatum_webhook(request: HttpRequest) -> HttpResponse:
+    """Receive a Tatum notification and queue it for background processing.
+
+    Answers 401 for a missing or invalid signature, 400 for a body that is not a JSON
+    object and 503 when the queue is full, so Tatum delivers the event again later.
+    """
+    body = request.body
+    if not verify_signature(body, request.headers.get(SIGNATURE_HEADER)):
+        return HttpResponse(status=401)
+    try:
+        event = get_codec().loads(body)
+    except ValueError:
+        return HttpResponse(status=400)
+    if not isinstance(event, dict):
+        return HttpResponse(status=400)
+    log = webhook_log()
+    if log is not None:
+        log.append(event)
+    if not get_webhook_queue().submit(event, event_key(body)):
+        return HttpResponse(status=503)
+    return HttpResponse(status=200)
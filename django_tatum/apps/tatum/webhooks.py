@@ -0,0 +1,253 @@
+"""Receiver side of Tatum notification webhooks.
+
+Tatum signs every callback with HMAC-SHA512 over the raw body, base64 encoded in the
+`x-payload-hash` header. The view verifies that signature and hands the event to a
+`WebhookQueue`, which only appends it to an in-memory queue so Tatum gets its 200 straight
+away. A background worker drains the queue in batches: it drops the cached details and
+balances of every account the events mention, refreshes the balances of the mirrored
+accounts with one call per account, and sends `webhook_received` for each event.
+
+Tatum retries a notification until it is acknowledged, so events already processed are
+recognised by the hash of their body and skipped. An event only counts as processed once
+its batch went through, so a batch that failed can be delivered and applied again.
+"""
+import base64
+import hashlib
+import hmac
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+from typing import Optional
+from typing import Union
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.dispatch import Signal
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.utils.cache import cache_key
+from django_tatum.apps.tatum.utils.cache import get_default_cache
+from django_tatum.apps.tatum.utils.codec import get_codec
+
+from .sync import LedgerSync
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "x-payload-hash"
+
+# Sent by the worker for every processed event, with `event` (the decoded payload).
+webhook_received = Signal()
+
+
+def webhook_secret() -> str:
+    """The HMAC secret of the Tatum webhooks, from settings or the environment."""
+    return getattr(settings, "TATUM_WEBHOOK_SECRET", None) or conf.TATUM_WEBHOOK_SECRET
+
+
+def sign_payload(body: bytes, secret: str = None) -> str:
+    """Return the `x-payload-hash` value Tatum sends with `body`."""
+    digest = hmac.new((secret or webhook_secret()).encode(), body, hashlib.sha512).digest()
+    return base64.b64encode(digest).decode()
+
+
+def verify_signature(body: bytes, signature: str, secret: str = None) -> bool:
+    """Check the `x-payload-hash` header of a webhook in constant time."""
+    if not signature or not (secret or webhook_secret()):
+        return False
+    return hmac.compare_digest(sign_payload(body, secret), signature.strip())
+
+
+def event_key(body: bytes) -> str:
+    """Identify a notification by its raw body, which Tatum resends unchanged, so its retries can be recognised."""
+    return hashlib.sha256(body).hexdigest()
+
+
+def event_account_ids(event: dict) -> set[str]:
+    """Tatum IDs of the ledger accounts an event touches."""
+    return {id for id in (event.get("accountId"), event.get("counterAccountId")) if id}
+
+
+class WebhookQueue:
+    """Bounded in-memory queue of webhook events with a background worker.
+
+    Args:
+        maxsize (int, optional): Events held before new ones are refused. Defaults to
+            TATUM_WEBHOOK_QUEUE_SIZE.
+        batch_size (int, optional): Events processed together, sharing one balance refresh
+            per account. Defaults to 100.
+        dedupe_size (int, optional): Keys of processed events remembered to skip retries.
+            Defaults to 10000.
+        refresh_balances (bool, optional): Refresh the mirrored balances of the touched
+            accounts. Defaults to True.
+    """
+
+    def __init__(self, maxsize: int = None, batch_size: int = 100, dedupe_size: int = 10000, refresh_balances: bool = True):
+        self._queue = queue.Queue(maxsize=maxsize or conf.TATUM_WEBHOOK_QUEUE_SIZE)
+        self.batch_size = batch_size
+        self.dedupe_size = dedupe_size
+        self.refresh_balances = refresh_balances
+        self._seen: OrderedDict[str, None] = OrderedDict()
+        self._processing: set[str] = set()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread = None
+        # Counted from request threads and the worker, under `_lock`.
+        self.stats = {"received": 0, "duplicates": 0, "dropped": 0, "processed": 0, "failed": 0}
+
+    def _count(self, stat: str, count: int = 1):
+        with self._lock:
+            self.stats[stat] += count
+
+    def submit(self, event: dict, key: str = None) -> bool:
+        """Queue an event without blocking. Returns False when the queue is full.
+
+        Args:
+            event (dict): The decoded notification.
+            key (str, optional): `event_key` of the body it was received with. Defaults to
+                the key of the event encoded again.
+        """
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((key or event_key(get_codec().dumps(event)), event))
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("received")
+        return True
+
+    def join(self):
+        """Block until every queued event was processed."""
+        self._queue.join()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="tatum-webhooks", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.process([event for _, event in batch], [key for key, _ in batch])
+            except Exception:
+                self._count("failed", len(batch))
+                logger.exception("Failed to process %s Tatum webhook events", len(batch))
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _claim(self, key: str) -> bool:
+        """Take an event for processing, unless it was processed already or is being processed."""
+        with self._lock:
+            if key in self._seen or key in self._processing:
+                return False
+            self._processing.add(key)
+        return True
+
+    def _done(self, keys: list[str], processed: bool):
+        with self._lock:
+            self._processing.difference_update(keys)
+            if processed:
+                self._seen.update(dict.fromkeys(keys))
+                while len(self._seen) > self.dedupe_size:
+                    self._seen.popitem(last=False)
+
+    def process(self, events: Iterable[dict], keys: Iterable[str] = None):
+        """Apply a batch of events: invalidate caches, refresh balances and notify receivers.
+
+        Args:
+            events (Iterable[dict]): The decoded notifications.
+            keys (Iterable[str], optional): Their `event_key`s, in the same order. Defaults
+                to the keys of the events encoded again.
+        """
+        events = list(events)
+        if keys is None:
+            codec = get_codec()
+            keys = [event_key(codec.dumps(event)) for event in events]
+        fresh, claimed = [], []
+        for key, event in zip(keys, events):
+            if self._claim(key):
+                fresh.append(event)
+                claimed.append(key)
+            else:
+                self._count("duplicates")
+        processed = False
+        try:
+            account_ids = set().union(*(event_account_ids(event) for event in fresh))
+            if account_ids:
+                cache_keys = [cache_key(kind, id) for id in account_ids for kind in ("account", "balance")]
+                get_default_cache().delete(*cache_keys)
+                if self.refresh_balances:
+                    LedgerSync().refresh_balances(account_ids)
+            for event in fresh:
+                webhook_received.send(sender=self.__class__, event=event)
+            processed = True
+        finally:
+            self._done(claimed, processed)
+        self._count("processed", len(fresh))
+
+
+class WebhookLog:
+    """Append-only JSON lines log of the received webhook bodies, for replays.
+
+    Args:
+        path (Union[str, Path]): The log file; created on the first event.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, event: dict):
+        line = get_codec().dumps(event) + b"\n"
+        with self._lock, open(self.path, "ab") as f:
+            f.write(line)
+
+    def __iter__(self):
+        codec = get_codec()
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield codec.loads(line)
+
+
+_default_queue: WebhookQueue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_webhook_queue() -> WebhookQueue:
+    """Return the process-wide webhook queue."""
+    global _default_queue
+    if _default_queue is None:
+        with _default_queue_lock:
+            if _default_queue is None:
+                _default_queue = WebhookQueue()
+    return _default_queue
+
+
+def set_webhook_queue(webhook_queue: WebhookQueue):
+    """Replace the process-wide webhook queue."""
+    global _default_queue
+    with _default_queue_lock:
+        _default_queue = webhook_queue
+
+
+@lru_cache(maxsize=None)
+def _webhook_log(path: str) -> WebhookLog:
+    return WebhookLog(path)
+
+
+def webhook_log() -> Optional[WebhookLog]:
+    """The WebhookLog selected by TATUM_WEBHOOK_LOG, or None when logging is off."""
+    return _webhook_log(conf.TATUM_WEBHOOK_LOG) if conf.TATUM_WEBHOOK_LOG else None
@@ -0,0 +1,326 @@
+"""Durable withdrawal queue drained by a pool of workers.
+
+Payouts are stored as `Withdrawal` rows first and sent to Tatum by background workers, so
+a burst of payouts queues up instead of overrunning Tatum, and none is lost or sent twice:
+
+- `enqueue_withdrawal` is idempotent: the row is keyed by the sender and `paymentId`.
+- Workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED. The lease of a claimed row
+  is renewed while it is being sent, so a row is only claimed again once its worker died
+  and stopped renewing it.
+- Pending withdrawals of a UTXO currency from the same account are merged into one
+  multi-recipient withdrawal, up to TATUM_WITHDRAWAL_BATCH_SIZE recipients.
+- Before a withdrawal is sent again, the ledger is searched for the `paymentId` it was
+  last sent under, so a send that reached Tatum but whose response was lost is recorded
+  instead of repeated.
+- Withdrawals queued without a `fee` are priced from the shared fee estimates when they
+  are sent, so the workers share one quote per chain instead of asking for one each.
+- Every request goes through the shared request scheduler, so the workers together stay
+  within TATUM_RATE_LIMIT however many there are.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timedelta
+from decimal import Decimal
+from typing import Callable
+
+from django.db import close_old_connections
+from django.db import connection
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Q
+from django.utils.timezone import now
+
+from django_tatum.apps.tatum.tatum_client import conf
+from django_tatum.apps.tatum.tatum_client.exceptions import TatumAPIException
+from django_tatum.apps.tatum.tatum_client.smart_contracts.fees import FeeEstimator
+from django_tatum.apps.tatum.tatum_client.types.transaction_types import WithdrawalDict
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.transaction.transaction import TatumTransactions
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.withdrawal import BATCHABLE_CURRENCIES
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.withdrawal import FEE_QUOTED_CURRENCIES
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.withdrawal import TatumWithdrawals
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.withdrawal import batch_payment_id
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.withdrawal import batch_withdrawals
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.withdrawal import idempotency_key
+from django_tatum.apps.tatum.tatum_client.virtual_accounts.withdrawal import withdrawal_fee
+
+from .models import Withdrawal
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_withdrawal(data: WithdrawalDict, currency: str) -> tuple[Withdrawal, bool]:
+    """Queue a withdrawal, once per sender and `paymentId`.
+
+    Args:
+        data (WithdrawalDict): The withdrawal; `senderAccountId`, `address`, `amount` and
+            `paymentId` are required.
+        currency (str): Currency of the sender account, e.g. "BTC".
+
+    Returns:
+        tuple[Withdrawal, bool]: The queued withdrawal, and whether it was queued by this call.
+
+    Raises:
+        MissingparameterException: If the withdrawal has no `paymentId`.
+        ValueError: If the `paymentId` was already queued for another address or amount.
+    """
+    key = idempotency_key(data)
+    amount = Decimal(str(data["amount"]))
+    # Decimal amounts and fees are kept as strings, as Tatum takes them and JSON can hold them.
+    payload = {field: str(value) if isinstance(value, Decimal) else value for field, value in data.items()}
+    withdrawal, created = Withdrawal.objects.get_or_create(
+        idempotency_key=key,
+        defaults={
+            "payment_id": data["paymentId"],
+            "sender_account_id": data["senderAccountId"],
+            "currency": currency,
+            "address": data["address"],
+            "amount": amount,
+            "payload": payload,
+        },
+    )
+    if not created and (withdrawal.address != data["address"] or withdrawal.amount != amount):
+        raise ValueError(f"Payment {data['paymentId']} was already queued for another withdrawal.")
+    return withdrawal, created
+
+
+class WithdrawalQueue:
+    """Claim and send queued withdrawals.
+
+    Args:
+        withdrawals (TatumWithdrawals, optional): Client storing the withdrawals.
+        transactions (TatumTransactions, optional): Client searching the ledger on retries.
+        send (Callable[[WithdrawalDict], dict], optional): Sends one withdrawal payload.
+            Defaults to `withdrawals.store_withdrawal`; pass e.g. a chain transfer call
+            that also signs and broadcasts.
+        batch_size (int, optional): Most recipients merged into one UTXO withdrawal; 1
+            disables batching. Defaults to TATUM_WITHDRAWAL_BATCH_SIZE.
+        max_attempts (int, optional): Sends before a withdrawal is marked failed. Defaults
+            to TATUM_WITHDRAWAL_MAX_ATTEMPTS.
+        lease (float, optional): Seconds after which a claimed withdrawal that was not
+            settled, and whose lease was not renewed, is claimed again. The lease is renewed
+            every third of it while the withdrawal is sent. Defaults to TATUM_WITHDRAWAL_LEASE.
+        fees (FeeEstimator, optional): Prices the withdrawals queued without a `fee`.
+            Defaults to the process-wide estimator.
+        fee_tier (str, optional): Fee tier of those withdrawals. Defaults to
+            TATUM_WITHDRAWAL_FEE_TIER.
+    """
+
+    def __init__(
+        self,
+        withdrawals: TatumWithdrawals = None,
+        transactions: TatumTransactions = None,
+        send: Callable[[WithdrawalDict], dict] = None,
+        batch_size: int = None,
+        max_attempts: int = None,
+        lease: float = None,
+        fees: FeeEstimator = None,
+        fee_tier: str = None,
+    ):
+        self.withdrawals = withdrawals or TatumWithdrawals()
+        self.transactions = transactions or TatumTransactions()
+        self.send = send or self.withdrawals.store_withdrawal
+        self.batch_size = max(conf.TATUM_WITHDRAWAL_BATCH_SIZE if batch_size is None else batch_size, 1)
+        self.max_attempts = conf.TATUM_WITHDRAWAL_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.lease = conf.TATUM_WITHDRAWAL_LEASE if lease is None else lease
+        self.fees = fees
+        self.fee_tier = fee_tier or conf.TATUM_WITHDRAWAL_FEE_TIER
+
+    def _claimable(self) -> Q:
+        expired = now() - timedelta(seconds=self.lease)
+        return Q(status=Withdrawal.Status.PENDING) | Q(status=Withdrawal.Status.SENDING, claimed_at__lt=expired)
+
+    def claim(self) -> list[Withdrawal]:
+        """Claim the oldest claimable withdrawal, with the ones it can be batched with.
+
+        Withdrawals already attempted are claimed alone, so they are only ever retried
+        under their own `paymentId` once their previous send was checked.
+        """
+        with transaction.atomic():
+            claimable = Withdrawal.objects.select_for_update(skip_locked=True).filter(self._claimable())
+            head = claimable.order_by("id").first()
+            if head is None:
+                return []
+            group = [head]
+            if head.attempts == 0 and head.currency in BATCHABLE_CURRENCIES and self.batch_size > 1:
+                group += claimable.filter(
+                    status=Withdrawal.Status.PENDING,
+                    attempts=0,
+                    currency=head.currency,
+                    sender_account_id=head.sender_account_id,
+                ).exclude(pk=head.pk).order_by("id")[: self.batch_size - 1]
+            claimed_at = now()
+            Withdrawal.objects.filter(pk__in=[row.pk for row in group]).update(
+                status=Withdrawal.Status.SENDING, claimed_at=claimed_at, attempts=F("attempts") + 1
+            )
+        for row in group:
+            row.status, row.claimed_at, row.attempts = Withdrawal.Status.SENDING, claimed_at, row.attempts + 1
+        return group
+
+    def _already_sent(self, payment_id: str) -> dict:
+        """The ledger transaction of a withdrawal sent under `payment_id`, if any."""
+        query = {"paymentId": payment_id, "opType": "WITHDRAWAL"}
+        return next(iter(self.transactions.iter_transactions_within_ledger(query, page_size=1)), None)
+
+    def _payload(self, group: list[Withdrawal]) -> tuple[WithdrawalDict, str]:
+        """The payload sending a claimed group, and its `paymentId`, with a fee when none was given."""
+        head = group[0]
+        if len(group) == 1:
+            payload, payment_id = dict(head.payload), head.payment_id
+        else:
+            payment_id = batch_payment_id([row.payment_id for row in group])
+            payload = batch_withdrawals([row.payload for row in group])
+        if head.currency in FEE_QUOTED_CURRENCIES and not all(row.payload.get("fee") for row in group):
+            fee = withdrawal_fee(head.currency, len(group), self.fee_tier, self.fees)
+            # A batch pays one fee, which must also cover the recipients that asked for none.
+            payload["fee"] = format(max(Decimal(fee), Decimal(payload.get("fee") or 0)), "f")
+        return payload, payment_id
+
+    def _renew(self, group: list[Withdrawal], claimed_at: datetime, done: threading.Event):
+        """Push the lease of a group forward until `done` is set, unless it was claimed again."""
+        try:
+            while not done.wait(self.lease / 3):
+                renewed_at = now()
+                renewed = Withdrawal.objects.filter(
+                    pk__in=[row.pk for row in group], status=Withdrawal.Status.SENDING, claimed_at=claimed_at
+                ).update(claimed_at=renewed_at)
+                if not renewed:
+                    return
+                claimed_at = renewed_at
+        except Exception:
+            logger.exception("Failed to renew the lease of withdrawal %s", group[0].payment_id)
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _leased(self, group: list[Withdrawal]):
+        """Keep the lease of a claimed group while the block runs."""
+        done = threading.Event()
+        renewer = threading.Thread(target=self._renew, args=(group, group[0].claimed_at, done), daemon=True)
+        renewer.start()
+        try:
+            yield
+        finally:
+            done.set()
+            renewer.join()
+
+    def _settle(self, group: list[Withdrawal], **fields):
+        Withdrawal.objects.filter(pk__in=[row.pk for row in group], status=Withdrawal.Status.SENDING).update(**fields)
+
+    def process(self, group: list[Withdrawal]) -> str:
+        """Send a claimed group of withdrawals. Returns the status they were left in."""
+        head = group[0]
+        if head.attempts > 1 and head.sent_payment_id:
+            try:
+                found = self._already_sent(head.sent_payment_id)
+            except Exception as e:
+                # Unknown whether it was sent: left to its lease, to be checked again once it expires.
+                logger.warning("Could not check whether withdrawal %s was sent: %s", head.sent_payment_id, e)
+                return Withdrawal.Status.SENDING
+            if found is not None:
+                # Settles the rest of its batch too, unless they were resent since.
+                Withdrawal.objects.filter(
+                    sender_account_id=head.sender_account_id,
+                    sent_payment_id=head.sent_payment_id,
+                    status__in=[Withdrawal.Status.PENDING, Withdrawal.Status.SENDING],
+                ).update(status=Withdrawal.Status.SENT, reference=found.get("reference") or "", error="")
+                return Withdrawal.Status.SENT
+        try:
+            payload, payment_id = self._payload(group)
+        except Exception as e:
+            return self._failed(head.payment_id, group, e, definite=False)
+        # Recorded before sending, so a retry knows what to look for in the ledger.
+        Withdrawal.objects.filter(pk__in=[row.pk for row in group]).update(sent_payment_id=payment_id)
+        try:
+            with self._leased(group):
+                response = self.send(payload)
+        except TatumAPIException as e:
+            # A rejected batch is retried as single withdrawals.
+            definite = 400 <= e.status_code < 500 and len(group) == 1
+            return self._failed(payment_id, group, e, definite)
+        except Exception as e:
+            return self._failed(payment_id, group, e, definite=False)
+        self._settle(
+            group,
+            status=Withdrawal.Status.SENT,
+            withdrawal_tatum_id=response.get("id") or "",
+            reference=response.get("reference") or "",
+            response=response,
+            error="",
+        )
+        return Withdrawal.Status.SENT
+
+    def _failed(self, payment_id: str, group: list[Withdrawal], error: Exception, definite: bool) -> str:
+        logger.warning("Withdrawal %s failed: %s", payment_id, error)
+        status = Withdrawal.Status.FAILED
+        if not definite and min(row.attempts for row in group) < self.max_attempts:
+            status = Withdrawal.Status.PENDING
+        self._settle(group, status=status, error=str(error))
+        return status
+
+    def drain(self, limit: int = None) -> dict[str, int]:
+        """Send queued withdrawals until none is left, or `limit` groups were sent.
+
+        Returns:
+            dict[str, int]: The number of withdrawals by the status their send left them in.
+        """
+        stats = {}
+        sent = 0
+        while limit is None or sent < limit:
+            group = self.claim()
+            if not group:
+                break
+            status = self.process(group)
+            stats[status] = stats.get(status, 0) + len(group)
+            sent += 1
+        return stats
+
+
+class WithdrawalWorkerPool:
+    """Threads draining the withdrawal queue concurrently.
+
+    Args:
+        queue (WithdrawalQueue, optional): The queue to drain.
+        workers (int, optional): Number of threads. Defaults to TATUM_WITHDRAWAL_WORKERS.
+        poll_interval (float, optional): Seconds an idle worker waits before looking at the
+            queue again. Defaults to TATUM_WITHDRAWAL_POLL_INTERVAL.
+    """
+
+    def __init__(self, queue: WithdrawalQueue = None, workers: int = None, poll_interval: float = None):
+        self.queue = queue or WithdrawalQueue()
+        self.workers = max(conf.TATUM_WITHDRAWAL_WORKERS if workers is None else workers, 1)
+        self.poll_interval = conf.TATUM_WITHDRAWAL_POLL_INTERVAL if poll_interval is None else poll_interval
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [t for t in self._threads if t.is_alive()]
+        for index in range(len(self._threads), self.workers):
+            thread = threading.Thread(target=self.run, name=f"tatum-withdrawals-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        self.join(timeout)
+
+    def join(self, timeout: float = None):
+        """Wait for the workers to exit, i.e. until `stop` is called."""
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                group = self.queue.claim()
+                if group:
+                    self.queue.process(group)
+            except Exception:
+                logger.exception("Withdrawal worker failed")
+                group = None
+            finally:
+                close_old_connections()
+            if not group:
+                self._stop.wait(self.poll_interval)
@@ -21,5 +21,6 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("debug_toolbar", include("debug_toolbar.urls")),
     path("api-auth/", include("rest_framework.urls")),
+    path("tatum/", include("apps.tatum.urls")),
     # path("graphql", GraphQLView.as_view(graphiql=True, schema=schema)),
 ]